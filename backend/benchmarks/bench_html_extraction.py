@@ -0,0 +1,104 @@
+"""
+Compare the previous BeautifulSoup job text extraction with the lxml single-pass extractor.
+
+The pages in benchmarks/html/ are synthetic: short hand-written pages (1-18 KB)
+that copy the markup patterns of Greenhouse, Lever, Workday and careers-site
+postings, not saved copies of live pages. They check that both extractors find
+the same posting, but their timings say little about real pages, which are
+usually far larger and script-heavy. The generated rendered boards are the
+better guide to how parse time grows with page size and nesting; measure on
+saved real pages before quoting a speedup.
+
+The backend no longer depends on BeautifulSoup; install it for this comparison
+with `pip install beautifulsoup4`.
+
+Run from the backend directory:
+    python -m benchmarks.bench_html_extraction [--runs 20]
+"""
+
+import argparse
+import statistics
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.fixtures import html_fixtures, rendered_board_html
+from html_extraction import extract_from_tree, parse_html
+
+JOB_KEYWORDS = ["job", "position", "role", "responsibilities", "requirements", "qualifications", "experience", "skills"]
+
+
+def legacy_extract(soup: BeautifulSoup) -> str:
+    """The previous extract_job_text_from_soup and page_metadata, without their debug prints"""
+    soup.find("title")
+    soup.find("meta", attrs={"property": "og:site_name"})
+    len(soup.find_all("div")), len(soup.find_all("p")), len(soup.find_all(["h1", "h2", "h3"]))
+    if len(soup.find_all("div")) == 1:
+        soup.find("div").get_text(strip=True)
+
+    text_blocks = []
+    for tag in soup.find_all(["h1", "h2", "h3", "p", "li"]):
+        txt = tag.get_text(strip=True)
+        if txt and len(txt) > 20:
+            text_blocks.append(txt)
+    if len(text_blocks) < 3:
+        for div in soup.find_all("div"):
+            txt = div.get_text(strip=True)
+            if txt and 50 < len(txt) < 2000 and any(keyword in txt.lower() for keyword in JOB_KEYWORDS):
+                text_blocks.append(txt)
+    if not text_blocks:
+        all_text = soup.get_text(separator="\n", strip=True)
+        if len(all_text) <= 100:
+            return ""
+        text_blocks = [line.strip() for line in all_text.split("\n") if len(line.strip()) > 10][:20]
+    return "\n".join(text_blocks)[:4000]
+
+
+def legacy_extract_divs(soup: BeautifulSoup) -> str:
+    """The previous fallback over every <div>, which pages without <p>/<li> content reach"""
+    text_blocks = []
+    for div in soup.find_all("div"):
+        txt = div.get_text(strip=True)
+        if txt and 50 < len(txt) < 2000 and any(keyword in txt.lower() for keyword in JOB_KEYWORDS):
+            text_blocks.append(txt)
+    return "\n".join(text_blocks)[:4000]
+
+
+def median_ms(fn, runs: int) -> tuple[float, object]:
+    timings = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, result
+
+
+def bench_page(name: str, html: str, runs: int):
+    legacy_parse, soup = median_ms(lambda: BeautifulSoup(html, "html.parser"), runs)
+    legacy_text_ms, legacy_text = median_ms(lambda: legacy_extract(soup), runs)
+    divs_ms, _ = median_ms(lambda: legacy_extract_divs(soup), runs)
+    parse_ms, root = median_ms(lambda: parse_html(html), runs)
+    extract_ms, page = median_ms(lambda: extract_from_tree(root), runs)
+    print(
+        f"{name:<28} {len(html) / 1024:7.0f} KB | "
+        f"legacy parse {legacy_parse:8.2f} extract {legacy_text_ms:8.2f} (div fallback {divs_ms:8.2f}) -> {len(legacy_text):6} chars | "
+        f"lxml parse {parse_ms:7.2f} extract {extract_ms:7.2f} -> {len(page.text):6} chars | "
+        f"speedup {(legacy_parse + legacy_text_ms) / (parse_ms + extract_ms):5.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Median of {args.runs} runs, times in ms (synthetic pages; see the module docstring)")
+    for name, html in html_fixtures().items():
+        bench_page(name, html, args.runs)
+    for depth, cards in ((15, 100), (30, 300), (40, 1000)):
+        bench_page(f"rendered board d={depth} n={cards}", rendered_board_html(depth, cards), max(3, args.runs // 4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare single-threaded PDF extraction with DocumentExtractor.
+
+The extractor only uses its process pool on multi-CPU hosts and for PDFs
+longer than PDF_IN_PROCESS_MAX_PAGES; pass --force-pool to measure the pool
+anyway.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pdf_extraction [--pages 20] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import io
+import statistics
+import time
+
+import PyPDF2
+
+from benchmarks.fixtures import resume_pdf
+from document_extraction import DocumentExtractor
+
+
+def legacy_extract_pdf_text(data: bytes) -> str:
+    """The previous implementation: one process, repeated string concatenation"""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text()
+    return text
+
+
+def report(name: str, timings: list[float]):
+    print(f"{name:>14}: median {statistics.median(timings) * 1000:8.1f} ms   min {min(timings) * 1000:8.1f} ms")
+
+
+async def bench_extractor(data: bytes, runs: int, workers: int, force_pool: bool) -> list[float]:
+    extractor = DocumentExtractor(workers=workers, **({"use_pool": True, "in_process_max_pages": 0} if force_pool else {}))
+    extractor.start()
+    try:
+        await extractor.extract_pdf(data)  # Wait for the workers to spawn and import PyPDF2
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            await extractor.extract_pdf(data)
+            timings.append(time.perf_counter() - started)
+        return timings
+    finally:
+        extractor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=DocumentExtractor().workers)
+    parser.add_argument("--force-pool", action="store_true", help="use the process pool even where it would be skipped")
+    args = parser.parse_args()
+
+    data = resume_pdf(args.pages)
+    print(f"{args.pages}-page PDF, {len(data) / 1024:.0f} KB, {args.workers} workers, {args.runs} runs")
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        legacy_extract_pdf_text(data)
+        timings.append(time.perf_counter() - started)
+    report("single-thread", timings)
+    report("extractor", asyncio.run(bench_extractor(data, args.runs, args.workers, args.force_pool)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+A stand-in for the OpenAI chat completions API, for offline benchmarks.
+
+Answers POST /v1/chat/completions (plain and streamed) with canned answers
+that match the backend's prompts and JSON schemas, after a configurable
+time to first token and at a configurable token rate. Point the backend at
+it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+Run from the backend directory:
+    python -m benchmarks.fake_openai [--port 8100] [--latency-ms 300] [--tokens-per-second 150]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+CHARS_PER_TOKEN = 4
+COMPANY_RE = re.compile(r"\b([A-Z][A-Za-z0-9&]+(?: [A-Z][A-Za-z0-9&]+)?) is hiring\b")
+
+ANALYSIS = {
+    "match_score": 78,
+    "justification": "Strong Python and FastAPI background; limited exposure to Kubernetes and AWS.",
+    "highlights": ["Five years of Python services", "PostgreSQL performance work", "No Kubernetes experience listed"],
+    "suggestions": [
+        "Add the AWS services you have used to the skills section",
+        "Quantify the latency improvements from the PostgreSQL work",
+        "Mention any container or Kubernetes experience",
+        "Mirror the phrase \"distributed systems\" from the posting",
+        "Move the most relevant project to the top of the experience section",
+    ],
+}
+RESEARCH = {
+    "company_overview": "{company} builds software for hiring teams and is headquartered in Seattle.",
+    "market_customers": "Mid-size and enterprise companies in North America and Europe.",
+    "key_products": "An applicant tracking system, interview scheduling and hiring analytics.",
+    "culture_values": "Remote-first, with an emphasis on written communication and ownership.",
+    "industry_competition": "Competes with Greenhouse, Lever and Workday Recruiting.",
+    "growth_opportunities": "Expanding into AI-assisted screening and the European market.",
+    "additional_insights": "Raised a Series C in 2024 and is growing its platform engineering team.",
+}
+
+
+def company_from_prompt(prompt: str) -> str:
+    match = COMPANY_RE.search(prompt)
+    return match.group(1) if match else "Example Corp"
+
+
+def answer(body: dict) -> str:
+    """The canned answer for a request, picked by its response format and prompt"""
+    prompt = "".join(str(message.get("content", "")) for message in body.get("messages", []))
+    schema_name = ((body.get("response_format") or {}).get("json_schema") or {}).get("name")
+    company = company_from_prompt(prompt)
+    research = {section: text.format(company=company) for section, text in RESEARCH.items()}
+    if schema_name == "resume_analysis":
+        return json.dumps(ANALYSIS)
+    if schema_name == "company_research":
+        return json.dumps(research)
+    if schema_name == "company_research_fused":
+        return json.dumps({"company_name": company, **research})
+    # Text prompts, as sent with LLM_STRUCTURED_OUTPUT=false
+    if "Return ONLY the company name" in prompt:
+        return company
+    if "Match Score" in prompt:
+        return (
+            f"**Match Score:** {ANALYSIS['match_score']}/100\n\n**Explanation:** {ANALYSIS['justification']}\n\n"
+            "### Suggestions\n" + "\n".join(f"{i}. {s}" for i, s in enumerate(ANALYSIS["suggestions"], start=1))
+        )
+    return "\n\n".join(
+        f"{i}. **{section.replace('_', ' ').title()}**: {text}" for i, (section, text) in enumerate(research.items(), start=1)
+    )
+
+
+def tokens(text: str) -> list[str]:
+    return [text[i : i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+
+
+def create_app(latency_ms: float, tokens_per_second: float) -> FastAPI:
+    app = FastAPI()
+    token_delay = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4o-mini")
+        content = answer(body)
+        max_tokens = body.get("max_tokens")
+        pieces = tokens(content)[:max_tokens] if max_tokens else tokens(content)
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency_ms / 1000 + len(pieces) * token_delay)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(pieces)}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(tokens(json.dumps(body))), "completion_tokens": len(pieces), "total_tokens": 0},
+            }
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def stream():
+            await asyncio.sleep(latency_ms / 1000)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                yield chunk({"content": piece})
+                await asyncio.sleep(token_delay)
+            yield chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=150, help="0 sends all tokens at once")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.tokens_per_second), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Generated documents for the benchmarks, so no binary fixtures are checked in.
+Synthetic job-board pages, hand-written after real layouts, are in benchmarks/html/.
+"""
+
+import io
+import os
+
+import docx
+
+HTML_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html")
+
+
+def _pdf_string(line: str) -> str:
+    return "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def make_pdf(pages: list[list[str]]) -> bytes:
+    """Build a minimal PDF with one Helvetica text block per page"""
+    page_count = len(pages)
+    font_id = 3 + 2 * page_count
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(page_count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode(),
+    ]
+    for i, lines in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode()
+        )
+        content = ("BT /F1 9 Tf 72 760 Td 11 TL " + " ".join(f"{_pdf_string(line)} '" for line in lines) + " ET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return out
+
+
+def resume_pdf(page_count: int = 20, lines_per_page: int = 60) -> bytes:
+    """A long resume-like PDF: page_count pages of experience bullet points"""
+    pages = []
+    for page in range(page_count):
+        lines = [f"Experience, page {page + 1}"]
+        for line in range(lines_per_page - 1):
+            lines.append(
+                f"- Led project {page * lines_per_page + line}: built Python and FastAPI services, "
+                "improved PostgreSQL query latency and mentored engineers"
+            )
+        pages.append(lines)
+    return make_pdf(pages)
+
+
+def resume_docx(paragraphs: list[str]) -> bytes:
+    """A DOCX resume with one paragraph per line"""
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def html_fixtures() -> dict[str, str]:
+    """The saved job-board pages in benchmarks/html, by file name"""
+    pages = {}
+    for name in sorted(os.listdir(HTML_FIXTURES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(HTML_FIXTURES_DIR, name), encoding="utf-8") as f:
+                pages[name] = f.read()
+    return pages
+
+
+def rendered_board_html(depth: int = 30, cards: int = 300) -> str:
+    """A large client-rendered job board page: the posting sits depth wrapper divs deep, next to
+    a list of cards jobs, each also nested in wrapper divs (as component frameworks render them)"""
+
+    def wrap(inner: str, levels: int, name: str) -> str:
+        for level in range(levels):
+            inner = f'<div class="{name}__wrapper-{level}">{inner}</div>'
+        return inner
+
+    posting = "".join(
+        f"<h2>Section {section}</h2><p>Paragraph {section}: you will build and operate Python services, "
+        "improve PostgreSQL performance, and work with product and design on the hiring experience.</p>"
+        "<ul>" + "".join(f"<li>Requirement {section}.{item}: experience with Kafka, Kubernetes and AWS</li>" for item in range(6)) + "</ul>"
+        for section in range(8)
+    )
+    card_list = "".join(
+        wrap(f'<a href="/jobs/{i}"><span>Software Engineer {i}</span><span>Remote</span><span>Posted {i % 30} days ago</span></a>', 6, "card")
+        for i in range(cards)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Senior Engineer | Example Board</title>"
+        '<meta property="og:site_name" content="Example Board"></head><body>'
+        + wrap('<div class="job-description">' + posting + "</div>", depth, "layout")
+        + wrap(card_list, depth // 2, "rail")
+        + "</body></html>"
+    )
@@ -0,0 +1,447 @@
+"""
+Offline load test for the API: throughput and latency percentiles per endpoint.
+
+Starts three local servers:
+- the fake OpenAI API (benchmarks/fake_openai.py)
+- the saved job-board pages (benchmarks/static_site.py)
+- the backend itself under uvicorn, pointed at both, with throwaway caches
+
+It then drives each scenario with a fixed number of requests at a fixed
+concurrency. Inputs are unique per request unless the scenario name ends in
+_cached, so the results measure the uncached path. The report is JSON: for
+each scenario it gives throughput, p50/p95/p99 latency, status codes, and the
+server-side stage timings read from /metrics. Pass a previous report as
+--baseline to print the change.
+
+Run from the backend directory:
+    python -m benchmarks.load_test [--requests 50] [--concurrency 8] [--scenarios analyze_resume,scrape_job_posting]
+        [--llm-latency-ms 300] [--llm-tokens-per-second 150] [--output report.json] [--baseline previous.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+import httpx
+
+from benchmarks.fixtures import make_pdf, resume_docx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_VERSION = 1
+STARTUP_TIMEOUT_SECONDS = 60
+REQUEST_TIMEOUT_SECONDS = 120
+SCENARIO_INDEX_STRIDE = 1_000_000  # Scenarios use disjoint input indexes, so one never warms the caches for another
+STAGE_METRIC_RE = re.compile(r'^jobflow_stage_duration_seconds_(sum|count)\{stage="([^"]+)",outcome="[^"]+"\} (\S+)$')
+
+STATIC_PAGES = ("greenhouse_board.html", "lever_board.html", "careers_site.html", "workday_posting.html", "generated/board.html")
+JS_PAGE = "spa_posting.html"
+
+
+# --- Request Inputs ---
+def company(i: int) -> str:
+    return f"Contoso{i}"
+
+
+def job_description(i: int) -> str:
+    return (
+        f"Senior Python Engineer\n{company(i)} is hiring a Senior Python Engineer to build the platform behind "
+        "its hiring products.\n\nWhat you'll do\n- Design and operate Python and FastAPI services\n"
+        "- Improve PostgreSQL performance for high-volume workloads\n- Run services on Kubernetes and AWS\n\n"
+        "What we're looking for\n- 5+ years of backend development in Python\n"
+        "- Experience with distributed systems, Kafka and Redis\n- Strong SQL skills\n\n"
+        f"Requisition {i}"
+    )
+
+
+def resume_lines(i: int) -> list[str]:
+    return [
+        f"Jordan Example {i}",
+        "Senior Software Engineer",
+        "Experience",
+        "- Built Python and FastAPI services handling 20k requests per second",
+        "- Cut PostgreSQL query latency by 60% with better indexes and batching",
+        "- Led migration of batch jobs to Kafka consumers",
+        "Skills: Python, FastAPI, PostgreSQL, Redis, Docker, Terraform",
+    ]
+
+
+def resume(i: int) -> str:
+    return "\n".join(resume_lines(i))
+
+
+@dataclass
+class Scenario:
+    """build(i) returns keyword arguments for httpx.AsyncClient.request"""
+
+    name: str
+    build: Callable[[int], dict]
+    kind: str = "request"  # "request", "stream" (read the SSE/NDJSON body to the end) or "job" (submit, then long-poll)
+
+
+def scenarios(static_url: str, js_url: str, run_id: str, files_dir: str) -> dict[str, Scenario]:
+    def page_url(i: int) -> str:
+        # A distinct URL per request, so each one is a scrape cache miss
+        return f"{static_url}/{STATIC_PAGES[i % len(STATIC_PAGES)]}?run={run_id}&n={i}"
+
+    def analysis(i: int) -> dict:
+        return {"resume": resume(i), "job_description": job_description(i)}
+
+    pdfs: dict[int, bytes] = {}
+    docxs: dict[int, bytes] = {}
+
+    def pdf(i: int) -> bytes:
+        if i not in pdfs:
+            pdfs[i] = make_pdf([resume_lines(i)])
+        return pdfs[i]
+
+    def docx_file(i: int) -> bytes:
+        if i not in docxs:
+            docxs[i] = resume_docx(resume_lines(i))
+        return docxs[i]
+
+    def pdf_path(i: int) -> str:
+        # /extract_resume_text reads a path on the server, which runs on this machine
+        path = os.path.join(files_dir, f"resume-{i}.pdf")
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(pdf(i))
+        return path
+
+    all_scenarios = [
+        Scenario("analyze_resume", lambda i: {"method": "POST", "url": "/analyze_resume", "json": analysis(i)}),
+        Scenario("analyze_resume_cached", lambda i: {"method": "POST", "url": "/analyze_resume", "json": analysis(0)}),
+        Scenario("analyze_resume_fast", lambda i: {"method": "POST", "url": "/analyze_resume", "params": {"mode": "fast"}, "json": analysis(i)}),
+        Scenario("analyze_resume_stream", lambda i: {"method": "POST", "url": "/analyze_resume/stream", "json": analysis(i)}, "stream"),
+        Scenario(
+            "analyze_resume_batch",
+            lambda i: {
+                "method": "POST",
+                "url": "/analyze_resume_batch",
+                "json": {"resume": resume(i), "job_descriptions": [job_description(i * 5 + j) for j in range(5)]},
+            },
+            "stream",
+        ),
+        Scenario(
+            "analyze_resume_file_pdf",
+            lambda i: {
+                "method": "POST",
+                "url": "/analyze_resume_file",
+                "data": {"job_description": job_description(i)},
+                "files": {"file": ("resume.pdf", pdf(i), "application/pdf")},
+            },
+        ),
+        Scenario(
+            "analyze_resume_file_docx",
+            lambda i: {
+                "method": "POST",
+                "url": "/analyze_resume_file",
+                "data": {"job_description": job_description(i)},
+                "files": {"file": ("resume.docx", docx_file(i), "application/vnd.openxmlformats-officedocument.wordprocessingml.document")},
+            },
+        ),
+        Scenario(
+            "extract_resume_text_file",
+            lambda i: {"method": "POST", "url": "/extract_resume_text_file", "files": {"file": ("resume.pdf", pdf(i), "application/pdf")}},
+        ),
+        Scenario("extract_resume_text", lambda i: {"method": "POST", "url": "/extract_resume_text", "params": {"file_path": pdf_path(i)}}),
+        Scenario("research_company", lambda i: {"method": "POST", "url": "/research_company", "json": {"job_description": job_description(i)}}),
+        Scenario(
+            "research_company_stream",
+            lambda i: {"method": "POST", "url": "/research_company/stream", "json": {"job_description": job_description(i)}},
+            "stream",
+        ),
+        Scenario("scrape_job_posting", lambda i: {"method": "POST", "url": "/scrape_job_posting", "json": {"url": page_url(i)}}),
+        Scenario(
+            "scrape_job_posting_js",
+            # Served from a different host name, so the scrape strategy keeps separate history for it
+            lambda i: {"method": "POST", "url": "/scrape_job_posting", "json": {"url": f"{js_url}/{JS_PAGE}?run={run_id}&n={i}"}},
+        ),
+        Scenario("scrape_and_research", lambda i: {"method": "POST", "url": "/scrape_and_research", "json": {"url": page_url(i)}}),
+        Scenario("jobs_analyze_resume", lambda i: {"method": "POST", "url": "/jobs/analyze_resume", "json": analysis(i)}, "job"),
+        Scenario(
+            "jobs_research_company",
+            lambda i: {"method": "POST", "url": "/jobs/research_company", "json": {"job_description": job_description(i)}},
+            "job",
+        ),
+        Scenario("jobs_scrape_and_research", lambda i: {"method": "POST", "url": "/jobs/scrape_and_research", "json": {"url": page_url(i)}}, "job"),
+        # The scrape endpoint itself; grows with the number of label combinations recorded so far
+        Scenario("metrics", lambda i: {"method": "GET", "url": "/metrics"}),
+    ]
+    return {scenario.name: scenario for scenario in all_scenarios}
+
+
+# --- Local Servers ---
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: subprocess.Popen):
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server for {url} did not start within {STARTUP_TIMEOUT_SECONDS}s")
+
+
+@contextmanager
+def servers(args) -> Iterator[dict]:
+    """Start the fake LLM, the static site and the backend; yields their base URLs"""
+    llm_port, static_port, app_port = free_port(), free_port(), free_port()
+    processes = []
+    with tempfile.TemporaryDirectory(prefix="jobflow-bench-") as tmp:
+        env = {
+            **os.environ,
+            "OPENAI_API_KEY": "offline-benchmark",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+            "REQUEST_LIMIT": str(10**9),
+            "COMPANY_CACHE_DB_PATH": os.path.join(tmp, "cache.sqlite3"),
+            "RATE_LIMIT_DB_PATH": os.path.join(tmp, "cache.sqlite3"),
+            "JOB_QUEUE_DB_PATH": os.path.join(tmp, "jobs.sqlite3"),
+            "LOG_LEVEL": args.log_level,
+            "PYTHONUNBUFFERED": "1",
+        }
+        commands = [
+            (
+                [sys.executable, "-m", "benchmarks.fake_openai", "--port", str(llm_port),
+                 "--latency-ms", str(args.llm_latency_ms), "--tokens-per-second", str(args.llm_tokens_per_second)],
+                f"http://127.0.0.1:{llm_port}/health",
+            ),
+            ([sys.executable, "-m", "benchmarks.static_site", "--port", str(static_port)], f"http://127.0.0.1:{static_port}/health"),
+            (
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(app_port),
+                 "--workers", str(args.app_workers), "--log-level", "warning"],
+                f"http://127.0.0.1:{app_port}/metrics",
+            ),
+        ]
+        try:
+            for command, ready_url in commands:
+                process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+                processes.append(process)
+                wait_until_ready(ready_url, process)
+            yield {
+                "app": f"http://127.0.0.1:{app_port}",
+                "static": f"http://127.0.0.1:{static_port}",
+                "js": f"http://localhost:{static_port}",
+            }
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+# --- Load Driver ---
+async def send(client: httpx.AsyncClient, scenario: Scenario, i: int) -> tuple[int, bool]:
+    """Run one request of a scenario; returns (HTTP status, succeeded)"""
+    request = scenario.build(i)
+    if scenario.kind == "stream":
+        async with client.stream(**request) as response:
+            body = (await response.aread()).decode("utf-8", errors="replace")
+        return response.status_code, response.status_code == 200 and "event: error" not in body and '"status": "error"' not in body
+    response = await client.request(**request)
+    if scenario.kind != "job" or response.status_code != 202:
+        return response.status_code, response.is_success
+    job_id = response.json()["job_id"]
+    while True:
+        poll = await client.get(f"/jobs/{job_id}", params={"wait": 30})
+        status = poll.json().get("status") if poll.status_code == 200 else None
+        if status not in ("queued", "running"):
+            return poll.status_code, status == "succeeded"
+
+
+async def stage_totals(client: httpx.AsyncClient) -> dict[str, list[float]]:
+    """Server-side {stage: [seconds, count]} from /metrics, over all outcomes"""
+    totals: dict[str, list[float]] = {}
+    response = await client.get("/metrics")
+    for line in response.text.splitlines():
+        match = STAGE_METRIC_RE.match(line)
+        if match:
+            field, stage, value = match.groups()
+            totals.setdefault(stage, [0.0, 0.0])[0 if field == "sum" else 1] += float(value)
+    return totals
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Linear interpolation between closest ranks"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int, warmup: int, first_index: int
+) -> dict:
+    # Warm-up requests use their own inputs, so they do not pre-fill caches for the measured ones
+    for i in range(first_index + requests, first_index + requests + warmup):
+        await send(client, scenario, i)
+
+    before = await stage_totals(client)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    failures = 0
+    next_index = iter(range(first_index, first_index + requests))
+
+    async def worker():
+        nonlocal failures
+        for i in next_index:
+            started = time.perf_counter()
+            try:
+                status, ok = await send(client, scenario, i)
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            latencies.append(time.perf_counter() - started)
+            statuses[str(status)] += 1
+            failures += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    after = await stage_totals(client)
+
+    ordered = sorted(latencies)
+    stages = {}
+    for stage, (seconds, count) in sorted(after.items()):
+        seconds -= before.get(stage, [0.0, 0.0])[0]
+        count -= before.get(stage, [0.0, 0.0])[1]
+        if count:
+            stages[stage] = {"count": int(count), "mean_ms": round(seconds / count * 1000, 2)}
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "succeeded": requests - failures,
+        "failed": failures,
+        "status_codes": dict(sorted(statuses.items())),
+        "duration_seconds": round(duration, 3),
+        "throughput_rps": round(requests / duration, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(ordered) * 1000, 2),
+            "p50": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99": round(percentile(ordered, 0.99) * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2),
+        },
+        "server_stages": stages,
+    }
+
+
+async def run(args, urls: dict, files_dir: str) -> dict:
+    available = scenarios(urls["static"], urls["js"], secrets.token_hex(4), files_dir)
+    names = args.scenarios.split(",") if args.scenarios else list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (available: {', '.join(available)})")
+
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=urls["app"], timeout=REQUEST_TIMEOUT_SECONDS, limits=limits) as client:
+        for position, name in enumerate(names):
+            print(f"Running {name}...", file=sys.stderr)
+            results[name] = await run_scenario(
+                client, available[name], args.requests, args.concurrency, args.warmup, position * SCENARIO_INDEX_STRIDE
+            )
+            latency = results[name]["latency_ms"]
+            print(
+                f"  {results[name]['throughput_rps']:8.2f} req/s   p50 {latency['p50']:9.1f} ms   p95 {latency['p95']:9.1f} ms   "
+                f"p99 {latency['p99']:9.1f} ms   failed {results[name]['failed']}",
+                file=sys.stderr,
+            )
+    return results
+
+
+# --- Report ---
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(baseline: dict, report: dict):
+    print(f"\nChange from baseline {baseline.get('git_commit') or '(unknown commit)'}:", file=sys.stderr)
+    for name, result in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        changes = []
+        for key in ("p50", "p95", "p99"):
+            old, new = previous["latency_ms"][key], result["latency_ms"][key]
+            changes.append(f"{key} {old:9.1f} -> {new:9.1f} ms ({(new - old) / old * 100 if old else 0.0:+6.1f}%)")
+        old_rps, new_rps = previous["throughput_rps"], result["throughput_rps"]
+        changes.append(f"{old_rps:.2f} -> {new_rps:.2f} req/s")
+        print(f"  {name:<26} " + "   ".join(changes), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per scenario")
+    parser.add_argument("--scenarios", default="", help="Comma-separated scenario names (default: all)")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="Fake LLM time to first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=150, help="Fake LLM token rate (0: no delay)")
+    parser.add_argument("--app-workers", type=int, default=1, help="uvicorn workers for the backend")
+    parser.add_argument("--log-level", default="WARNING", help="Backend LOG_LEVEL")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="A previous JSON report to compare against")
+    args = parser.parse_args()
+
+    with servers(args) as urls, tempfile.TemporaryDirectory(prefix="jobflow-bench-files-") as files_dir:
+        results = asyncio.run(run(args, urls, files_dir))
+
+    report = {
+        "version": REPORT_VERSION,
+        "git_commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_tokens_per_second": args.llm_tokens_per_second,
+            "app_workers": args.app_workers,
+            "cpu_count": os.cpu_count(),
+        },
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+A local web server for saved job-board pages, for offline scraping benchmarks.
+
+Serves benchmarks/html/ (with ETag and Last-Modified, so cached pages can be
+revalidated) and a large generated client-rendered board at /generated/board.html.
+spa_posting.html only has its posting after JavaScript runs, so it exercises
+the browser rendering path. Query strings are ignored, which lets a benchmark
+request the same page under many distinct URLs.
+
+Run from the backend directory:
+    python -m benchmarks.static_site [--port 8200]
+"""
+
+import argparse
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+from fastapi.staticfiles import StaticFiles
+
+from benchmarks.fixtures import HTML_FIXTURES_DIR, rendered_board_html
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    board = rendered_board_html()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/generated/board.html", response_class=HTMLResponse)
+    async def generated_board():
+        return board
+
+    app.mount("/", StaticFiles(directory=HTML_FIXTURES_DIR), name="pages")
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    args = parser.parse_args()
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Persistent headless browser pool for the Playwright scraping fallback.
+
+Playwright and a small number of Chromium processes are started once in the
+app lifespan. Each scrape leases an isolated browser context (its own cookies
+and cache) on a warm browser, so concurrent scrapes share browsers instead of
+launching one Chromium each. Browsers are recycled after a number of uses or
+when they crash.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# --- Browser Pool Configuration ---
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))  # Chromium processes kept warm
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "4"))  # Concurrent pages across the pool
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "50"))  # Pages served before a browser is recycled
+
+# Set user agent to look more like a real browser
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+class BrowserUnavailableError(Exception):
+    """Raised when Playwright or Chromium is not installed or cannot be launched."""
+
+
+@dataclass(eq=False)
+class _BrowserSlot:
+    browser: Any
+    uses: int = 0  # Pages leased from this browser so far
+    active: int = 0  # Pages currently open on this browser
+    retired: bool = False  # No new leases; closed once active drops to 0
+
+    def healthy(self) -> bool:
+        return not self.retired and self.browser.is_connected()
+
+
+class BrowserPool:
+    """Hands out isolated pages on a fixed set of warm Chromium browsers."""
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_pages: int = BROWSER_MAX_PAGES,
+        max_uses: int = BROWSER_MAX_USES,
+    ):
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.max_uses = max(1, max_uses)
+        self._playwright: Any = None
+        self._slots: list[Optional[_BrowserSlot]] = [None] * self.size
+        self._lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()  # Separate from _lock, which start() takes to launch browsers
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._unavailable_reason: Optional[str] = None
+
+    async def start(self):
+        """Start Playwright and warm the browsers. Called from the app lifespan."""
+        async with self._start_lock:
+            # Checked under the lock, so concurrent first leases start a single Playwright
+            if self._playwright is None:
+                await self._start()
+
+    async def _start(self):
+        try:
+            from playwright.async_api import async_playwright
+        except ImportError:
+            self._unavailable_reason = "Playwright not installed. Install with: pip install playwright && playwright install"
+            logger.warning(self._unavailable_reason)
+            return
+
+        self._playwright = await async_playwright().start()
+        self._semaphore = asyncio.Semaphore(self.max_pages)
+        try:
+            async with self._lock:
+                for i in range(self.size):
+                    self._slots[i] = await self._launch()
+        except Exception as e:
+            # Keep serving; launching is retried on the next lease
+            logger.warning("Could not launch browser at startup: %s", e)
+        logger.info(
+            "Browser pool started", extra={"size": self.size, "max_pages": self.max_pages, "max_uses": self.max_uses}
+        )
+
+    async def close(self):
+        """Close every browser and stop Playwright. Called from the app lifespan."""
+        async with self._lock:
+            for i, slot in enumerate(self._slots):
+                if slot is not None:
+                    await self._close_browser(slot)
+                    self._slots[i] = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info("Browser pool closed")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """Lease a fresh page in its own browser context; closed automatically on exit."""
+        if self._playwright is None:
+            if self._unavailable_reason is None:
+                # Scripts that never ran the app lifespan start the pool on their first scrape
+                await self.start()
+            if self._playwright is None:
+                raise BrowserUnavailableError(self._unavailable_reason or "Browser pool is not running")
+        assert self._semaphore is not None
+
+        async with self._semaphore:
+            slot = await self._checkout()
+            context = None
+            try:
+                context = await slot.browser.new_context(user_agent=USER_AGENT)
+                page = await context.new_page()
+                yield page
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning("Error closing browser context: %s", e)
+                await self._checkin(slot)
+
+    async def _launch(self) -> _BrowserSlot:
+        try:
+            browser = await self._playwright.chromium.launch(headless=True)
+        except Exception as e:
+            raise BrowserUnavailableError(f"Could not launch Chromium: {e}") from e
+        logger.info("Launched pooled Chromium browser")
+        return _BrowserSlot(browser=browser)
+
+    async def _checkout(self) -> _BrowserSlot:
+        async with self._lock:
+            # Replace crashed or retired browsers before picking one
+            for i, slot in enumerate(self._slots):
+                if slot is None or not slot.healthy():
+                    if slot is not None and slot.active == 0:
+                        await self._close_browser(slot)
+                    self._slots[i] = await self._launch()
+            slot = min(self._slots, key=lambda s: s.active)  # type: ignore[union-attr]
+            assert slot is not None
+            slot.active += 1
+            slot.uses += 1
+            if slot.uses >= self.max_uses:
+                # Serve this lease, then recycle the browser to bound memory growth
+                slot.retired = True
+            return slot
+
+    async def _checkin(self, slot: _BrowserSlot):
+        async with self._lock:
+            slot.active -= 1
+            if slot.active == 0 and not slot.healthy():
+                # Retired or crashed, and its last page is done: close it and free its slot
+                await self._close_browser(slot)
+                self._slots = [None if s is slot else s for s in self._slots]
+
+    async def _close_browser(self, slot: _BrowserSlot):
+        try:
+            if slot.browser.is_connected():
+                await slot.browser.close()
+                logger.info("Closed pooled browser", extra={"uses": slot.uses})
+        except Exception as e:
+            logger.warning("Error closing browser: %s", e)
+
+
+# Shared instance used by the scraping endpoints
+browser_pool = BrowserPool()
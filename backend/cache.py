@@ -0,0 +1,187 @@
+"""
+Two-tier response cache.
+
+Entries live in an in-memory LRU and, optionally, in a SQLite table so they
+survive restarts and are shared by every worker process on the machine. Both
+tiers expire entries after a TTL and evict least-recently-used entries once
+they grow past their size limit. Values must be JSON-serializable.
+
+The SQLite tier is pruned on an interval rather than on every write, so
+writes stay cheap as the table grows. Between prunes it can hold up to
+DISK_PRUNE_EVERY_WRITES entries more than its limit.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from metrics import CACHE_REQUESTS
+
+DISK_PRUNE_INTERVAL_SECONDS = 60  # Longest time between removals of expired and excess disk entries
+DISK_PRUNE_EVERY_WRITES = 256  # ... or sooner, after this many writes
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different submissions share a cache key."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Content-addressed key: SHA-256 over the JSON encoding of the parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """In-memory LRU with an optional SQLite tier, both with TTL and size-based eviction."""
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        max_memory_entries: int = 1024,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+    ):
+        if not re.fullmatch(r"[a-z_]+", name):
+            raise ValueError(f"Invalid cache name: {name!r}")
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.db_path = db_path or None
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._table = f"cache_{name}"
+        self._next_prune_at = 0.0
+        self._writes_since_prune = 0
+
+    # --- Public API ---
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss or an expired entry."""
+        value = await self._get(key)
+        CACHE_REQUESTS.inc(cache=self.name, result="miss" if value is None else "hit")
+        return value
+
+    async def set(self, key: str, value: Any):
+        expires_at = time.time() + self.ttl_seconds
+        self._memory_set(key, value, expires_at)
+        if self.db_path is not None:
+            await asyncio.to_thread(self._disk_set, key, json.dumps(value), expires_at)
+
+    async def delete(self, key: str):
+        self._memory.pop(key, None)
+        if self.db_path is not None:
+            await asyncio.to_thread(self._disk_delete, key)
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # --- Lookup ---
+    async def _get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                return value
+            del self._memory[key]
+
+        if self.db_path is None:
+            return None
+        disk_entry = await asyncio.to_thread(self._disk_get, key, now)
+        if disk_entry is None:
+            return None
+        expires_at, value = disk_entry
+        self._memory_set(key, value, expires_at)
+        return value
+
+    # --- Memory tier ---
+    def _memory_set(self, key: str, value: Any, expires_at: float):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    # --- Disk tier (runs in a worker thread) ---
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            assert self.db_path is not None
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5)
+            # WAL lets several uvicorn workers read while one writes
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            db.execute(f"CREATE INDEX IF NOT EXISTS {self._table}_accessed ON {self._table}(accessed_at)")
+            db.execute(f"CREATE INDEX IF NOT EXISTS {self._table}_expires ON {self._table}(expires_at)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple[float, Any]]:
+        with self._db_lock:
+            db = self._connection()
+            row = db.execute(
+                f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                db.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                db.commit()
+                return None
+            db.execute(f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?", (now, key))
+            db.commit()
+        return expires_at, json.loads(value)
+
+    def _disk_set(self, key: str, value_json: str, expires_at: float):
+        now = time.time()
+        with self._db_lock:
+            db = self._connection()
+            db.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value_json, expires_at, now),
+            )
+            self._writes_since_prune += 1
+            if now >= self._next_prune_at or self._writes_since_prune >= DISK_PRUNE_EVERY_WRITES:
+                self._prune(db, now)
+            db.commit()
+
+    def _prune(self, db: sqlite3.Connection, now: float):
+        """Drop expired rows first, then the least recently used beyond the size limit"""
+        self._next_prune_at = now + DISK_PRUNE_INTERVAL_SECONDS
+        self._writes_since_prune = 0
+        db.execute(f"DELETE FROM {self._table} WHERE expires_at <= ?", (now,))
+        (count,) = db.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            db.execute(
+                f"DELETE FROM {self._table} WHERE key IN "
+                f"(SELECT key FROM {self._table} ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    def _disk_delete(self, key: str):
+        with self._db_lock:
+            db = self._connection()
+            db.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+            db.commit()
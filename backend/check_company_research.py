@@ -3,7 +3,7 @@
 Test script for the enhanced company research functionality
 """
 
-import requests
+import httpx
 import json
 
 # Test job description with a well-known company
@@ -31,7 +31,7 @@ def test_enhanced_company_research():
     data = {"job_description": SAMPLE_JOB_DESCRIPTION}
     
     try:
-        response = requests.post(url, json=data)
+        response = httpx.post(url, json=data, timeout=120)
         response.raise_for_status()
         
         result = response.json()
@@ -46,7 +46,7 @@ def test_enhanced_company_research():
         print(f"\nGrowth & Opportunities: {result['growth_opportunities']}")
         print(f"\nAdditional Insights: {result['additional_insights']}")
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error testing enhanced company research: {e}")
 
 def test_company_name_extraction():
@@ -66,7 +66,7 @@ def test_company_name_extraction():
     for i, job_desc in enumerate(test_cases, 1):
         print(f"\nTest Case {i}: {job_desc}")
         try:
-            response = requests.post(url, json={"job_description": job_desc})
+            response = httpx.post(url, json={"job_description": job_desc}, timeout=120)
             if response.status_code == 200:
                 print("✓ Company research completed successfully")
             else:
@@ -84,7 +84,7 @@ def test_scrape_and_research():
     data = {"url": "https://www.linkedin.com/jobs/view/software-engineer-at-google-123456789"}
     
     try:
-        response = requests.post(url, json=data)
+        response = httpx.post(url, json=data, timeout=120)
         response.raise_for_status()
         
         result = response.json()
@@ -95,7 +95,7 @@ def test_scrape_and_research():
         if result['company_info']['company_overview']:
             print(f"\nCompany Overview: {result['company_info']['company_overview'][:300]}...")
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error testing scrape and research: {e}")
 
 if __name__ == "__main__":
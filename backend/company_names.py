@@ -0,0 +1,211 @@
+"""
+Local company-name extraction.
+
+Most postings name the employer in predictable places: phrases such as
+"About X" or "X is hiring" in the text, the page's og:site_name or <title>,
+and the posting URL (the company's own careers site, or the company slug in
+an applicant-tracking-system URL). Each source yields a guess with a
+confidence, and the LLM extractor only runs when no guess is confident.
+A scraped page's schema.org JobPosting hiringOrganization is taken as-is.
+"""
+
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlparse
+
+COMPANY_NAME_MIN_CONFIDENCE = float(os.getenv("COMPANY_NAME_MIN_CONFIDENCE", "0.7"))  # Below this, ask the LLM
+
+
+@dataclass
+class CompanyNameGuess:
+    name: str
+    confidence: float  # 0 to 1
+    source: str
+
+
+# A capitalized name of up to five words ("Acme", "Acme Robotics, Inc.", "AT&T")
+_NAME = r"([A-Z0-9][\w&'.-]*(?:,? [A-Z0-9&][\w&'.-]*){0,4})"
+
+# (pattern, confidence) for the phrasings the LLM extraction prompt lists. An "About X" heading
+# alone stays below COMPANY_NAME_MIN_CONFIDENCE: postings also have "About Kubernetes" or
+# "About Remote Work" sections, so it needs another source (title, site name, URL) to agree.
+TEXT_PATTERNS = [
+    (re.compile(r"^\s*About " + _NAME + r"\s*:?\s*$", re.MULTILINE), 0.65),  # "About Acme" section heading
+    (re.compile(_NAME + r" is hiring\b"), 0.8),
+    (re.compile(r"\bJoin " + _NAME + r"(?: as\b| and\b|[.!,]|$)", re.MULTILINE), 0.7),
+    (re.compile(r"\bAbout " + _NAME), 0.6),
+    (re.compile(r"(?:\b[Aa]t|@) " + _NAME + r"(?:[.!,:;)]|\s*$| is\b| we\b)", re.MULTILINE), 0.5),
+]
+
+# Capitalized words these patterns catch that are not company names
+NOT_COMPANY_NAMES = {
+    "us", "the", "our", "we", "you", "your", "this", "the role", "the team", "the job", "the company",
+    "the position", "the opportunity", "our team", "our company", "a", "an", "it", "home", "least",
+    "remote", "company", "team", "role", "job", "position", "yourself", "them", "me", "now", "today",
+    "hq", "headquarters", "remote work", "office", "hybrid", "onsite",
+}
+
+# Words that make "About X" / "Join X" a section heading ("About This Role", "About Benefits",
+# "Join Our Engineering Team") rather than a company name
+HEADING_WORDS = {
+    "this", "the", "our", "what", "who", "how", "why", "you", "your", "we", "us", "my", "a", "an",
+    "role", "team", "job", "position", "opportunity", "company", "client", "benefits", "benefit", "perks",
+    "compensation", "salary", "pay", "culture", "mission", "values", "responsibilities", "requirements",
+    "qualifications", "overview", "description", "details", "life", "working", "apply", "application",
+    "remote", "work", "hybrid", "office", "location", "locations", "hq", "headquarters", "glance", "hiring",
+    "process", "interview", "interviews", "equal", "diversity", "inclusion", "growth",
+}
+
+# Job boards and ATS vendors whose own name shows up in titles, og:site_name and hostnames
+PLATFORM_NAMES = {
+    "greenhouse", "lever", "workday", "myworkdayjobs", "ashby", "ashbyhq", "workable", "smartrecruiters",
+    "icims", "taleo", "successfactors", "bamboohr", "recruitee", "breezy", "breezy hr", "jazzhr", "applytojob",
+    "teamtailor", "jobvite", "linkedin", "indeed", "glassdoor", "ziprecruiter", "monster", "wellfound",
+    "angellist", "built in", "builtin", "dice", "simplyhired", "careerbuilder", "careers", "jobs",
+}
+
+# Hosts where the company is the first path segment: boards.greenhouse.io/acme, jobs.lever.co/acme
+ATS_PATH_HOSTS = (
+    "boards.greenhouse.io", "job-boards.greenhouse.io", "jobs.lever.co", "jobs.ashbyhq.com",
+    "apply.workable.com", "jobs.smartrecruiters.com", "jobs.jobvite.com",
+)
+# Hosts where the company is the subdomain: acme.wd1.myworkdayjobs.com, acme.bamboohr.com
+ATS_SUBDOMAIN_HOSTS = (
+    "myworkdayjobs.com", "bamboohr.com", "recruitee.com", "breezy.hr", "applytojob.com", "teamtailor.com",
+    "workable.com", "icims.com", "jobs.personio.de", "jobs.personio.com",
+)
+# Subdomains and path words that are not part of a company name
+GENERIC_HOST_LABELS = {"www", "jobs", "careers", "career", "boards", "job-boards", "apply", "embed", "en", "us"}
+
+TITLE_SEPARATORS = re.compile(r"\s+[|\-–—•·]\s+|\s+at\s+")
+
+COMPANY_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "bv", "nv", "pty", "lp", "llp",
+}
+
+
+def normalize_company_name(company_name: str) -> str:
+    """Fold case, punctuation, whitespace and legal suffixes ("Acme, Inc." -> "acme")"""
+    name = unicodedata.normalize("NFKC", company_name).lower()
+    name = name.replace("&", " and ").replace(".", "")
+    tokens = re.sub(r"[^\w\s]", " ", name).split()
+    if tokens and tokens[0] == "the":
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in COMPANY_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def _clean_name(name: str) -> Optional[str]:
+    name = re.sub(r"\s+", " ", name).strip(" \t.,:;!-'\"")
+    # "Acme Careers", "Acme Jobs" (site names and page titles)
+    name = re.sub(r"\s+(?:careers?|jobs?)$", "", name, flags=re.IGNORECASE)
+    if not name or len(name) > 60 or name.lower() in NOT_COMPANY_NAMES or name.lower() in PLATFORM_NAMES:
+        return None
+    return name
+
+
+def _slug_to_name(slug: str) -> Optional[str]:
+    slug = slug.strip().lower()
+    if not slug or slug in GENERIC_HOST_LABELS or slug in PLATFORM_NAMES or slug.isdigit():
+        return None
+    return " ".join(part.capitalize() for part in re.split(r"[-_]+", slug) if part)
+
+
+def _looks_like_heading(name: str, text: str) -> bool:
+    """A name made of heading words, unless the text names it again (as "The Trade Desk" would be)"""
+    if not any(word.strip(".,&'").lower() in HEADING_WORDS for word in name.split()):
+        return False
+    return len(re.findall(r"(?<!\w)" + re.escape(name) + r"(?!\w)", text)) < 2
+
+
+def guesses_from_text(job_description: str) -> list[CompanyNameGuess]:
+    guesses = []
+    claimed: list[tuple[int, int]] = []
+    for pattern, confidence in TEXT_PATTERNS:  # Most confident first
+        for match in pattern.finditer(job_description):
+            start, end = match.span(1)
+            # "About Acme" matches both the heading and the "About X" pattern; one span is one piece of evidence
+            if any(start < claimed_end and claimed_start < end for claimed_start, claimed_end in claimed):
+                continue
+            name = _clean_name(match.group(1))
+            if name and not _looks_like_heading(name, job_description):
+                claimed.append((start, end))
+                guesses.append(CompanyNameGuess(name, confidence, "text"))
+    return guesses
+
+
+def guesses_from_metadata(title: str = "", site_name: str = "", hiring_organization: str = "") -> list[CompanyNameGuess]:
+    guesses = []
+    name = re.sub(r"\s+", " ", hiring_organization or "").strip()
+    if name:
+        guesses.append(CompanyNameGuess(name, 0.95, "json-ld"))
+    name = _clean_name(site_name or "")
+    if name:
+        guesses.append(CompanyNameGuess(name, 0.85, "og:site_name"))
+    # "Senior Engineer - Acme", "Senior Engineer at Acme | Greenhouse": the company is usually the
+    # last segment that is not a job board's own name
+    parts = [part for part in TITLE_SEPARATORS.split(title or "") if part.strip()]
+    for part in reversed(parts[1:]):
+        name = _clean_name(part)
+        if name:
+            guesses.append(CompanyNameGuess(name, 0.6, "title"))
+            break
+    return guesses
+
+
+def guesses_from_url(url: str) -> list[CompanyNameGuess]:
+    parsed = urlparse(url or "")
+    host = (parsed.hostname or "").lower()
+    if not host:
+        return []
+    path_parts = [p for p in parsed.path.split("/") if p]
+
+    if any(host == h for h in ATS_PATH_HOSTS):
+        name = _slug_to_name(path_parts[0]) if path_parts else None
+        return [CompanyNameGuess(name, 0.8, "ats_url")] if name else []
+    for ats_host in ATS_SUBDOMAIN_HOSTS:
+        if host.endswith("." + ats_host):
+            labels = [label for label in host[: -len(ats_host) - 1].split(".") if not re.fullmatch(r"wd\d+", label)]
+            name = _slug_to_name(labels[0]) if labels else None
+            return [CompanyNameGuess(name, 0.8, "ats_url")] if name else []
+
+    # Otherwise assume the company's own site (careers.acme.com); the name is the registrable label
+    labels = host.split(".")
+    if len(labels) < 2:
+        return []
+    registrable = labels[-3] if len(labels) >= 3 and len(labels[-2]) <= 3 and len(labels[-1]) == 2 else labels[-2]
+    name = _slug_to_name(registrable)
+    return [CompanyNameGuess(name, 0.55, "hostname")] if name else []
+
+
+def guess_company_name(
+    job_description: str, url: str = "", title: str = "", site_name: str = "", hiring_organization: str = ""
+) -> Optional[CompanyNameGuess]:
+    """Best local guess from every available source; agreeing sources raise its confidence"""
+    guesses = (
+        guesses_from_text(job_description)
+        + guesses_from_metadata(title, site_name, hiring_organization)
+        + guesses_from_url(url)
+    )
+    if not guesses:
+        return None
+
+    # Combine guesses for the same company as independent evidence: 1 - prod(1 - confidence)
+    combined: dict[str, CompanyNameGuess] = {}
+    for guess in guesses:
+        key = normalize_company_name(guess.name).replace(" ", "")
+        existing = combined.get(key)
+        if existing is None:
+            combined[key] = CompanyNameGuess(guess.name, guess.confidence, guess.source)
+        elif guess.source not in existing.source.split("+"):
+            existing.confidence = 1 - (1 - existing.confidence) * (1 - guess.confidence)
+            existing.source += "+" + guess.source
+        else:
+            # The same source repeating a name is weaker evidence
+            existing.confidence = min(0.95, existing.confidence + 0.1)
+    return max(combined.values(), key=lambda g: g.confidence)
@@ -0,0 +1,186 @@
+"""
+Resume document extraction in a process pool.
+
+PDF and DOCX parsing is pure-Python CPU work, so on multi-core hosts it runs
+in worker processes instead of on the event loop (or behind the GIL in a
+thread). Large PDFs are split into page ranges that are extracted in
+parallel, and page texts are joined once at the end. A pool round trip costs
+more than it saves for short PDFs and on single-CPU hosts, so those are
+extracted in a thread instead.
+
+Each document has one CPU time budget, split evenly across its page ranges.
+In pool workers a CPU-time timer interrupts extraction mid-page; in threads
+the budget is checked between pages. The caller also gets a wall-clock
+timeout either way.
+"""
+
+import asyncio
+import io
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import docx
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+# --- Extraction Configuration ---
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 2)))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))  # Smaller PDFs are extracted by one worker
+PDF_IN_PROCESS_MAX_PAGES = int(os.getenv("PDF_IN_PROCESS_MAX_PAGES", "8"))  # PDFs this short skip the pool
+EXTRACTION_CPU_BUDGET_SECONDS = float(os.getenv("EXTRACTION_CPU_BUDGET_SECONDS", "10"))  # Per document
+EXTRACTION_VERSION = "1"  # Bump when extracted text changes, to invalidate cached resume text
+
+
+class ExtractionBudgetExceeded(Exception):
+    """Raised when a document takes more CPU (or wall-clock) time than its budget."""
+
+
+# --- Worker functions (run in the pool; must stay importable without main.py) ---
+def _warm_up() -> int:
+    return os.getpid()
+
+
+@contextmanager
+def _cpu_time_limit(seconds: float) -> Iterator[None]:
+    """Interrupt the block once the process has used seconds more CPU time.
+
+    Only takes effect on a main thread (as in pool workers), since that is
+    where signals are delivered; elsewhere it is a no-op.
+    """
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_limit(signum, frame):
+        raise ExtractionBudgetExceeded(f"PDF extraction exceeded {seconds:.1f}s of CPU time")
+
+    previous = signal.signal(signal.SIGPROF, on_limit)
+    signal.setitimer(signal.ITIMER_PROF, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, previous)
+
+
+def pdf_page_count(data: bytes) -> int:
+    return len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+
+
+def extract_pdf_pages(data: bytes, start: int, end: Optional[int], cpu_budget: float) -> list[str]:
+    """Extract pages [start, end) (end=None for all), stopping once cpu_budget seconds of CPU time are used"""
+    started = time.thread_time()
+    with _cpu_time_limit(cpu_budget):
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        pages = []
+        page_count = len(reader.pages)
+        for index in range(start, page_count if end is None else min(end, page_count)):
+            pages.append(reader.pages[index].extract_text() or "")
+            # Also catches the case where the parser swallowed the timer's exception
+            if time.thread_time() - started > cpu_budget:
+                raise ExtractionBudgetExceeded(f"PDF extraction exceeded {cpu_budget:.1f}s of CPU time")
+    return pages
+
+
+def extract_pdf_text(data: bytes, cpu_budget: float = EXTRACTION_CPU_BUDGET_SECONDS) -> str:
+    """Single-process PDF extraction, for synchronous callers"""
+    return "\n".join(extract_pdf_pages(data, 0, None, cpu_budget))
+
+
+def extract_docx_text(data: bytes) -> str:
+    doc = docx.Document(io.BytesIO(data))
+    return "\n".join(para.text for para in doc.paragraphs)
+
+
+class DocumentExtractor:
+    """Process pool for resume parsing, sized to the machine's cores."""
+
+    def __init__(
+        self,
+        workers: int = EXTRACTION_WORKERS,
+        pages_per_task: int = PDF_PAGES_PER_TASK,
+        cpu_budget: float = EXTRACTION_CPU_BUDGET_SECONDS,
+        in_process_max_pages: int = PDF_IN_PROCESS_MAX_PAGES,
+        use_pool: Optional[bool] = None,
+    ):
+        self.workers = max(1, workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self.cpu_budget = cpu_budget
+        self.in_process_max_pages = in_process_max_pages
+        # With one CPU the workers only add pickling and IPC on top of the same work
+        self.use_pool = (os.cpu_count() or 1) > 1 if use_pool is None else use_pool
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        """Create the pool and spawn its workers ahead of the first upload. Called from the app lifespan."""
+        if self._pool is not None or not self.use_pool:
+            return
+        # "spawn" avoids forking a process that is running an event loop and threads
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        for _ in range(self.workers):
+            self._pool.submit(_warm_up)
+        logger.info("Document extractor started", extra={"workers": self.workers})
+
+    def close(self):
+        """Shut down the worker processes. Called from the app lifespan."""
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        logger.info("Document extractor closed")
+
+    async def _run(self, fn, *args):
+        if not self.use_pool:
+            return await asyncio.to_thread(fn, *args)
+        if self._pool is None:
+            # start() was never called, so this first extraction also pays for spawning the workers
+            self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); replace the pool so later uploads still work
+            logger.warning("Document extraction pool broke; restarting it")
+            self.close()
+            self.start()
+            raise
+
+    async def _with_timeout(self, awaitable, kind: str):
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.cpu_budget * 2)
+        except asyncio.TimeoutError:
+            raise ExtractionBudgetExceeded(f"{kind} extraction took longer than {self.cpu_budget * 2:.0f}s")
+
+    async def extract_pdf(self, data: bytes) -> str:
+        # Counting pages only reads the page tree, so a thread is cheaper than a pool round trip
+        page_count = await asyncio.to_thread(pdf_page_count, data) if self.use_pool else 0
+        if page_count <= self.in_process_max_pages:
+            pages = await self._with_timeout(asyncio.to_thread(extract_pdf_pages, data, 0, None, self.cpu_budget), "PDF")
+            return "\n".join(pages)
+
+        task_count = min(self.workers, math.ceil(page_count / self.pages_per_task))
+        pages_per_range = math.ceil(page_count / task_count)
+        ranges = [(start, start + pages_per_range) for start in range(0, page_count, pages_per_range)]
+        # Ranges share the document's budget, so parallelism cannot multiply it
+        range_budget = self.cpu_budget / len(ranges)
+        tasks = [self._run(extract_pdf_pages, data, start, end, range_budget) for start, end in ranges]
+        page_groups = await self._with_timeout(asyncio.gather(*tasks), "PDF")
+        # One join over all pages keeps assembly linear in the document size
+        return "\n".join(page for group in page_groups for page in group)
+
+    async def extract_docx(self, data: bytes) -> str:
+        return await self._with_timeout(self._run(extract_docx_text, data), "DOCX")
+
+
+# Shared instance used by the upload endpoints
+document_extractor = DocumentExtractor()
@@ -0,0 +1,346 @@
+"""
+Linear-time job posting extraction from HTML.
+
+The page is parsed once with lxml. A single bottom-up pass over the tree
+(reverse document order, so every child is visited before its parent) adds
+up the text and link text of each element and scores the
+containers that hold paragraph-like blocks, Readability style: each block's
+text counts fully for its parent and half for its grandparent, and the score
+is discounted by link density. The best-scoring container is the posting,
+joined by any sibling containers that score nearly as well (postings often
+split "About", "Requirements" and "Responsibilities" into sibling sections).
+Their text is read with one more walk over those subtrees, with line breaks at
+block boundaries, so no subtree is serialized or re-scanned per candidate.
+Non-content elements (scripts, navigation, footers, forms) are skipped in
+both passes.
+
+Most job boards also embed schema.org JobPosting data as JSON-LD, with the
+title, hiring organization, location, salary and the posting itself. When a
+page has it, the posting is built from that data and the heuristics are
+skipped; OpenGraph metadata fills in the title and, for pages with no other
+content, the description.
+"""
+
+import html as html_lib
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import lxml.html
+from lxml import etree
+
+MAX_JOB_TEXT_CHARS = 20000  # Prompts are compacted to a token budget later; this only bounds memory
+MIN_CONTENT_CHARS = 200  # Content containers with less text than this fall back to the whole page
+MIN_PAGE_CHARS = 100  # Less than this is treated as an unrendered JavaScript page
+
+SKIPPED_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "iframe", "canvas", "head",
+    "nav", "header", "footer", "aside", "form", "button", "select", "option",
+})
+BLOCK_TAGS = frozenset({
+    "p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "dd", "dt", "td", "th", "tr",
+    "div", "section", "article", "main", "ul", "ol", "dl", "table", "br", "hr",
+})
+PARAGRAPH_TAGS = frozenset({"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "dd", "td"})
+CONTAINER_TAGS = frozenset({"div", "section", "article", "main", "td", "body"})
+LIST_TAGS = frozenset({"ul", "ol", "dl"})  # Transparent when crediting list items to their container
+SIBLING_SCORE_RATIO = 0.2  # Siblings of the best container scoring at least this share of it are included
+
+# class/id hints, as in Readability
+POSITIVE_HINTS = re.compile(r"job|posting|description|vacanc|career|content|article|main|body|details", re.IGNORECASE)
+NEGATIVE_HINTS = re.compile(
+    r"nav|menu|footer|header|sidebar|comment|cookie|consent|banner|related|similar|share|social|promo|"
+    r"breadcrumb|modal|popup|subscribe|newsletter|legal",
+    re.IGNORECASE,
+)
+XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+WHITESPACE = re.compile(r"[ \t\r\f\v\u00a0]+")
+
+
+@dataclass
+class ExtractedPage:
+    text: str
+    title: str = ""
+    site_name: str = ""
+    company_name: str = ""  # JobPosting hiringOrganization
+    canonical_url: str = ""  # <link rel="canonical"> href, as written in the page
+    source: str = "content"  # "json-ld", "content" (density scoring) or "og:description"
+
+
+@dataclass
+class _PageMetadata:
+    title: str = ""
+    site_name: str = ""
+    og_title: str = ""
+    og_description: str = ""
+    canonical_url: str = ""
+
+
+def parse_html(html: str):
+    """Parse with lxml's HTML parser; returns None for documents it cannot parse"""
+    try:
+        # lxml refuses str input that declares its own encoding
+        return lxml.html.document_fromstring(XML_DECLARATION.sub("", html))
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _hint_weight(el) -> float:
+    hints = f"{el.get('class', '')} {el.get('id', '')}"
+    weight = 1.0
+    if el.tag in ("article", "main"):
+        weight *= 1.5
+    if hints.strip():
+        if POSITIVE_HINTS.search(hints):
+            weight *= 1.25
+        if NEGATIVE_HINTS.search(hints):
+            weight *= 0.5
+    return weight
+
+
+def _text_len(text) -> int:
+    return len(text.strip()) if text else 0
+
+
+def _collect(root) -> tuple[list, _PageMetadata, list[str]]:
+    """All elements in document order, the page metadata and the JSON-LD script bodies"""
+    elements = []
+    metadata = _PageMetadata()
+    json_ld = []
+    for el in root.iter():
+        tag = el.tag if isinstance(el.tag, str) else None
+        if tag == "title" and not metadata.title:
+            metadata.title = (el.text or "").strip()
+        elif tag == "meta":
+            prop = el.get("property") or el.get("name") or ""
+            field = {"og:site_name": "site_name", "og:title": "og_title", "og:description": "og_description"}.get(prop)
+            if field and not getattr(metadata, field):
+                setattr(metadata, field, (el.get("content") or "").strip())
+        elif tag == "link" and "canonical" in (el.get("rel") or "").lower().split() and not metadata.canonical_url:
+            metadata.canonical_url = (el.get("href") or "").strip()
+        elif tag == "script" and (el.get("type") or "").strip().lower() == "application/ld+json" and el.text:
+            json_ld.append(el.text)
+        elements.append(el)
+    return elements, metadata, json_ld
+
+
+def _score_containers(elements: list) -> list:
+    """One bottom-up pass over elements (in document order); returns the content containers, possibly none"""
+    text_len = {}  # Text under the element, skipped subtrees excluded
+    link_len = {}
+    score = {}
+    for el in reversed(elements):
+        tag = el.tag if isinstance(el.tag, str) else None
+        if tag is None or tag in SKIPPED_TAGS:
+            text_len[el] = link_len[el] = 0
+            continue
+        total = _text_len(el.text)
+        links = 0
+        for child in el:
+            total += text_len.get(child, 0) + _text_len(child.tail)
+            links += link_len.get(child, 0)
+        if tag == "a":
+            links = total
+        text_len[el] = total
+        link_len[el] = links
+
+        if tag in PARAGRAPH_TAGS and total >= 25:
+            # Longer paragraphs and ones with commas read more like prose than navigation
+            block_score = 1 + min(3, total / 100) + (el.text or "").count(",")
+            parent = el.getparent()
+            while parent is not None and parent.tag in LIST_TAGS:
+                parent = parent.getparent()
+            if parent is not None:
+                score[parent] = score.get(parent, 0) + block_score
+                grandparent = parent.getparent()
+                if grandparent is not None:
+                    score[grandparent] = score.get(grandparent, 0) + block_score / 2
+
+    weighted = {}
+    for el, raw in score.items():
+        if el.tag in CONTAINER_TAGS and text_len.get(el):
+            weighted[el] = raw * _hint_weight(el) * (1 - link_len[el] / text_len[el])
+    if not weighted:
+        return []
+    best = max(weighted, key=weighted.get)
+    parent = best.getparent()
+    if parent is None:
+        return [best]
+    threshold = weighted[best] * SIBLING_SCORE_RATIO
+    return [el for el in parent if el is best or weighted.get(el, 0) >= threshold]
+
+
+def element_text(el) -> str:
+    """Text of el's subtree, one line per block element, skipping non-content elements"""
+    parts = []
+    walker = etree.iterwalk(el, events=("start", "end"))
+    for event, node in walker:
+        tag = node.tag if isinstance(node.tag, str) else None
+        if event == "start":
+            if tag is None or tag in SKIPPED_TAGS:
+                walker.skip_subtree()
+                continue
+            if tag in BLOCK_TAGS:
+                parts.append("\n")
+            if node.text:
+                parts.append(node.text)
+        else:
+            if tag in BLOCK_TAGS:
+                parts.append("\n")
+            if node is not el and node.tail:
+                parts.append(node.tail)
+    lines = (WHITESPACE.sub(" ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def extract_page(html: str) -> ExtractedPage:
+    """Job text, <title> and og:site_name of an HTML page; text is "" when the page has no content"""
+    root = parse_html(html)
+    return extract_from_tree(root) if root is not None else ExtractedPage(text="")
+
+
+def extract_from_tree(root) -> ExtractedPage:
+    elements, metadata, json_ld = _collect(root)
+    title = metadata.title or metadata.og_title
+
+    posting = find_job_posting(json_ld)
+    if posting is not None:
+        text, company_name = job_posting_text(posting)
+        if len(text) >= MIN_PAGE_CHARS:
+            return ExtractedPage(
+                text=text[:MAX_JOB_TEXT_CHARS], title=title, site_name=metadata.site_name,
+                company_name=company_name, canonical_url=metadata.canonical_url, source="json-ld",
+            )
+
+    source = "content"
+    text = "\n".join(element_text(el) for el in _score_containers(elements))
+    if len(text) < MIN_CONTENT_CHARS:
+        body = root.find("body")
+        text = element_text(body if body is not None else root)
+    if len(text) < MIN_PAGE_CHARS and len(metadata.og_description) >= MIN_PAGE_CHARS:
+        # JavaScript shells sometimes describe the posting only in their share metadata
+        text, source = metadata.og_description, "og:description"
+    if len(text) < MIN_PAGE_CHARS:
+        text = ""
+    return ExtractedPage(
+        text=text[:MAX_JOB_TEXT_CHARS], title=title, site_name=metadata.site_name,
+        canonical_url=metadata.canonical_url, source=source,
+    )
+
+
+# --- schema.org JobPosting ---
+
+def _has_type(node: dict, type_name: str) -> bool:
+    types = node.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return any(isinstance(t, str) and t.rsplit("/", 1)[-1] == type_name for t in types)
+
+
+def _find_typed(node: Any, type_name: str, depth: int = 0) -> Optional[dict]:
+    # JSON-LD may be one object, a list of them, or an @graph; postings are never nested deeply
+    if depth > 4:
+        return None
+    if isinstance(node, list):
+        for item in node:
+            found = _find_typed(item, type_name, depth + 1)
+            if found is not None:
+                return found
+    elif isinstance(node, dict):
+        if _has_type(node, type_name):
+            return node
+        if "@graph" in node:
+            return _find_typed(node["@graph"], type_name, depth + 1)
+    return None
+
+
+def find_job_posting(json_ld: list[str]) -> Optional[dict]:
+    """The first schema.org JobPosting in the page's JSON-LD blocks, or None"""
+    for body in json_ld:
+        try:
+            # strict=False: boards often put raw newlines inside description strings
+            data = json.loads(body.strip().removeprefix("<![CDATA[").removesuffix("]]>"), strict=False)
+        except ValueError:
+            continue
+        posting = _find_typed(data, "JobPosting")
+        if posting is not None:
+            return posting
+    return None
+
+
+def _name(value: Any) -> str:
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _as_list(value: Any) -> list:
+    return value if isinstance(value, list) else [value] if value else []
+
+
+def _amount(value: Any) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"{value:,.0f}" if value == int(value) else f"{value:,.2f}"
+    return str(value).strip() if value else ""
+
+
+def _salary(base_salary: Any) -> str:
+    if not isinstance(base_salary, dict):
+        return _amount(base_salary)
+    currency = base_salary.get("currency") or ""
+    value = base_salary.get("value")
+    unit = ""
+    if isinstance(value, dict):
+        unit = value.get("unitText") or ""
+        low, high = _amount(value.get("minValue")), _amount(value.get("maxValue"))
+        amount = f"{low} - {high}" if low and high and low != high else low or high or _amount(value.get("value"))
+    else:
+        amount = _amount(value)
+    if not amount:
+        return ""
+    return " ".join(part for part in (currency, amount, f"per {unit.lower()}" if unit else "") if part)
+
+
+def _locations(posting: dict) -> str:
+    places = []
+    for location in _as_list(posting.get("jobLocation")):
+        address = location.get("address") if isinstance(location, dict) else None
+        if isinstance(address, dict):
+            parts = [_name(address.get(key)) for key in ("addressLocality", "addressRegion", "addressCountry")]
+            place = ", ".join(part for part in parts if part)
+        else:
+            place = _name(address) or _name(location)
+        if place and place not in places:
+            places.append(place)
+    if "TELECOMMUTE" in str(posting.get("jobLocationType", "")).upper():
+        places.append("Remote")
+    return "; ".join(places)
+
+
+def description_text(description: str) -> str:
+    """Plain text of a JobPosting description, which is usually HTML (sometimes entity-escaped twice)"""
+    if "&lt;" in description and "<" not in description:
+        description = html_lib.unescape(description)
+    try:
+        fragment = lxml.html.fragment_fromstring(description, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return WHITESPACE.sub(" ", description).strip()
+    return element_text(fragment)
+
+
+def job_posting_text(posting: dict) -> tuple[str, str]:
+    """Job text built from a JobPosting (title, company, details, then the description) and the company name"""
+    company_name = _name(posting.get("hiringOrganization"))
+    details = [
+        ("Location", _locations(posting)),
+        ("Employment type", ", ".join(
+            str(t).replace("_", " ").capitalize() for t in _as_list(posting.get("employmentType")) if isinstance(t, str)
+        )),
+        ("Salary", _salary(posting.get("baseSalary"))),
+    ]
+    lines = [line for line in (_name(posting.get("title")), company_name) if line]
+    lines += [f"{label}: {value}" for label, value in details if value]
+    description = posting.get("description")
+    if not isinstance(description, str) or not description.strip():
+        return "", company_name
+    return "\n".join(lines + [description_text(description)]), company_name
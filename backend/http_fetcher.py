@@ -0,0 +1,185 @@
+"""
+Async pooled HTTP fetcher for the basic scraping path.
+
+One httpx.AsyncClient is shared for the life of the app, so connections to a
+job board are kept alive and reused between scrapes (HTTP/2 is negotiated when
+the optional h2 package is installed). Bodies are streamed and cut off at a
+configurable size so a huge page cannot exhaust memory, then decoded using the
+declared or sniffed charset.
+"""
+
+import codecs
+import importlib.util
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+import httpx
+
+from metrics import time_stage
+
+logger = logging.getLogger(__name__)
+
+# --- Fetcher Configuration ---
+SCRAPE_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_TIMEOUT_SECONDS", "10"))
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))  # Body cutoff per page
+SCRAPE_MAX_CONNECTIONS = int(os.getenv("SCRAPE_MAX_CONNECTIONS", "100"))
+SCRAPE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SCRAPE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_\-:.]+)""", re.IGNORECASE)
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+@dataclass
+class FetchResult:
+    url: str  # Final URL after redirects
+    status_code: int
+    headers: httpx.Headers
+    text: str
+    encoding: str
+    truncated: bool  # True when the body was cut off at max_bytes
+
+
+def _valid_codec(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip().strip("'\"")).name
+    except LookupError:
+        return None
+
+
+def detect_encoding(content_type: Optional[str], body: bytes, truncated: bool = False) -> str:
+    """Pick a charset: Content-Type header, then BOM, then <meta> tag, then UTF-8, then Windows-1252."""
+    if content_type:
+        match = re.search(r"charset\s*=\s*([^\s;]+)", content_type, re.IGNORECASE)
+        encoding = _valid_codec(match.group(1)) if match else None
+        if encoding:
+            return encoding
+
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding
+
+    match = META_CHARSET_RE.search(body[:4096])
+    encoding = _valid_codec(match.group(1).decode("ascii", "ignore")) if match else None
+    if encoding:
+        return encoding
+
+    try:
+        body.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # A multi-byte character split by the size cutoff is still UTF-8
+        if truncated and e.start >= len(body) - 3 and e.reason == "unexpected end of data":
+            return "utf-8"
+
+    # The HTML spec's fallback for undeclared legacy (mostly Western) pages
+    return "cp1252"
+
+
+class HttpFetcher:
+    """Shared keep-alive HTTP client with streamed, size-capped downloads."""
+
+    def __init__(
+        self,
+        timeout: float = SCRAPE_TIMEOUT_SECONDS,
+        max_bytes: int = SCRAPE_MAX_BYTES,
+        max_connections: int = SCRAPE_MAX_CONNECTIONS,
+        max_keepalive_connections: int = SCRAPE_MAX_KEEPALIVE_CONNECTIONS,
+    ):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """Create the connection pool. Called from the app lifespan."""
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            follow_redirects=True,
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+            ),
+            headers=DEFAULT_HEADERS,
+        )
+        logger.info("HTTP fetcher started", extra={"http2": HTTP2_AVAILABLE, "max_bytes": self.max_bytes})
+
+    async def close(self):
+        """Close pooled connections. Called from the app lifespan."""
+        if self._client is None:
+            return
+        await self._client.aclose()
+        self._client = None
+        logger.info("HTTP fetcher closed")
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> FetchResult:
+        """GET a page, streaming at most max_bytes of the decoded body. Raises on HTTP errors.
+
+        A 304 Not Modified answer to a conditional request is returned with an empty body.
+        """
+        if self._client is None:
+            # No lifespan ran (main.py's scraping helpers imported on their own): open the pool on first fetch
+            await self.start()
+        assert self._client is not None
+        with time_stage("fetch"):
+            return await self._fetch(url, headers, max_bytes or self.max_bytes)
+
+    async def _fetch(self, url: str, headers: Optional[Mapping[str, str]], limit: int) -> FetchResult:
+        assert self._client is not None
+        chunks = []
+        size = 0
+        truncated = False
+        async with self._client.stream("GET", url, headers=headers) as resp:
+            if resp.status_code == 304:
+                return FetchResult(url=str(resp.url), status_code=304, headers=resp.headers, text="", encoding="utf-8", truncated=False)
+            resp.raise_for_status()
+            async for chunk in resp.aiter_bytes():
+                remaining = limit - size
+                if len(chunk) > remaining:
+                    chunks.append(chunk[:remaining])
+                    size += remaining
+                    truncated = True
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+
+        body = b"".join(chunks)
+        encoding = detect_encoding(resp.headers.get("content-type"), body, truncated)
+        return FetchResult(
+            url=str(resp.url),
+            status_code=resp.status_code,
+            headers=resp.headers,
+            text=body.decode(encoding, errors="replace"),
+            encoding=encoding,
+            truncated=truncated,
+        )
+
+
+# Shared instance used by the scraping endpoints
+http_fetcher = HttpFetcher()
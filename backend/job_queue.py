@@ -0,0 +1,433 @@
+"""
+Durable background job queue.
+
+Long-running work (scraping plus company research, resume analysis) can be
+submitted as a job instead of holding an HTTP request open. Jobs are rows in
+a SQLite table, so they survive restarts and are shared by every worker
+process on the machine, and each process runs a small pool of asyncio workers
+that claim queued jobs in order. A running job holds a lease that its worker
+keeps extending; if the process dies, the lease runs out and another worker
+picks the job up again. Submitting a job identical to one that is still
+pending returns the pending job instead of doing the work twice. Clients poll
+or long-poll for the current stage and the result.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# --- Job Queue Configuration ---
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))  # Jobs run concurrently per server process
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))  # Unrenewed running jobs are retried after this
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))  # Finished jobs are kept this long
+JOB_IDLE_POLL_SECONDS = 2.0  # Idle workers check for jobs submitted by other processes this often
+JOB_WAIT_POLL_SECONDS = 1.0  # Long-polls check for progress made by other processes this often
+JOB_CLEANUP_INTERVAL_SECONDS = 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+PENDING_STATUSES = (QUEUED, RUNNING)
+
+ProgressFn = Callable[[str], Awaitable[None]]
+# A handler gets the job payload and a callback to report the stage it is entering
+JobHandler = Callable[[dict, ProgressFn], Awaitable[Any]]
+
+
+class PermanentJobError(Exception):
+    """Fails the job without retrying, e.g. for a posting that could not be scraped."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str
+    stage: Optional[str] = None
+    stages: list = field(default_factory=list)  # [{"name", "started_at", "finished_at"}]
+    result: Any = None
+    error: Optional[dict] = None  # {"status_code", "detail"}
+    attempts: int = 0
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    payload: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> dict:
+        """The client-facing view (the payload is not echoed back)"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "stages": self.stages,
+            "result": self.result,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+JOB_COLUMNS = "id, kind, status, stage, stages, result, error, attempts, created_at, updated_at, payload"
+
+
+def _job_from_row(row) -> Job:
+    id_, kind, status, stage, stages, result, error, attempts, created_at, updated_at, payload = row
+    return Job(
+        id=id_,
+        kind=kind,
+        status=status,
+        stage=stage,
+        stages=json.loads(stages),
+        result=json.loads(result) if result is not None else None,
+        error=json.loads(error) if error is not None else None,
+        attempts=attempts,
+        created_at=created_at,
+        updated_at=updated_at,
+        payload=json.loads(payload),
+    )
+
+
+class JobQueue:
+    """SQLite-backed job queue with an in-process asyncio worker pool."""
+
+    def __init__(
+        self,
+        db_path: str,
+        workers: int = JOB_WORKERS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retention_seconds: float = JOB_RETENTION_SECONDS,
+    ):
+        self.db_path = db_path or ":memory:"  # In memory: jobs do not survive a restart
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self._handlers: dict[str, JobHandler] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._waiters: dict[str, set[asyncio.Event]] = {}  # Long polls in this process, by job id
+        self._last_cleanup = 0.0
+
+    def register(self, kind: str, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    async def start(self):
+        """Start the worker pool. Called from the app lifespan."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self._cleanup)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("Job queue started", extra={"workers": self.workers, "db_path": self.db_path})
+
+    async def close(self):
+        """Stop the workers; jobs they were running go back in the queue. Called from the app lifespan."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+        logger.info("Job queue closed")
+
+    # --- Public API ---
+    async def submit(self, kind: str, payload: dict) -> tuple[Job, bool]:
+        """Queue a job; returns (job, created). An identical pending job is returned instead of a new one."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind!r}")
+        job, created = await asyncio.to_thread(self._submit, kind, payload, make_cache_key(kind, payload))
+        if created and self._wakeup is not None:
+            self._wakeup.set()
+        return job, created
+
+    async def find_pending(self, kind: str, payload: dict) -> Optional[Job]:
+        """The queued or running job identical to this one, if any"""
+        return await asyncio.to_thread(self._find_pending, make_cache_key(kind, payload))
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Long-poll: the job once it has finished, or as it stands after timeout seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.finished or remaining <= 0:
+                return job
+            event = asyncio.Event()
+            self._waiters.setdefault(job_id, set()).add(event)
+            try:
+                # Finishing in this process sets the event; other processes are caught by polling
+                await asyncio.wait_for(event.wait(), min(remaining, JOB_WAIT_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                # Jobs run by another process never notify this one, so each poll removes its own event
+                events = self._waiters.get(job_id)
+                if events is not None:
+                    events.discard(event)
+                    if not events:
+                        del self._waiters[job_id]
+
+    # --- Workers ---
+    async def _worker(self):
+        assert self._wakeup is not None
+        while True:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self._claim)
+            if job is None:
+                if time.time() - self._last_cleanup > JOB_CLEANUP_INTERVAL_SECONDS:
+                    await asyncio.to_thread(self._cleanup)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_IDLE_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Job):
+        handler = self._handlers.get(job.kind)
+        logger.info("Job started", extra={"job_id": job.id, "kind": job.kind, "attempt": job.attempts})
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, job.attempts))
+
+        async def progress(stage: str):
+            await asyncio.to_thread(self._set_stage, job.id, job.attempts, stage)
+            self._notify(job.id)
+
+        written = True
+        try:
+            if handler is None:
+                raise PermanentJobError(500, f"No handler for job kind {job.kind!r}")
+            result = await handler(job.payload, progress)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without counting the attempt (synchronously, as we are cancelled)
+            self._requeue(job.id, job.attempts, delay=0, count_attempt=False)
+            raise
+        except PermanentJobError as e:
+            logger.info("Job failed: %s", e.detail, extra={"job_id": job.id, "kind": job.kind})
+            error = {"status_code": e.status_code, "detail": e.detail}
+            written = await asyncio.to_thread(self._finish, job.id, job.attempts, FAILED, None, error)
+        except Exception as e:
+            if job.attempts < self.max_attempts:
+                delay = 2 ** job.attempts
+                logger.warning(
+                    "Job attempt failed (%s), retrying in %ss", e, delay, extra={"job_id": job.id, "attempt": job.attempts}
+                )
+                written = await asyncio.to_thread(self._requeue, job.id, job.attempts, delay)
+            else:
+                logger.error("Job failed after %s attempts: %s", job.attempts, e, extra={"job_id": job.id, "kind": job.kind})
+                error = {"status_code": 500, "detail": "Job failed. Please try again later."}
+                written = await asyncio.to_thread(self._finish, job.id, job.attempts, FAILED, None, error)
+        else:
+            logger.info("Job succeeded", extra={"job_id": job.id, "kind": job.kind})
+            written = await asyncio.to_thread(self._finish, job.id, job.attempts, SUCCEEDED, result, None)
+        finally:
+            heartbeat.cancel()
+            self._notify(job.id)
+        if not written:
+            # Our lease expired and another worker reclaimed the job; its attempt owns the row now
+            logger.warning("Job lease lost, outcome discarded", extra={"job_id": job.id, "attempt": job.attempts})
+
+    async def _heartbeat(self, job_id: str, attempt: int):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await asyncio.to_thread(self._extend_lease, job_id, attempt)
+
+    def _notify(self, job_id: str):
+        for event in self._waiters.pop(job_id, ()):
+            event.set()
+
+    # --- Storage (runs in a worker thread) ---
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.db_path) if self.db_path != ":memory:" else ""
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit mode; claims and submissions use explicit BEGIN IMMEDIATE transactions
+            db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, dedup_key TEXT NOT NULL, payload TEXT NOT NULL, "
+                "status TEXT NOT NULL, stage TEXT, stages TEXT NOT NULL DEFAULT '[]', result TEXT, error TEXT, "
+                "attempts INTEGER NOT NULL DEFAULT 0, available_at REAL NOT NULL, lease_expires_at REAL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, available_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs(dedup_key, status)")
+            self._db = db
+        return self._db
+
+    def _find_pending(self, dedup_key: str) -> Optional[Job]:
+        with self._db_lock:
+            row = self._connection().execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs WHERE dedup_key = ? AND status IN (?, ?) LIMIT 1",
+                (dedup_key, *PENDING_STATUSES),
+            ).fetchone()
+        return _job_from_row(row) if row else None
+
+    def _submit(self, kind: str, payload: dict, dedup_key: str) -> tuple[Job, bool]:
+        now = time.time()
+        with self._db_lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    f"SELECT {JOB_COLUMNS} FROM jobs WHERE dedup_key = ? AND status IN (?, ?) LIMIT 1",
+                    (dedup_key, *PENDING_STATUSES),
+                ).fetchone()
+                if row is not None:
+                    db.execute("COMMIT")
+                    return _job_from_row(row), False
+                job = Job(id=secrets.token_urlsafe(16), kind=kind, status=QUEUED, created_at=now, updated_at=now, payload=payload)
+                db.execute(
+                    "INSERT INTO jobs (id, kind, dedup_key, payload, status, available_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job.id, kind, dedup_key, json.dumps(payload), QUEUED, now, now, now),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return job, True
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        with self._db_lock:
+            row = self._connection().execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_from_row(row) if row else None
+
+    def _claim(self) -> Optional[Job]:
+        """Take the oldest runnable job: queued and due, or running with an expired lease (its worker died)"""
+        now = time.time()
+        with self._db_lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = db.execute(
+                        f"SELECT {JOB_COLUMNS} FROM jobs WHERE (status = ? AND available_at <= ?) "
+                        "OR (status = ? AND lease_expires_at < ?) ORDER BY created_at LIMIT 1",
+                        (QUEUED, now, RUNNING, now),
+                    ).fetchone()
+                    if row is None:
+                        db.execute("COMMIT")
+                        return None
+                    job = _job_from_row(row)
+                    if job.attempts >= self.max_attempts:
+                        # Its worker kept dying mid-job
+                        error = {"status_code": 500, "detail": "Job failed. Please try again later."}
+                        db.execute(
+                            "UPDATE jobs SET status = ?, error = ?, payload = '{}', updated_at = ? WHERE id = ?",
+                            (FAILED, json.dumps(error), now, job.id),
+                        )
+                        continue
+                    job.status = RUNNING
+                    job.attempts += 1
+                    db.execute(
+                        "UPDATE jobs SET status = ?, attempts = ?, lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                        (RUNNING, job.attempts, now + self.lease_seconds, now, job.id),
+                    )
+                    db.execute("COMMIT")
+                    return job
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    # Writes by a worker only apply while it still holds the job: running, and on the attempt it claimed.
+    # Once its lease expires another worker may reclaim the job, and the stale worker's writes must not land.
+    def _set_stage(self, job_id: str, attempt: int, stage: str) -> bool:
+        now = time.time()
+        with self._db_lock:
+            db = self._connection()
+            (stages_json,) = db.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            stages = json.loads(stages_json)
+            if stages and stages[-1]["finished_at"] is None:
+                stages[-1]["finished_at"] = now
+            stages.append({"name": stage, "started_at": now, "finished_at": None})
+            cursor = db.execute(
+                "UPDATE jobs SET stage = ?, stages = ?, lease_expires_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND attempts = ?",
+                (stage, json.dumps(stages), now + self.lease_seconds, now, job_id, RUNNING, attempt),
+            )
+        return cursor.rowcount > 0
+
+    def _extend_lease(self, job_id: str, attempt: int) -> bool:
+        with self._db_lock:
+            cursor = self._connection().execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (time.time() + self.lease_seconds, job_id, RUNNING, attempt),
+            )
+        return cursor.rowcount > 0
+
+    def _finish(self, job_id: str, attempt: int, status: str, result: Any, error: Optional[dict]) -> bool:
+        now = time.time()
+        with self._db_lock:
+            db = self._connection()
+            (stages_json,) = db.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            stages = json.loads(stages_json)
+            if stages and stages[-1]["finished_at"] is None:
+                stages[-1]["finished_at"] = now
+            # The payload (resume text, job descriptions) is not needed once the job is done
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, stages = ?, payload = '{}', "
+                "lease_expires_at = NULL, updated_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    json.dumps(error) if error is not None else None,
+                    json.dumps(stages),
+                    now,
+                    job_id,
+                    RUNNING,
+                    attempt,
+                ),
+            )
+        return cursor.rowcount > 0
+
+    def _requeue(self, job_id: str, attempt: int, delay: float, count_attempt: bool = True) -> bool:
+        now = time.time()
+        with self._db_lock:
+            cursor = self._connection().execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - ?, available_at = ?, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (QUEUED, 0 if count_attempt else 1, now + delay, now, job_id, RUNNING, attempt),
+            )
+        return cursor.rowcount > 0
+
+    def _cleanup(self):
+        now = time.time()
+        self._last_cleanup = now
+        with self._db_lock:
+            self._connection().execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (SUCCEEDED, FAILED, now - self.retention_seconds),
+            )
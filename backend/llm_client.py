@@ -0,0 +1,202 @@
+"""
+Shared async LLM client.
+
+All OpenAI calls go through a single AsyncOpenAI instance so the event loop is
+never blocked waiting on the model, HTTP connections are pooled between
+requests, and the number of completions in flight is capped. Identical
+completions requested while one is already running share its answer.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Optional
+
+import openai
+
+from cache import make_cache_key
+from metrics import STAGE_SECONDS, time_stage
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# --- LLM Client Configuration ---
+DEFAULT_MODEL = "gpt-4o-mini"
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))  # Max completions in flight per worker
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))  # Pooled HTTP connections to the API
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))  # Total time allowed per completion
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+
+class LLMClient:
+    """Async chat-completion client with pooled connections and a concurrency cap."""
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        connect_timeout: float = LLM_CONNECT_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self._client: Optional[openai.AsyncOpenAI] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._completions = SingleFlight("llm_completion")
+
+    async def start(self):
+        """Create the underlying HTTP pool. Called from the app lifespan."""
+        try:
+            self._ensure_client()
+        except openai.OpenAIError as e:
+            # Keep the server up without a key, matching the startup warning in main.py;
+            # completions will fail with the same error until a key is configured.
+            logger.warning("LLM client not started: %s", e)
+            return
+        logger.info(
+            "LLM client started",
+            extra={"max_concurrency": self.max_concurrency, "max_connections": self.max_connections},
+        )
+
+    def _ensure_client(self):
+        if self._client is not None:
+            return
+        # Built from the SDK's own classes: newer openai releases ship their own httpx fork
+        http_client = openai.DefaultAsyncHttpxClient(
+            limits=type(openai.DEFAULT_CONNECTION_LIMITS)(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            timeout=openai.Timeout(self.timeout, connect=self.connect_timeout),
+        )
+        # The API key (and optional OPENAI_BASE_URL) are read from the environment
+        self._client = openai.AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=http_client,
+            max_retries=self.max_retries,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        """Close pooled connections. Called from the app lifespan."""
+        if self._client is None:
+            return
+        await self._client.close()
+        self._client = None
+        self._semaphore = None
+        logger.info("LLM client closed")
+
+    async def complete(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        model: str = DEFAULT_MODEL,
+        response_format: Optional[dict] = None,
+    ) -> str:
+        """Run a single-message chat completion and return the text content.
+
+        Pass response_format (e.g. a JSON schema) to request structured output.
+        """
+        key = make_cache_key(model, prompt, max_tokens, temperature, response_format)
+        return await self._completions.do(
+            key, lambda: self._complete(prompt, max_tokens, temperature, model, response_format)
+        )
+
+    async def _complete(
+        self, prompt: str, max_tokens: int, temperature: float, model: str, response_format: Optional[dict]
+    ) -> str:
+        # Built lazily when start() never ran, e.g. if the OpenAI key was set after startup
+        self._ensure_client()
+        assert self._client is not None and self._semaphore is not None
+
+        with time_stage("llm_queue"):
+            await self._semaphore.acquire()
+        try:
+            with time_stage("llm_call"):
+                response = await self._client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **({"response_format": response_format} if response_format else {}),
+                )
+        finally:
+            self._semaphore.release()
+        # Content may be None, so default to empty string
+        return response.choices[0].message.content or ""
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        model: str = DEFAULT_MODEL,
+        response_format: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """Run a streaming chat completion, yielding text deltas as they arrive."""
+        self._ensure_client()
+        assert self._client is not None and self._semaphore is not None
+
+        with time_stage("llm_queue"):
+            await self._semaphore.acquire()
+        # llm_call counts only time spent waiting on the API: the consumer's time between
+        # yields (e.g. writing SSE events to a slow client) would otherwise read as model latency
+        upstream_seconds = 0.0
+        outcome = "ok"
+
+        async def upstream(awaitable):
+            nonlocal upstream_seconds
+            started = time.perf_counter()
+            try:
+                return await awaitable
+            finally:
+                upstream_seconds += time.perf_counter() - started
+
+        try:
+            stream = await upstream(
+                self._client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    **({"response_format": response_format} if response_format else {}),
+                )
+            )
+            chunks = aiter(stream)
+            first_token = True
+            try:
+                while True:
+                    try:
+                        chunk = await upstream(anext(chunks))
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if first_token:
+                            first_token = False
+                            # Nothing has been yielded yet, so upstream time so far is the time to first token
+                            STAGE_SECONDS.observe(upstream_seconds, stage="llm_first_token", outcome="ok")
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Stops generation upstream if the client went away mid-stream
+                await stream.close()
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            STAGE_SECONDS.observe(upstream_seconds, stage="llm_call", outcome=outcome)
+            self._semaphore.release()
+
+
+# Shared instance used by all endpoints
+llm_client = LLMClient()
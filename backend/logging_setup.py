@@ -0,0 +1,74 @@
+"""
+Logging configuration.
+
+Every module logs through the standard library (logging.getLogger(__name__))
+with structured context passed as `extra` fields. Records are written to
+stderr either as text with key=value context or as one JSON object per line
+(LOG_FORMAT=json) for log shippers. Request payloads (resumes, job
+descriptions, model output) can be large and personal, so log_payload only
+writes them when LOG_PAYLOADS is enabled.
+"""
+
+import json
+import logging
+import os
+import time
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json"
+LOG_PAYLOADS = os.getenv("LOG_PAYLOADS", "false").lower() in ("1", "true", "yes")
+PAYLOAD_PREVIEW_CHARS = 2000  # Longest payload logged, even with LOG_PAYLOADS
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value!r}" if isinstance(value, str) else f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging():
+    """Install the handler on the root logger (once; an already configured root logger is left alone)"""
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    # httpx logs every request line at INFO
+    logging.getLogger("httpx").setLevel(max(logging.WARNING, root.level))
+
+
+def log_payload(logger: logging.Logger, label: str, text: str):
+    """Log a request or response body, only when LOG_PAYLOADS is enabled"""
+    if not LOG_PAYLOADS:
+        return
+    preview = text if len(text) <= PAYLOAD_PREVIEW_CHARS else text[:PAYLOAD_PREVIEW_CHARS] + "..."
+    logger.info("%s:\n%s", label, preview, extra={"chars": len(text)})
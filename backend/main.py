@@ -1,23 +1,159 @@
 import os
-import openai
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+import hashlib
+import logging
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request, Response
 from pydantic import BaseModel
 import time
 import re
-import PyPDF2
-from typing import Optional
-import docx
-import requests
-from bs4 import BeautifulSoup
+from typing import Optional, List, Literal, Mapping
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import asyncio
+import dataclasses
+import json
+import httpx
+from urllib.parse import urljoin
+from contextlib import asynccontextmanager, aclosing
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+from llm_client import llm_client, DEFAULT_MODEL
+from cache import TieredCache, make_cache_key, normalize_text
+from browser_pool import browser_pool, BrowserUnavailableError
+from page_rendering import block_resources, wait_until_ready
+from http_fetcher import http_fetcher
+from scrape_strategy import scrape_strategy, ScrapedPage
+from single_flight import SingleFlight
+from scrape_cache import conditional_headers, normalize_url, page_from_entry, page_to_entry, page_urls
+from company_names import COMPANY_NAME_MIN_CONFIDENCE, CompanyNameGuess, guess_company_name, normalize_company_name
+from rate_limiter import RateLimiter, EndpointRule, MemoryBackend, SQLiteBackend
+from uploads import UploadSizeLimitMiddleware, read_upload_bytes
+from document_extraction import document_extractor, extract_pdf_text, ExtractionBudgetExceeded, EXTRACTION_VERSION
+from fast_scoring import score_jobs, score_resume
+from html_extraction import extract_page
+from job_queue import JobQueue, PermanentJobError, ProgressFn
+from logging_setup import configure_logging, log_payload
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    PROMPT_TOKENS_SAVED,
+    MetricsMiddleware,
+    render as render_metrics,
+    time_stage,
+)
+from prompt_compaction import CompactedText, compact_job_description, compact_resume, load_tokenizer
+from stream_parsing import AnalysisStreamParser, CompanyResearchStreamParser, parse_company_sections, sse_event
+from structured_output import (
+    ANALYSIS_RESPONSE_FORMAT,
+    COMPANY_RESEARCH_RESPONSE_FORMAT,
+    FUSED_COMPANY_RESEARCH_RESPONSE_FORMAT,
+    parse_analysis_json,
+    parse_company_research_json,
+    parse_fused_company_research_json,
+)
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# --- Resume Analysis Cache Configuration ---
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))  # In-memory LRU size
+ANALYSIS_CACHE_DB_PATH = os.getenv("ANALYSIS_CACHE_DB_PATH", "")  # Set to enable the SQLite tier
+ANALYSIS_CACHE_MAX_DISK_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_DISK_ENTRIES", "10000"))
+
+analysis_cache = TieredCache(
+    "analysis",
+    ttl_seconds=ANALYSIS_CACHE_TTL_SECONDS,
+    max_memory_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+    db_path=ANALYSIS_CACHE_DB_PATH,
+    max_disk_entries=ANALYSIS_CACHE_MAX_DISK_ENTRIES,
+)
+
+# --- Company Research Cache Configuration ---
+# Company facts change slowly, so research is kept for a long time and persisted to disk by default
+DEFAULT_CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "jobflow_cache.sqlite3")
+COMPANY_CACHE_TTL_SECONDS = float(os.getenv("COMPANY_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+COMPANY_CACHE_MAX_ENTRIES = int(os.getenv("COMPANY_CACHE_MAX_ENTRIES", "512"))
+COMPANY_CACHE_DB_PATH = os.getenv("COMPANY_CACHE_DB_PATH", DEFAULT_CACHE_DB_PATH)  # Set to "" to keep in memory only
+
+company_cache = TieredCache(
+    "company_research",
+    ttl_seconds=COMPANY_CACHE_TTL_SECONDS,
+    max_memory_entries=COMPANY_CACHE_MAX_ENTRIES,
+    db_path=COMPANY_CACHE_DB_PATH,
+)
+
+# --- Extracted Resume Text Cache Configuration ---
+# Keyed by the SHA-256 of the uploaded file, so re-uploading the same resume skips parsing
+RESUME_TEXT_CACHE_TTL_SECONDS = float(os.getenv("RESUME_TEXT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+RESUME_TEXT_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_TEXT_CACHE_MAX_ENTRIES", "256"))  # In-memory LRU size
+RESUME_TEXT_CACHE_DB_PATH = os.getenv("RESUME_TEXT_CACHE_DB_PATH", "")  # Set to enable the SQLite tier
+
+resume_text_cache = TieredCache(
+    "resume_text",
+    ttl_seconds=RESUME_TEXT_CACHE_TTL_SECONDS,
+    max_memory_entries=RESUME_TEXT_CACHE_MAX_ENTRIES,
+    db_path=RESUME_TEXT_CACHE_DB_PATH,
+)
+
+# --- Scrape Cache Configuration ---
+# Scraped postings by normalized URL (scrape_cache.py). Fresh entries are served as-is; older ones are
+# revalidated with a conditional GET. Bump SCRAPE_CACHE_VERSION whenever the HTML extraction changes.
+SCRAPE_CACHE_VERSION = "3"  # 3: generic query parameters (ref, source, ...) are kept in cache keys
+SCRAPE_CACHE_TTL_SECONDS = float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+SCRAPE_CACHE_FRESH_SECONDS = float(os.getenv("SCRAPE_CACHE_FRESH_SECONDS", "3600"))  # Served without revalidating
+SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "1024"))  # In-memory LRU size
+SCRAPE_CACHE_DB_PATH = os.getenv("SCRAPE_CACHE_DB_PATH", "")  # Set to enable the SQLite tier
+
+scrape_cache = TieredCache(
+    "scrape",
+    ttl_seconds=SCRAPE_CACHE_TTL_SECONDS,
+    max_memory_entries=SCRAPE_CACHE_MAX_ENTRIES,
+    db_path=SCRAPE_CACHE_DB_PATH,
+)
+
+# --- Request Coalescing ---
+# Research or a scrape requested again while an identical one is still running waits for that one
+# (single_flight.py) instead of repeating it; identical LLM completions are coalesced in llm_client
+company_research_flights = SingleFlight("company_research")
+scrape_flights = SingleFlight("scrape")
+
+# --- Background Job Configuration ---
+# Jobs (job_queue.py) live in SQLite so they survive restarts and are shared by every worker process
+JOB_QUEUE_DB_PATH = os.getenv("JOB_QUEUE_DB_PATH", DEFAULT_CACHE_DB_PATH)  # Set to "" to keep in memory only
+JOB_MAX_WAIT_SECONDS = float(os.getenv("JOB_MAX_WAIT_SECONDS", "30"))  # Longest long-poll on GET /jobs/{job_id}
+
+job_queue = JobQueue(JOB_QUEUE_DB_PATH)
+
+
+# --- App Lifespan: start and stop shared clients ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await llm_client.start()
+    await http_fetcher.start()
+    await browser_pool.start()
+    document_extractor.start()
+    await asyncio.to_thread(load_tokenizer)
+    await job_queue.start()
+    try:
+        yield
+    finally:
+        # First, so jobs still running are handed back to the queue before their clients go away
+        await job_queue.close()
+        await browser_pool.close()
+        document_extractor.close()
+        await http_fetcher.close()
+        await llm_client.close()
+        analysis_cache.close()
+        company_cache.close()
+        resume_text_cache.close()
+        scrape_cache.close()
+        rate_limiter.close()
+
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Allow CORS for local development
 app.add_middleware(
@@ -28,26 +164,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized resume uploads while they are still streaming in
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Time every request (outermost, so rejected uploads are counted too)
+app.add_middleware(MetricsMiddleware)
+
 # Set OpenAI API key from environment variable (never hardcode secrets)
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
-    print("WARNING: OPENAI_API_KEY environment variable is not set!")
-    print("Please set it using: export OPENAI_API_KEY='your-key-here'")
-    print("Or create a .env file with: OPENAI_API_KEY=your-key-here")
+    logger.warning(
+        "OPENAI_API_KEY environment variable is not set! Set it with: export OPENAI_API_KEY='your-key-here' "
+        "or create a .env file with: OPENAI_API_KEY=your-key-here"
+    )
 else:
-    print("OpenAI API key loaded successfully")
-openai.api_key = api_key
+    logger.info("OpenAI API key loaded successfully")
 
 # --- Rate Limiting Configuration ---
-REQUEST_LIMIT = 20  # Max requests allowed per time window
-WINDOW_SECONDS = 3600  # Time window in seconds (1 hour)
-request_times = []  # Stores timestamps of recent requests
+REQUEST_LIMIT = int(os.getenv("REQUEST_LIMIT", "20"))  # Max cost units per client and bucket per time window
+WINDOW_SECONDS = float(os.getenv("WINDOW_SECONDS", "3600"))  # Time window in seconds (1 hour)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "sqlite")  # "sqlite" (shared by all workers) or "memory"
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", DEFAULT_CACHE_DB_PATH)
+RATE_LIMIT_TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "") == "1"  # Only behind a trusted proxy
+
+# Bucket and cost per endpoint, in rough proportion to the model and browser work: an analysis is one
+# 1000-token completion, research one 2000-token completion, and scrape_and_research adds a (possibly
+# rendered) scrape. A batch is charged once, at a discount to its up to BATCH_MAX_JOBS analyses.
+ENDPOINT_RATE_LIMITS = {
+    "analyze_resume": EndpointRule("analysis", cost=1),
+    "analyze_resume_file": EndpointRule("analysis", cost=1),
+    "analyze_resume_stream": EndpointRule("analysis", cost=1),
+    "analyze_resume_batch": EndpointRule("analysis", cost=5),
+    "analyze_resume_batch_fast": EndpointRule("analysis", cost=1),  # Scraping only, no model calls
+    "research_company": EndpointRule("research", cost=2),
+    "research_company_stream": EndpointRule("research", cost=2),
+    "scrape_and_research": EndpointRule("research", cost=3),
+    "jobs_analyze_resume": EndpointRule("analysis", cost=1),
+    "jobs_research_company": EndpointRule("research", cost=2),
+    "jobs_scrape_and_research": EndpointRule("research", cost=3),
+}
+
+rate_limiter = RateLimiter(
+    backend=SQLiteBackend(RATE_LIMIT_DB_PATH) if RATE_LIMIT_BACKEND == "sqlite" and RATE_LIMIT_DB_PATH else MemoryBackend(),
+    limit=REQUEST_LIMIT,
+    window_seconds=WINDOW_SECONDS,
+    endpoint_rules=ENDPOINT_RATE_LIMITS,
+    trust_forwarded_for=RATE_LIMIT_TRUST_FORWARDED_FOR,
+)
 
-# --- Input Size Limit ---
-MAX_CHARS = 3000  # Maximum allowed characters for resume or job description
+# --- Batch Analysis Limits ---
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "50"))  # Max job descriptions + URLs per batch
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))  # Jobs scored in parallel per batch
+BATCH_MAX_FAST_JOBS = int(os.getenv("BATCH_MAX_FAST_JOBS", "500"))  # Max job descriptions per mode=fast batch
+
+# --- Structured Output ---
+# Analysis and research responses are requested as JSON matching a schema; turn this off for
+# OpenAI-compatible servers without json_schema support (answers are then parsed as text)
+STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+ANALYSIS_FORMAT = ANALYSIS_RESPONSE_FORMAT if STRUCTURED_OUTPUT else None
+COMPANY_RESEARCH_FORMAT = COMPANY_RESEARCH_RESPONSE_FORMAT if STRUCTURED_OUTPUT else None
+# Without a confident local company name, one structured completion names the company and researches it
+# (instead of a separate name-extraction call); needs structured output
+COMPANY_RESEARCH_FUSED = STRUCTURED_OUTPUT and os.getenv("COMPANY_RESEARCH_FUSED", "true").lower() in ("1", "true", "yes")
 
 # --- Prompt Template for ChatGPT ---
-# This template guides the AI to evaluate the resume against the job description
+# This template guides the AI to evaluate the resume against the job description.
+# Bump PROMPT_VERSION whenever the template or the parsing changes so cached analyses are not reused.
+PROMPT_VERSION = "2"
+ANALYSIS_TEMPERATURE = 0.7
 PROMPT_TEMPLATE = """
 You are a professional resume coach and AI hiring assistant. Your task is to evaluate how well a resume matches a given job description using the criteria below, and provide clear, actionable suggestions to improve the candidate's chances of passing automated resume screening systems (ATS) and securing a first interview.
 
@@ -88,6 +272,8 @@ Respond with:
 """
 
 # --- Company Research Prompt Template ---
+# Bump COMPANY_RESEARCH_PROMPT_VERSION whenever the template or the parsing changes
+COMPANY_RESEARCH_PROMPT_VERSION = "2"
 COMPANY_RESEARCH_PROMPT = """
 You are a business research analyst. Your task is to research the company mentioned in the job description and provide comprehensive information about the organization.
 
@@ -130,168 +316,306 @@ Provide a structured response with clear sections for each of the above points.
 """
 
 # --- Request Model ---
+# "fast" scores locally by keyword and skills overlap (fast_scoring.py) instead of calling the LLM
+AnalysisMode = Literal["llm", "fast"]
+
 class ResumeRequest(BaseModel):
     resume: str
     job_description: str
 
+class BatchAnalyzeRequest(BaseModel):
+    resume: str
+    job_descriptions: List[str] = []
+    job_urls: List[str] = []  # Scraped like /scrape_job_posting before scoring
+
 class CompanyResearchRequest(BaseModel):
     job_description: str
+    refresh: bool = False  # Bypass the company research cache and re-run the research
 
 # --- Main API Endpoint ---
 @app.post("/analyze_resume")
-async def analyze_resume(req: ResumeRequest):
-    print("Received:", req)
-    # --- Rate Limiting Logic ---
-    now = time.time()
-    global request_times
-    # Remove timestamps outside the current window
-    request_times = [t for t in request_times if now - t < WINDOW_SECONDS]
-    if len(request_times) >= REQUEST_LIMIT:
-        raise HTTPException(status_code=429, detail="API rate limit exceeded. Please try again later.")
-    request_times.append(now)
-
-    # --- (Optional) Input Size Check ---
-    # Uncomment to enforce input size limits
-    # if len(req.resume) > MAX_CHARS or len(req.job_description) > MAX_CHARS:
-    #     print("Input too long:", len(req.resume), len(req.job_description))
-    #     raise HTTPException(status_code=400, detail="Input too long.")
-
-    # --- Construct the AI Prompt ---
-    prompt = PROMPT_TEMPLATE.format(
-        resume=req.resume,
-        job_description=req.job_description
+async def analyze_resume(req: ResumeRequest, request: Request, response: Response, mode: AnalysisMode = "llm"):
+    logger.info(
+        "Analysis requested",
+        extra={"mode": mode, "resume_chars": len(req.resume), "job_description_chars": len(req.job_description)},
     )
+    log_payload(logger, "Analysis request", req.model_dump_json())
+    if mode == "fast":
+        # Local scoring takes milliseconds and costs nothing, so it skips the cache and the rate limit
+        return score_resume(req.resume, req.job_description)
+
+    # --- Cache Lookup (hits do not count against the rate limit) ---
+    cache_key = analysis_cache_key(req.resume, req.job_description)
+    cached = await analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Analysis cache hit")
+        response.headers["X-Cache"] = "HIT"
+        return cached
+    response.headers["X-Cache"] = "MISS"
+
+    # --- Rate Limiting ---
+    await rate_limiter.check(request, "analyze_resume")
+
+    return await run_analysis(req.resume, req.job_description, cache_key)
+
+# --- Batch Endpoint: Score One Resume Against Many Jobs ---
+@app.post("/analyze_resume_batch")
+async def analyze_resume_batch(req: BatchAnalyzeRequest, request: Request, mode: AnalysisMode = "llm"):
+    """Stream one NDJSON line per job as soon as it is scored, then a summary line"""
+    jobs = [{"index": i, "job_description": jd} for i, jd in enumerate(req.job_descriptions)]
+    jobs += [{"index": len(jobs) + i, "url": url} for i, url in enumerate(req.job_urls)]
+    if not jobs:
+        raise HTTPException(status_code=400, detail="Provide at least one job description or job URL.")
+    if mode == "fast":
+        if len(req.job_descriptions) > BATCH_MAX_FAST_JOBS or len(req.job_urls) > BATCH_MAX_JOBS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many jobs in one fast batch (max {BATCH_MAX_FAST_JOBS} job descriptions and {BATCH_MAX_JOBS} URLs).",
+            )
+        logger.info("Fast batch analysis started", extra={"jobs": len(jobs)})
+        if req.job_urls:
+            # No LLM calls, but scraping is still charged once
+            await rate_limiter.check(request, "analyze_resume_batch_fast")
+        return StreamingResponse(fast_batch_lines(req.resume, jobs), media_type="application/x-ndjson")
+    if len(jobs) > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"Too many jobs in one batch (max {BATCH_MAX_JOBS}).")
+    logger.info("Batch analysis started", extra={"jobs": len(jobs)})
+
+    # --- Cache Lookup: served without touching the model ---
+    cached_results = {}
+    for job in jobs:
+        if "job_description" in job:
+            cached = await analysis_cache.get(analysis_cache_key(req.resume, job["job_description"]))
+            if cached is not None:
+                cached_results[job["index"]] = cached
+
+    # --- Rate Limiting (one charge for the whole batch, only if the model is needed) ---
+    if len(cached_results) < len(jobs):
+        await rate_limiter.check(request, "analyze_resume_batch")
+
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def score_job(job: dict) -> dict:
+        line = {key: value for key, value in job.items() if key != "job_description"}
+        if job["index"] in cached_results:
+            return {**line, "status": "ok", "cached": True, **cached_results[job["index"]]}
+        async with semaphore:
+            try:
+                job_description = job.get("job_description")
+                if job_description is None:
+                    job_description = await scrape_job_text(job["url"])
+                    if not job_description:
+                        return {**line, "status": "error", "detail": "Could not extract job description."}
+                cache_key = analysis_cache_key(req.resume, job_description)
+                cached = await analysis_cache.get(cache_key)
+                if cached is not None:
+                    return {**line, "status": "ok", "cached": True, **cached}
+                result = await run_analysis(req.resume, job_description, cache_key)
+                return {**line, "status": "ok", "cached": False, **result}
+            except Exception as e:
+                logger.warning("Batch job failed: %s", e, extra={"index": job["index"]})
+                return {**line, "status": "error", "detail": "Analysis failed."}
 
-    # --- Call OpenAI ChatGPT API ---
-    print("Calling OpenAI API...")
-    print(f"Resume length: {len(req.resume)} characters")
-    print(f"Job description length: {len(req.job_description)} characters")
-    
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",  # Fixed model name
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=1000,  # Increased for better responses
-        temperature=0.7,
-    )
-    # Get the AI's response content (may be None, so default to empty string)
-    content = response.choices[0].message.content or ""
-    
-    print("=== OPENAI RESPONSE ===")
-    print(content)
-    print("=== END OPENAI RESPONSE ===")
+    async def generate():
+        tasks = [asyncio.create_task(score_job(job)) for job in jobs]
+        succeeded = 0
+        from_cache = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                succeeded += line["status"] == "ok"
+                from_cache += bool(line.get("cached"))
+                yield json.dumps(line) + "\n"
+            yield json.dumps({"done": True, "total": len(jobs), "succeeded": succeeded, "cached": from_cache}) + "\n"
+        finally:
+            # Client disconnected or generation failed: stop remaining work
+            for task in tasks:
+                task.cancel()
+            logger.info("Batch analysis finished", extra={"jobs": len(jobs), "succeeded": succeeded, "cached": from_cache})
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+async def fast_batch_lines(resume: str, jobs: list[dict]):
+    """NDJSON lines for a mode=fast batch: each group of job texts is scored in one vectorized pass"""
+    described = [job for job in jobs if "job_description" in job]
+    linked = [job for job in jobs if "url" in job]
+    succeeded = 0
+
+    results = await asyncio.to_thread(score_jobs, resume, [job["job_description"] for job in described])
+    for job, result in zip(described, results):
+        succeeded += 1
+        yield json.dumps({"index": job["index"], "status": "ok", "cached": False, **result}) + "\n"
+
+    if linked:
+        semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+        async def scrape(job: dict) -> tuple[dict, str]:
+            async with semaphore:
+                try:
+                    return job, await scrape_job_text(job["url"])
+                except Exception as e:
+                    logger.warning("Batch job scrape failed: %s", e, extra={"index": job["index"]})
+                    return job, ""
 
-    # --- Parse the AI's Response for Score, Justification, and Suggestions ---
-    score, justification, suggestions = parse_openai_response(content)
-    return {
-        "match_score": score,
-        "justification": justification,
-        "suggestions": suggestions
-    }
+        tasks = [asyncio.create_task(scrape(job)) for job in linked]
+        scraped = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                job, job_text = await next_done
+                if job_text:
+                    scraped.append((job, job_text))
+                else:
+                    yield json.dumps({**job, "status": "error", "detail": "Could not extract job description."}) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        results = await asyncio.to_thread(score_jobs, resume, [job_text for _, job_text in scraped])
+        for (job, _), result in zip(scraped, results):
+            succeeded += 1
+            yield json.dumps({**job, "status": "ok", "cached": False, **result}) + "\n"
+
+    yield json.dumps({"done": True, "total": len(jobs), "succeeded": succeeded, "cached": 0}) + "\n"
+    logger.info("Fast batch analysis finished", extra={"jobs": len(jobs), "succeeded": succeeded})
 
 # --- New Endpoint: Analyze Resume File Upload ---
 @app.post("/analyze_resume_file")
 async def analyze_resume_file(
-    file: UploadFile = File(...),
-    job_description: str = Form(...)
+    request: Request,
+    response: Response,
+    job_description: str = Form(...),
+    file: Optional[UploadFile] = File(None),
+    resume_sha256: Optional[str] = Form(None),  # From /extract_resume_text_file, instead of re-uploading
 ):
-    # --- Rate Limiting Logic ---
-    now = time.time()
-    global request_times
-    request_times = [t for t in request_times if now - t < WINDOW_SECONDS]
-    if len(request_times) >= REQUEST_LIMIT:
-        raise HTTPException(status_code=429, detail="API rate limit exceeded. Please try again later.")
-    request_times.append(now)
-
-    # --- Extract resume text from file ---
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file uploaded.")
-    filename = str(file.filename)
-    _, ext = os.path.splitext(filename)
-    ext = ext.lower()
-    resume_text = ""
-    if ext == ".pdf":
-        temp_path = f"/tmp/{filename}"
-        with open(temp_path, "wb") as f:
-            f.write(await file.read())
-        resume_text = extract_pdf_text(temp_path)
-        os.remove(temp_path)
-    elif ext == ".docx":
-        temp_path = f"/tmp/{filename}"
-        with open(temp_path, "wb") as f:
-            f.write(await file.read())
-        resume_text = extract_docx_text(temp_path)
-        os.remove(temp_path)
+    # --- Extract resume text from file (or reuse text extracted earlier) ---
+    if file is not None:
+        resume_text, _ = await extract_upload_text(file)
+    elif resume_sha256:
+        resume_text = await resume_text_cache.get(resume_text_cache_key(resume_sha256.lower()))
+        if resume_text is None:
+            raise HTTPException(status_code=404, detail="Resume text has expired. Please upload the file again.")
     else:
-        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF or DOCX file.")
+        raise HTTPException(status_code=400, detail="No file uploaded.")
 
-    # --- Construct the AI Prompt ---
-    prompt = PROMPT_TEMPLATE.format(
-        resume=resume_text,
-        job_description=job_description
+    # --- Cache Lookup (hits do not count against the rate limit) ---
+    cache_key = analysis_cache_key(resume_text, job_description)
+    cached = await analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Analysis cache hit (file)")
+        response.headers["X-Cache"] = "HIT"
+        return cached
+    response.headers["X-Cache"] = "MISS"
+
+    # --- Rate Limiting ---
+    await rate_limiter.check(request, "analyze_resume_file")
+
+    return await run_analysis(resume_text, job_description, cache_key)
+
+# --- New Endpoint: Extract Resume Text from File (no OpenAI call) ---
+@app.post("/extract_resume_text_file")
+async def extract_resume_text_file(file: UploadFile = File(...)):
+    resume_text, resume_sha256 = await extract_upload_text(file)
+    return {"resume_text": resume_text, "resume_sha256": resume_sha256}
+
+# --- Helper Functions: Resume Analysis Cache ---
+def analysis_cache_key(resume_text: str, job_description: str) -> str:
+    """Key an analysis by its normalized inputs plus everything that changes the model output."""
+    return make_cache_key(
+        normalize_text(resume_text),
+        normalize_text(job_description),
+        DEFAULT_MODEL,
+        PROMPT_VERSION,
+        ANALYSIS_TEMPERATURE,
+        STRUCTURED_OUTPUT,
     )
 
+# --- Helper Function: Prompt Compaction ---
+# Inputs are deduped, stripped of boilerplate and trimmed to a token budget (prompt_compaction.py)
+# instead of being rejected over a character limit
+def log_compaction(prompt_name: str, *inputs: CompactedText):
+    before = sum(i.tokens_before for i in inputs)
+    after = sum(i.tokens_after for i in inputs)
+    PROMPT_TOKENS_SAVED.inc(before - after, prompt=prompt_name)
+    logger.info(
+        "Prompt compacted", extra={"prompt": prompt_name, "tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
+    )
+
+def build_analysis_prompt(resume_text: str, job_description: str) -> str:
+    resume = compact_resume(resume_text)
+    job = compact_job_description(job_description)
+    log_compaction("analysis", resume, job)
+    return PROMPT_TEMPLATE.format(resume=resume.text, job_description=job.text)
+
+def compacted_job_description(job_description: str, prompt_name: str) -> str:
+    job = compact_job_description(job_description)
+    log_compaction(prompt_name, job)
+    return job.text
+
+async def run_analysis(resume_text: str, job_description: str, cache_key: str) -> dict:
+    """Score a resume against a job description with the LLM and cache the parsed result"""
+    # --- Construct the AI Prompt ---
+    prompt = build_analysis_prompt(resume_text, job_description)
+
     # --- Call OpenAI ChatGPT API ---
-    print("Calling OpenAI API for file analysis...")
-    print(f"Resume text length: {len(resume_text)} characters")
-    print(f"Job description length: {len(job_description)} characters")
-    
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",  # Fixed model name
-        messages=[{"role": "user", "content": prompt}],
+    logger.info(
+        "Calling OpenAI API for analysis",
+        extra={"resume_chars": len(resume_text), "job_description_chars": len(job_description)},
+    )
+    log_payload(logger, "Analysis prompt", prompt)
+
+    content = await llm_client.complete(
+        prompt,
         max_tokens=1000,  # Increased for better responses
-        temperature=0.7,
+        temperature=ANALYSIS_TEMPERATURE,
+        response_format=ANALYSIS_FORMAT,
     )
-    content = response.choices[0].message.content or ""
-    
-    print("=== OPENAI RESPONSE (FILE) ===")
-    print(content)
-    print("=== END OPENAI RESPONSE (FILE) ===")
     
-    score, justification, suggestions = parse_openai_response(content)
+    log_payload(logger, "Analysis response", content)
+
+    # --- Parse the AI's Response for Score, Justification, and Suggestions ---
+    try:
+        result = parse_analysis(content)
+    except AnalysisParseError as e:
+        logger.warning("Analysis parsing failed: %s", e)
+        raise HTTPException(status_code=502, detail=ANALYSIS_PARSE_ERROR_DETAIL)
+    await store_analysis(cache_key, result)
+    return result
+
+async def store_analysis(cache_key: str, result: dict):
+    await analysis_cache.set(cache_key, result)
+
+class AnalysisParseError(Exception):
+    """The model's answer had no usable match score."""
+
+ANALYSIS_PARSE_ERROR_DETAIL = "Could not read a match score from the AI response. Please try again."
+
+# --- Helper Function: Parse AI Output ---
+def parse_analysis(content: str) -> dict:
+    """Parse a structured analysis, falling back to the text parser; raises AnalysisParseError without a score"""
+    with time_stage("response_parse"):
+        result = parse_analysis_json(content)
+        if result is not None:
+            return result
+        if STRUCTURED_OUTPUT:
+            logger.warning("Structured analysis did not validate, falling back to text parsing")
+        score, justification, suggestions = parse_openai_response(content)
+    if score is None:
+        # Never report an unparseable answer as a score of 0
+        raise AnalysisParseError("No match score found in the AI response")
     return {
         "match_score": score,
         "justification": justification,
         "suggestions": suggestions
     }
 
-# --- New Endpoint: Extract Resume Text from File (no OpenAI call) ---
-@app.post("/extract_resume_text_file")
-async def extract_resume_text_file(file: UploadFile = File(...)):
-    print("Extracting resume text from file")
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file uploaded.")
-    filename = str(file.filename)
-    print("Extracting resume text from file:", filename)
-    _, ext = os.path.splitext(filename)
-    ext = ext.lower()
-    print("File extension:", ext)
-    resume_text = ""
-    if ext == ".pdf":
-        temp_path = f"/tmp/{filename}"
-        with open(temp_path, "wb") as f:
-            f.write(await file.read())
-        resume_text = extract_pdf_text(temp_path)
-        os.remove(temp_path)
-    elif ext == ".docx":
-        temp_path = f"/tmp/{filename}"
-        with open(temp_path, "wb") as f:
-            f.write(await file.read())
-        resume_text = extract_docx_text(temp_path)
-        os.remove(temp_path)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF or DOCX file.")
-    return {"resume_text": resume_text}
-
-# --- Helper Function: Parse AI Output ---
 def parse_openai_response(content: str):
-    print("=== PARSING OPENAI RESPONSE ===")
-    print(f"Content length: {len(content)} characters")
+    """Text fallback for models without structured output; the score is None when none is found"""
+    logger.debug("Parsing analysis text", extra={"chars": len(content)})
     
-    # Try multiple patterns for score extraction
-    score = 0
+    # Try multiple patterns for score extraction. Each needs "score" or an explicit
+    # out-of-100 scale, so unrelated percentages in the answer are not mistaken for it.
+    score = None
     score_patterns = [
-        r"Match Score[:\s]*([0-9]{1,3})%",
-        r"([0-9]{1,3})%",
+        r"Match Score\W*?([0-9]{1,3})\s*(?:%|/\s*100|out of 100)?",
         r"score[:\s]*([0-9]{1,3})",
         r"([0-9]{1,3}) out of 100",
         r"([0-9]{1,3})/100"
@@ -299,15 +623,14 @@ def parse_openai_response(content: str):
     
     for pattern in score_patterns:
         score_match = re.search(pattern, content, re.IGNORECASE)
-        if score_match:
+        if score_match and int(score_match.group(1)) <= 100:
             score = int(score_match.group(1))
-            print(f"Found score using pattern '{pattern}': {score}")
+            logger.debug("Found score using pattern %r: %s", pattern, score)
             break
     
-    if score == 0:
-        print("WARNING: No score found in response!")
-        print("Response content:")
-        print(content[:500] + "..." if len(content) > 500 else content)
+    if score is None:
+        logger.warning("No score found in response")
+        log_payload(logger, "Response without a score", content)
     
     # Extract justification - try multiple patterns
     justification = ""
@@ -321,8 +644,8 @@ def parse_openai_response(content: str):
     for pattern in justification_patterns:
         justification_match = re.search(pattern, content, re.IGNORECASE)
         if justification_match:
-            justification = justification_match.group(1).strip()
-            print(f"Found justification using pattern '{pattern}'")
+            justification = justification_match.group(1).strip().strip("*").strip()
+            logger.debug("Found justification using pattern %r", pattern)
             break
     
     # Extract suggestions - try multiple patterns
@@ -331,91 +654,49 @@ def parse_openai_response(content: str):
     # Try numbered list first
     suggestions = re.findall(r"\d+\.\s*([^\n]+)", content)
     if suggestions:
-        print(f"Found {len(suggestions)} numbered suggestions")
+        logger.debug("Found %d numbered suggestions", len(suggestions))
     else:
         # Try bullet points
         suggestions = re.findall(r"[-*]\s*([^\n]+)", content)
         if suggestions:
-            print(f"Found {len(suggestions)} bullet point suggestions")
+            logger.debug("Found %d bullet point suggestions", len(suggestions))
         else:
             # Try after "Suggestions" section
             sugg_section = re.split(r"Suggestions[:\s]*", content, flags=re.IGNORECASE)
             if len(sugg_section) > 1:
                 lines = [line.strip() for line in sugg_section[1].split('\n') if line.strip() and len(line.strip()) > 10]
                 suggestions = lines[:5]
-                print(f"Found {len(suggestions)} suggestions from section")
+                logger.debug("Found %d suggestions from section", len(suggestions))
     
-    print(f"Final parsed result: Score={score}, Justification length={len(justification)}, Suggestions count={len(suggestions)}")
-    print("=== END PARSING ===")
+    logger.debug(
+        "Parsed analysis text",
+        extra={"score": score, "justification_chars": len(justification), "suggestions": len(suggestions)},
+    )
     
     return score, justification, suggestions[:5]  # Limit to 5 suggestions for UI clarity
 
 # --- Helper Function: Parse Company Research Response ---
+def parse_company_research(content: str) -> dict:
+    """Parse structured company research, falling back to the text parser"""
+    with time_stage("response_parse"):
+        company_info = parse_company_research_json(content)
+        if company_info is not None:
+            return company_info
+        if COMPANY_RESEARCH_FORMAT is not None:
+            logger.warning("Structured company research did not validate, falling back to text parsing")
+        return parse_company_research_response(content)
+
 def parse_company_research_response(content: str):
-    print("=== PARSING COMPANY RESEARCH RESPONSE ===")
-    print(f"Content length: {len(content)} characters")
+    """Text fallback for models without structured output"""
+    logger.debug("Parsing company research text", extra={"chars": len(content)})
     
     # Initialize structured response
-    company_info = {
-        "company_overview": "",
-        "market_customers": "",
-        "key_products": "",
-        "culture_values": "",
-        "industry_competition": "",
-        "growth_opportunities": "",
-        "additional_insights": ""
-    }
-    
-    # Try to extract sections using common patterns
-    sections = {
-        "company_overview": [
-            r"Company Overview[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"What does the company do[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"business model[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)"
-        ],
-        "market_customers": [
-            r"Market & Customers[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"target customers[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"market or industry[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)"
-        ],
-        "key_products": [
-            r"Key Product Areas[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"main products or services[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"technologies or solutions[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)"
-        ],
-        "culture_values": [
-            r"Company Culture & Values[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"work culture[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"values, or mission[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)"
-        ],
-        "industry_competition": [
-            r"Industry & Competition[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"industry are they in[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"competitors[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)"
-        ],
-        "growth_opportunities": [
-            r"Growth & Opportunities[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"growth stage[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"funding, or market position[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)"
-        ],
-        "additional_insights": [
-            r"Additional Insights[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)",
-            r"other relevant information[:\s]*([^\n]+(?:\n(?!\d+\.)[^\n]+)*)"
-        ]
-    }
-    
-    # Extract content for each section
-    for section_name, patterns in sections.items():
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
-            if match:
-                company_info[section_name] = match.group(1).strip()
-                print(f"Found {section_name} using pattern")
-                break
+    # Split on the numbered section headings in a single pass over the lines
+    company_info = parse_company_sections(content)
     
     # If structured parsing failed, try to extract meaningful content from the full response
     if not any(company_info.values()):
-        print("Structured parsing failed, extracting general content...")
+        logger.debug("No numbered sections found, extracting general content")
         # Split content into paragraphs and assign to sections
         paragraphs = [p.strip() for p in content.split('\n\n') if p.strip() and len(p.strip()) > 20]
         
@@ -434,16 +715,46 @@ def parse_company_research_response(content: str):
         if len(paragraphs) >= 7:
             company_info["additional_insights"] = paragraphs[6]
     
-    print(f"Final parsed company info: {len([v for v in company_info.values() if v])} sections filled")
-    print("=== END COMPANY RESEARCH PARSING ===")
+    logger.debug("Parsed company research text", extra={"sections": len([v for v in company_info.values() if v])})
     
     return company_info
 
 # --- Helper Function: Extract Company Name ---
-def extract_company_name(job_description: str) -> str:
+def guess_company(job_description: str, page: Optional[ScrapedPage] = None) -> Optional[CompanyNameGuess]:
+    """Local company-name guess from the posting text and, for scraped postings, the page"""
+    return guess_company_name(
+        job_description,
+        url=page.url if page else "",
+        title=page.title if page else "",
+        site_name=page.site_name if page else "",
+        hiring_organization=page.company_name if page else "",
+    )
+
+def is_confident(guess: Optional[CompanyNameGuess]) -> bool:
+    return guess is not None and guess.confidence >= COMPANY_NAME_MIN_CONFIDENCE
+
+async def extract_company_name(job_description: str, page: Optional[ScrapedPage] = None) -> str:
+    """Extract the company name locally, asking the AI only when the local guess is not confident"""
+    guess = guess_company(job_description, page)
+    if is_confident(guess):
+        logger.info(
+            "Company name guessed locally",
+            extra={"company": guess.name, "source": guess.source, "confidence": round(guess.confidence, 2)},
+        )
+        return guess.name
+    if guess is not None:
+        logger.info(
+            "Low-confidence company name, asking the AI",
+            extra={"company": guess.name, "source": guess.source, "confidence": round(guess.confidence, 2)},
+        )
+    llm_name = await extract_company_name_with_llm(job_description)
+    if llm_name == "Unknown Company" and guess is not None:
+        return guess.name
+    return llm_name
+
+async def extract_company_name_with_llm(job_description: str) -> str:
     """Extract company name from job description using AI"""
-    print("=== EXTRACTING COMPANY NAME ===")
-    
+    job_description = compacted_job_description(job_description, "company name")
     company_extraction_prompt = f"""
 Extract the company name from the following job description. 
 Look for patterns like:
@@ -460,22 +771,167 @@ Job Description:
 """
     
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": company_extraction_prompt}],
+        company_name = await llm_client.complete(
+            company_extraction_prompt,
             max_tokens=50,
             temperature=0.3,
         )
-        company_name = response.choices[0].message.content or "Unknown Company"
-        company_name = company_name.strip()
+        company_name = company_name.strip() or "Unknown Company"
         
-        print(f"Extracted company name: '{company_name}'")
+        logger.info("Company name extracted by the AI", extra={"company": company_name})
         return company_name
         
     except Exception as e:
-        print(f"Error extracting company name: {e}")
+        logger.warning("Error extracting company name: %s", e)
         return "Unknown Company"
 
+# --- Helper Function: Company Research Cache Key ---
+def company_cache_key(company_name: str) -> Optional[str]:
+    """Cache key for a company's research, or None when the company is unknown"""
+    normalized_name = normalize_company_name(company_name)
+    if not normalized_name or company_name == "Unknown Company":
+        return None
+    return make_cache_key(normalized_name, DEFAULT_MODEL, COMPANY_RESEARCH_PROMPT_VERSION)
+
+# --- Helper Function: Construct the AI Prompt with company name ---
+def build_company_research_prompt(company_name: str, job_description: str) -> str:
+    job_description = compacted_job_description(job_description, "company research")
+    return f"""
+{COMPANY_RESEARCH_PROMPT}
+
+### Company Name: {company_name}
+
+Please research this specific company: {company_name}
+
+Job Description:
+{job_description}
+"""
+
+def build_fused_company_research_prompt(job_description: str) -> str:
+    job_description = compacted_job_description(job_description, "company research")
+    return COMPANY_RESEARCH_PROMPT.format(job_description=job_description) + """
+### Company Name:
+First identify the company that posted this job. Look for patterns like "at [Company Name]", "[Company Name] is hiring", "Join [Company Name]", "[Company Name] - [Job Title]", or company names in the "About" section. Put only the company name in company_name ("Unknown Company" if no clear company name is found), then research that specific company.
+"""
+
+# --- Helper Function: Research Company (cached by company name) ---
+async def research_company_info(
+    job_description: str, response: Response, refresh: bool = False, page: Optional[ScrapedPage] = None
+) -> dict:
+    """Extract the company name, then return cached research or run the research prompt"""
+    if COMPANY_RESEARCH_FUSED and not is_confident(guess_company(job_description, page)):
+        return await research_company_fused(job_description, response, refresh)
+
+    company_name = await extract_company_name(job_description, page)
+
+    cache_key = company_cache_key(company_name)
+    if cache_key is not None:
+        if refresh:
+            logger.info("Refresh requested, bypassing company cache", extra={"company": company_name})
+        else:
+            cached = await company_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Company research cache hit", extra={"company": company_name})
+                response.headers["X-Cache"] = "HIT"
+                return cached
+    response.headers["X-Cache"] = "MISS"
+
+    # Postings without a recognizable company are only coalesced with the same posting
+    flight_key = cache_key or make_cache_key(company_name, job_description)
+    return await company_research_flights.do(
+        flight_key, lambda: run_company_research(company_name, job_description, cache_key)
+    )
+
+async def run_company_research(company_name: str, job_description: str, cache_key: Optional[str]) -> dict:
+    """Research the company with the LLM and cache the parsed sections"""
+    enhanced_prompt = build_company_research_prompt(company_name, job_description)
+
+    # --- Call OpenAI ChatGPT API ---
+    logger.info("Calling OpenAI API for company research", extra={"company": company_name})
+    log_payload(logger, "Company research prompt", enhanced_prompt)
+
+    content = await llm_client.complete(
+        enhanced_prompt,
+        max_tokens=2000,  # Increased for comprehensive company research
+        temperature=0.7,
+        response_format=COMPANY_RESEARCH_FORMAT,
+    )
+    
+    log_payload(logger, "Company research response", content)
+
+    # Parse the response into structured sections
+    company_info = parse_company_research(content)
+
+    await store_company_research(cache_key, company_info)
+    return company_info
+
+async def stream_fused_company_research(job_description: str, refresh: bool = False):
+    """Run one completion that names the company first and then researches it.
+
+    Yields ("token", delta) and ("section", ...) events as they arrive and ("company", name) as soon as
+    the name is complete. If that name is in the research cache, generation is stopped and ("cached",
+    company_info) is the last event; otherwise the last event is ("result", company_info).
+    """
+    logger.info("Calling OpenAI API for fused company name extraction and research")
+    parser = CompanyResearchStreamParser()
+    chunks = []
+    company_name = None
+    prompt = build_fused_company_research_prompt(job_description)
+    log_payload(logger, "Fused company research prompt", prompt)
+    async with aclosing(llm_client.stream(
+        prompt, max_tokens=2000, temperature=0.7, response_format=FUSED_COMPANY_RESEARCH_RESPONSE_FORMAT
+    )) as deltas:
+        async for delta in deltas:
+            chunks.append(delta)
+            yield "token", delta
+            for event, data in parser.feed(delta):
+                yield event, data
+                if event != "company":
+                    continue
+                company_name = data
+                cache_key = company_cache_key(company_name)
+                if cache_key is None or refresh:
+                    continue
+                cached = await company_cache.get(cache_key)
+                if cached is not None:
+                    # Leaving the block closes the stream, which stops generation upstream
+                    logger.info("Company research cache hit, stopping generation", extra={"company": company_name})
+                    yield "cached", cached
+                    return
+
+    content = "".join(chunks)
+    log_payload(logger, "Fused company research response", content)
+    with time_stage("response_parse"):
+        fused = parse_fused_company_research_json(content)
+        if fused is not None:
+            company_name, company_info = fused
+        else:
+            logger.warning("Fused company research did not validate, falling back to text parsing")
+            company_info = parse_company_research_response(content)
+    logger.info("Company name extracted by the AI", extra={"company": company_name})
+    await store_company_research(company_cache_key(company_name or "Unknown Company"), company_info)
+    yield "result", company_info
+
+async def research_company_fused(job_description: str, response: Response, refresh: bool = False) -> dict:
+    event, data = await company_research_flights.do(
+        make_cache_key("fused", job_description, refresh), lambda: run_fused_company_research(job_description, refresh)
+    )
+    response.headers["X-Cache"] = "HIT" if event == "cached" else "MISS"
+    return data
+
+async def run_fused_company_research(job_description: str, refresh: bool) -> tuple[str, dict]:
+    """The final ("cached" or "result", company_info) event of the fused research"""
+    async with aclosing(stream_fused_company_research(job_description, refresh)) as events:
+        async for event, data in events:
+            if event in ("cached", "result"):
+                return event, data
+    raise RuntimeError("Fused company research ended without a result")
+
+async def store_company_research(cache_key: Optional[str], company_info: dict):
+    # Don't cache a response nothing could be parsed from
+    if cache_key is not None and any(company_info.values()):
+        await company_cache.set(cache_key, company_info)
+
 # --- Extract resume text from a file ---
 @app.post("/extract_resume_text")
 def extract_resume_text(file_path: str):
@@ -486,30 +942,59 @@ def extract_resume_text(file_path: str):
     # Check file extension
     _, file_extension = os.path.splitext(file_path)
     if file_extension.lower() == ".pdf":
-        return extract_pdf_text(file_path)
-
-def extract_pdf_text(file_path: str):
-    print("extracting pdf text")
-    # Use PyPDF2 to extract text from PDF
-    with open(file_path, 'rb') as file:
-        reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
-        return text
-
-# --- DOCX Extraction Helper ---
-def extract_docx_text(file_path: str) -> str:
-    print("extracting docx text")
-    doc = docx.Document(file_path)
-    text = "\n".join([para.text for para in doc.paragraphs])
-    return text
+        with open(file_path, 'rb') as f:
+            return extract_pdf_text(f.read())
+
+# --- Helper Functions: Extract Text from an Uploaded Resume ---
+def resume_text_cache_key(resume_sha256: str) -> str:
+    return make_cache_key(resume_sha256, EXTRACTION_VERSION)
+
+async def extract_upload_text(file: UploadFile) -> tuple[str, str]:
+    """Parse an uploaded PDF or DOCX from memory, off the event loop.
+
+    Returns the text and the SHA-256 of the file, which keys the extracted text cache.
+    """
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file uploaded.")
+    filename = str(file.filename)
+    logger.info("Extracting resume text from file", extra={"upload": filename})
+    _, ext = os.path.splitext(filename)
+    ext = ext.lower()
+    if ext == ".pdf":
+        extractor = document_extractor.extract_pdf
+    elif ext == ".docx":
+        extractor = document_extractor.extract_docx
+    else:
+        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF or DOCX file.")
+
+    data = await read_upload_bytes(file)
+    resume_sha256 = hashlib.sha256(data).hexdigest()
+    cache_key = resume_text_cache_key(resume_sha256)
+    cached = await resume_text_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Resume text cache hit", extra={"upload": filename})
+        return cached, resume_sha256
+
+    try:
+        # Parsing is CPU-bound, so it runs in the extraction process pool
+        with time_stage("document_extract"):
+            resume_text = await extractor(data)
+    except ExtractionBudgetExceeded as e:
+        logger.warning("Gave up parsing upload: %s", e, extra={"upload": filename})
+        raise HTTPException(status_code=422, detail="The uploaded file took too long to read. Please upload a simpler PDF or DOCX file.")
+    except Exception as e:
+        logger.warning("Failed to parse upload: %s", e, extra={"upload": filename})
+        raise HTTPException(status_code=400, detail="Could not read the uploaded file. Please upload a valid PDF or DOCX file.")
+    await resume_text_cache.set(cache_key, resume_text)
+    return resume_text, resume_sha256
 
 class ScrapeRequest(BaseModel):
     url: str
+    refresh: bool = False  # Bypass the company research cache and re-run the research
 
 class ScrapeResponse(BaseModel):
     job_description: str
+    company_name: Optional[str] = None  # From the page's JobPosting structured data, when it has one
 
 class ScrapeAndResearchResponse(BaseModel):
     job_description: str
@@ -517,300 +1002,454 @@ class ScrapeAndResearchResponse(BaseModel):
 
 @app.post("/scrape_job_posting", response_model=ScrapeResponse)
 async def scrape_job_posting(req: ScrapeRequest):
-    print("=== JOB SCRAPING STARTED ===")
-    print(f"URL to scrape: {req.url}")
-    
-    # First try with regular requests
-    job_text = await try_basic_scraping(req.url)
-    
-    # If basic scraping failed, try with Playwright
-    if not job_text:
-        print("Basic scraping failed, trying with Playwright...")
-        job_text = await try_playwright_scraping(req.url)
-    
-    if not job_text:
-        print("ERROR: No job text extracted!")
+    logger.info("Job scraping started", extra={"url": req.url})
+
+    page = await scrape_job_page(req.url)
+    if page is None:
+        logger.warning("No job text extracted", extra={"url": req.url})
         raise HTTPException(status_code=404, detail="Could not extract job description.")
 
-    print("=== JOB SCRAPING COMPLETED SUCCESSFULLY ===")
-    return ScrapeResponse(job_description=job_text)
+    logger.info("Job scraping completed", extra={"url": req.url, "chars": len(page.text)})
+    return ScrapeResponse(job_description=page.text, company_name=page.company_name or None)
 
 # --- Company Research Endpoint ---
 @app.post("/research_company")
-async def research_company(req: CompanyResearchRequest):
-    print("=== COMPANY RESEARCH STARTED ===")
-    print(f"Job description length: {len(req.job_description)} characters")
+async def research_company(req: CompanyResearchRequest, request: Request, response: Response):
+    logger.info("Company research started", extra={"job_description_chars": len(req.job_description)})
+
+    # --- Rate Limiting ---
+    await rate_limiter.check(request, "research_company")
+
+    company_info = await research_company_info(req.job_description, response, refresh=req.refresh)
     
-    # --- Rate Limiting Logic ---
-    now = time.time()
-    global request_times
-    request_times = [t for t in request_times if now - t < WINDOW_SECONDS]
-    if len(request_times) >= REQUEST_LIMIT:
-        raise HTTPException(status_code=429, detail="API rate limit exceeded. Please try again later.")
-    request_times.append(now)
-
-    # Extract company name from job description
-    company_name = extract_company_name(req.job_description)
-    print(f"Extracted company name: {company_name}")
-
-    # --- Construct the AI Prompt with company name ---
-    enhanced_prompt = f"""
-{COMPANY_RESEARCH_PROMPT}
+    logger.info("Company research completed")
+    return company_info
 
-### Company Name: {company_name}
+# --- Streaming Endpoints (Server-Sent Events) ---
+# These forward model tokens as "token" events and emit each parsed piece of the answer
+# ("score", "justification", "suggestion", "section") as soon as it is complete, followed by
+# a "result" event with the same payload the non-streaming endpoint returns.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+@app.post("/analyze_resume/stream")
+async def analyze_resume_stream(req: ResumeRequest, request: Request):
+    logger.info(
+        "Streaming analysis requested",
+        extra={"resume_chars": len(req.resume), "job_description_chars": len(req.job_description)},
+    )
+    log_payload(logger, "Analysis request", req.model_dump_json())
+    cache_key = analysis_cache_key(req.resume, req.job_description)
+    cached = await analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Analysis cache hit (stream)")
+
+        async def replay_cached():
+            yield sse_event("score", cached["match_score"])
+            yield sse_event("justification", cached["justification"])
+            for suggestion in cached["suggestions"]:
+                yield sse_event("suggestion", suggestion)
+            yield sse_event("result", cached)
+
+        return StreamingResponse(replay_cached(), media_type="text/event-stream", headers={**SSE_HEADERS, "X-Cache": "HIT"})
+
+    # --- Rate Limiting ---
+    await rate_limiter.check(request, "analyze_resume_stream")
+
+    prompt = build_analysis_prompt(req.resume, req.job_description)
+
+    async def generate():
+        # Instant local estimate, superseded by the "score" and "result" events
+        yield sse_event("provisional", score_resume(req.resume, req.job_description))
+        parser = AnalysisStreamParser()
+        chunks = []
+        try:
+            # Closed on exit even when the client disconnects, releasing the slot and the upstream stream
+            async with aclosing(llm_client.stream(
+                prompt, max_tokens=1000, temperature=ANALYSIS_TEMPERATURE, response_format=ANALYSIS_FORMAT
+            )) as deltas:
+                async for delta in deltas:
+                    chunks.append(delta)
+                    yield sse_event("token", delta)
+                    for event, data in parser.feed(delta):
+                        yield sse_event(event, data)
+            for event, data in parser.finish():
+                yield sse_event(event, data)
+        except Exception as e:
+            logger.error("Streaming analysis failed: %s", e)
+            yield sse_event("error", {"detail": "Analysis failed. Please try again later."})
+            return
 
-Please research this specific company: {company_name}
+        try:
+            result = parse_analysis("".join(chunks))
+        except AnalysisParseError:
+            yield sse_event("error", {"detail": ANALYSIS_PARSE_ERROR_DETAIL})
+            return
+        await store_analysis(cache_key, result)
+        yield sse_event("result", result)
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers={**SSE_HEADERS, "X-Cache": "MISS"})
+
+@app.post("/research_company/stream")
+async def research_company_stream(req: CompanyResearchRequest, request: Request):
+    logger.info("Streaming company research started", extra={"job_description_chars": len(req.job_description)})
+
+    # --- Rate Limiting ---
+    await rate_limiter.check(request, "research_company_stream")
+
+    if COMPANY_RESEARCH_FUSED and not is_confident(guess_company(req.job_description)):
+        # The cache status is only known once the model has named the company, so there is no X-Cache header
+        return StreamingResponse(
+            generate_fused_company_research(req.job_description, req.refresh),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
 
-Job Description:
-{req.job_description}
-"""
+    company_name = await extract_company_name(req.job_description)
+    cache_key = company_cache_key(company_name)
+    cached = None
+    if cache_key is not None and not req.refresh:
+        cached = await company_cache.get(cache_key)
+
+    async def generate():
+        yield sse_event("company", company_name)
+        if cached is not None:
+            logger.info("Company research cache hit (stream)", extra={"company": company_name})
+            for event in replay_company_research(cached):
+                yield event
+            return
+
+        parser = CompanyResearchStreamParser()
+        chunks = []
+        try:
+            prompt = build_company_research_prompt(company_name, req.job_description)
+            async with aclosing(llm_client.stream(
+                prompt, max_tokens=2000, temperature=0.7, response_format=COMPANY_RESEARCH_FORMAT
+            )) as deltas:
+                async for delta in deltas:
+                    chunks.append(delta)
+                    yield sse_event("token", delta)
+                    for event, data in parser.feed(delta):
+                        yield sse_event(event, data)
+            for event, data in parser.finish():
+                yield sse_event(event, data)
+        except Exception as e:
+            logger.error("Streaming company research failed: %s", e)
+            yield sse_event("error", {"detail": "Company research failed. Please try again later."})
+            return
+
+        company_info = parse_company_research("".join(chunks))
+        await store_company_research(cache_key, company_info)
+        yield sse_event("result", company_info)
+
+    x_cache = "HIT" if cached is not None else "MISS"
+    return StreamingResponse(generate(), media_type="text/event-stream", headers={**SSE_HEADERS, "X-Cache": x_cache})
+
+def replay_company_research(company_info: dict) -> list[str]:
+    """SSE events for cached research: one "section" per non-empty section, then "result\""""
+    events = [
+        sse_event("section", {"name": name, "content": content})
+        for name, content in company_info.items()
+        if content
+    ]
+    return events + [sse_event("result", company_info)]
 
-    # --- Call OpenAI ChatGPT API ---
-    print("Calling OpenAI API for company research...")
-    
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": enhanced_prompt}],
-        max_tokens=2000,  # Increased for comprehensive company research
-        temperature=0.7,
-    )
-    content = response.choices[0].message.content or ""
-    
-    print("=== OPENAI COMPANY RESEARCH RESPONSE ===")
-    print(content)
-    print("=== END OPENAI COMPANY RESEARCH RESPONSE ===")
-    
-    # Parse the response into structured sections
-    company_info = parse_company_research_response(content)
-    
-    print("=== COMPANY RESEARCH COMPLETED SUCCESSFULLY ===")
-    return company_info
+async def generate_fused_company_research(job_description: str, refresh: bool):
+    try:
+        async with aclosing(stream_fused_company_research(job_description, refresh)) as events:
+            async for event, data in events:
+                if event == "cached":
+                    for cached_event in replay_company_research(data):
+                        yield cached_event
+                    return
+                yield sse_event(event, data)
+    except Exception as e:
+        logger.error("Streaming company research failed: %s", e)
+        yield sse_event("error", {"detail": "Company research failed. Please try again later."})
 
 # --- Combined Scrape and Research Endpoint ---
 @app.post("/scrape_and_research", response_model=ScrapeAndResearchResponse)
-async def scrape_and_research(req: ScrapeRequest):
-    print("=== SCRAPE AND RESEARCH STARTED ===")
-    print(f"URL to scrape: {req.url}")
-    
+async def scrape_and_research(req: ScrapeRequest, request: Request, response: Response):
+    logger.info("Scrape and research started", extra={"url": req.url})
+
     # First scrape the job posting
-    job_text = await try_basic_scraping(req.url)
-    
-    # If basic scraping failed, try with Playwright
-    if not job_text:
-        print("Basic scraping failed, trying with Playwright...")
-        job_text = await try_playwright_scraping(req.url)
-    
-    if not job_text:
-        print("ERROR: No job text extracted!")
+    page = await scrape_job_page(req.url)
+    if page is None:
+        logger.warning("No job text extracted", extra={"url": req.url})
         raise HTTPException(status_code=404, detail="Could not extract job description.")
+    job_text = page.text
 
     # Then research the company
-    print("Job scraping successful, now researching company...")
-    
-    # --- Rate Limiting Logic ---
-    now = time.time()
-    global request_times
-    request_times = [t for t in request_times if now - t < WINDOW_SECONDS]
-    if len(request_times) >= REQUEST_LIMIT:
-        raise HTTPException(status_code=429, detail="API rate limit exceeded. Please try again later.")
-    request_times.append(now)
-
-    # Extract company name from job description
-    company_name = extract_company_name(job_text)
-    print(f"Extracted company name: {company_name}")
-
-    # --- Construct the AI Prompt for company research ---
-    enhanced_prompt = f"""
-{COMPANY_RESEARCH_PROMPT}
-
-### Company Name: {company_name}
+    logger.info("Job scraping successful, now researching company", extra={"url": req.url})
 
-Please research this specific company: {company_name}
+    # --- Rate Limiting ---
+    await rate_limiter.check(request, "scrape_and_research")
 
-Job Description:
-{job_text}
-"""
-
-    # --- Call OpenAI ChatGPT API for company research ---
-    print("Calling OpenAI API for company research...")
+    company_info = await research_company_info(job_text, response, refresh=req.refresh, page=page)
     
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": enhanced_prompt}],
-        max_tokens=2000,
-        temperature=0.7,
-    )
-    content = response.choices[0].message.content or ""
-    
-    # Parse the company research response
-    company_info = parse_company_research_response(content)
-    
-    print("=== SCRAPE AND RESEARCH COMPLETED SUCCESSFULLY ===")
+    logger.info("Scrape and research completed", extra={"url": req.url})
     return ScrapeAndResearchResponse(
         job_description=job_text,
         company_info=company_info
     )
 
-async def try_basic_scraping(url: str) -> str:
-    """Try to scrape content using requests and BeautifulSoup"""
+# --- Background Job Endpoints ---
+# The same work as /analyze_resume, /research_company and /scrape_and_research, run by the job queue:
+# submit, get a job ID back at once, then poll (or long-poll with ?wait=) GET /jobs/{job_id} for the result.
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    deduplicated: bool  # An identical job was already pending; this is its ID
+
+class JobStage(BaseModel):
+    name: str
+    started_at: float
+    finished_at: Optional[float] = None
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    stage: Optional[str] = None
+    stages: List[JobStage] = []
+    result: Optional[dict] = None  # What the synchronous endpoint would have returned
+    error: Optional[dict] = None  # {"status_code", "detail"}, as the synchronous endpoint would have failed
+    attempts: int
+    created_at: float
+    updated_at: float
+
+@app.post("/jobs/analyze_resume", response_model=JobSubmitResponse, status_code=202)
+async def submit_analyze_resume_job(req: ResumeRequest, request: Request):
+    return await submit_job("analyze_resume", {"resume": req.resume, "job_description": req.job_description}, request)
+
+@app.post("/jobs/research_company", response_model=JobSubmitResponse, status_code=202)
+async def submit_research_company_job(req: CompanyResearchRequest, request: Request):
+    return await submit_job("research_company", {"job_description": req.job_description, "refresh": req.refresh}, request)
+
+@app.post("/jobs/scrape_and_research", response_model=JobSubmitResponse, status_code=202)
+async def submit_scrape_and_research_job(req: ScrapeRequest, request: Request):
+    return await submit_job("scrape_and_research", {"url": req.url, "refresh": req.refresh}, request)
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, wait: float = 0):
+    """The job's status; with wait, holds the request up to that many seconds for the job to finish"""
+    wait = min(max(wait, 0.0), JOB_MAX_WAIT_SECONDS)
+    job = await job_queue.wait(job_id, wait) if wait else await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.to_dict()
+
+async def submit_job(kind: str, payload: dict, request: Request) -> JobSubmitResponse:
+    # --- Rate Limiting (joining an identical pending job is free) ---
+    if await job_queue.find_pending(kind, payload) is None:
+        await rate_limiter.check(request, f"jobs_{kind}")
+
+    job, created = await job_queue.submit(kind, payload)
+    logger.info("Job queued" if created else "Job already pending", extra={"job_id": job.id, "kind": kind})
+    return JobSubmitResponse(job_id=job.id, status=job.status, deduplicated=not created)
+
+# --- Helper Functions: Background Job Handlers ---
+def job_handler(handler):
+    """Client errors (4xx) fail the job for good, as they would fail the request; anything else is retried"""
+    async def run(payload: dict, progress: ProgressFn) -> dict:
+        try:
+            return await handler(payload, progress)
+        except HTTPException as e:
+            if e.status_code < 500:
+                raise PermanentJobError(e.status_code, e.detail) from e
+            raise
+    return run
+
+async def analyze_resume_job(payload: dict, progress: ProgressFn) -> dict:
+    await progress("analyzing")
+    cache_key = analysis_cache_key(payload["resume"], payload["job_description"])
+    cached = await analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    return await run_analysis(payload["resume"], payload["job_description"], cache_key)
+
+async def research_company_job(payload: dict, progress: ProgressFn) -> dict:
+    await progress("researching")
+    return await research_company_info(payload["job_description"], Response(), refresh=payload["refresh"])
+
+async def scrape_and_research_job(payload: dict, progress: ProgressFn) -> dict:
+    await progress("scraping")
+    page = await scrape_job_page(payload["url"])
+    if page is None:
+        raise PermanentJobError(404, "Could not extract job description.")
+    await progress("researching")
+    company_info = await research_company_info(page.text, Response(), refresh=payload["refresh"], page=page)
+    return {"job_description": page.text, "company_info": company_info}
+
+job_queue.register("analyze_resume", job_handler(analyze_resume_job))
+job_queue.register("research_company", job_handler(research_company_job))
+job_queue.register("scrape_and_research", job_handler(scrape_and_research_job))
+
+# --- Metrics Endpoint ---
+# Stage latency histograms, cache and rate-limit counters and per-route latency for this process (metrics.py)
+@app.get("/metrics")
+async def get_metrics():
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+async def scrape_job_page(url: str) -> Optional[ScrapedPage]:
+    """Scrape the job posting, racing basic fetching against browser rendering; returns None on failure"""
+    # Requests for the same posting that arrive while it is being scraped share that scrape
+    page = await scrape_flights.do(scrape_cache_key(url), lambda: load_job_page(url))
+    if page is not None and page.url != url:
+        page = dataclasses.replace(page, url=url)
+    return page
+
+async def load_job_page(url: str) -> Optional[ScrapedPage]:
+    page = await cached_job_page(url)
+    if page is not None:
+        return page
+    with time_stage("scrape"):
+        page = await scrape_strategy.scrape(url, try_basic_scraping, try_playwright_scraping)
+    if page is not None:
+        await store_scraped_page(page)
+    return page
+
+# --- Helper Function: Scrape Cache ---
+def scrape_cache_key(url: str) -> str:
+    return make_cache_key(normalize_url(url), SCRAPE_CACHE_VERSION)
+
+async def store_scraped_page(page: ScrapedPage):
+    entry = page_to_entry(page)
+    for url in page_urls(page):
+        await scrape_cache.set(scrape_cache_key(url), entry)
+
+async def cached_job_page(url: str) -> Optional[ScrapedPage]:
+    """The cached page for url, revalidated once stale; None when it has to be scraped again"""
+    entry = await scrape_cache.get(scrape_cache_key(url))
+    if entry is None:
+        return None
+    if time.time() - entry["validated_at"] < SCRAPE_CACHE_FRESH_SECONDS:
+        logger.info("Scrape cache hit", extra={"url": url})
+        return page_from_entry(entry, url)
+
+    headers = conditional_headers(entry)
+    if not headers:
+        logger.info("Cached page is stale and has no validators, scraping again", extra={"url": url})
+        return None
     try:
-        print("Making HTTP request...")
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        print(f"HTTP Status Code: {resp.status_code}")
-        print(f"Response Content Length: {len(resp.text)} characters")
+        resp = await http_fetcher.fetch(entry["final_url"] or entry["url"], headers=headers)
+    except httpx.HTTPStatusError as e:
+        logger.info(
+            "Revalidating cached page failed, scraping again", extra={"url": url, "status": e.response.status_code}
+        )
+        if e.response.status_code in (404, 410):
+            # The posting was taken down
+            await scrape_cache.delete(scrape_cache_key(url))
+        return None
     except Exception as e:
-        print(f"ERROR: Failed to fetch URL: {e}")
-        return ""
+        # A stale posting is better than none while the site is unreachable
+        logger.warning("Revalidating cached page failed (%s), serving it stale", e, extra={"url": url})
+        return page_from_entry(entry, url)
 
-    print("Parsing HTML with BeautifulSoup...")
-    soup = BeautifulSoup(resp.text, "html.parser")
-    
-    # Print page title for debugging
-    title = soup.find('title')
-    if title:
-        print(f"Page Title: {title.get_text(strip=True)}")
+    if resp.status_code == 304:
+        logger.info("Scrape cache hit (revalidated, 304 Not Modified)", extra={"url": url})
+        page = page_from_entry(entry, url)
     else:
-        print("No page title found")
-    
-    # Debug: Print some basic HTML structure info
-    print(f"Total <div> elements: {len(soup.find_all('div'))}")
-    print(f"Total <p> elements: {len(soup.find_all('p'))}")
-    print(f"Total <h1>, <h2>, <h3> elements: {len(soup.find_all(['h1', 'h2', 'h3']))}")
-    
-    # Debug: Check what's in the single div if there's only one
-    if len(soup.find_all('div')) == 1:
-        div = soup.find('div')
-        if div:
-            div_text = div.get_text(strip=True)
-            print(f"Single div text length: {len(div_text)} characters")
-            if len(div_text) > 0:
-                print(f"Single div content preview: {div_text[:200]}...")
-            else:
-                print("Single div is empty")
-
-    # Try to extract main content heuristically
-    print("Extracting text blocks from HTML elements...")
-    text_blocks = []
-    
-    # First pass: look for longer text blocks
-    for tag in soup.find_all(['h1', 'h2', 'h3', 'p', 'li']):
-        txt = tag.get_text(strip=True)
-        if txt and len(txt) > 20:  # Reduced minimum length
-            text_blocks.append(txt)
-            print(f"  Found text block ({len(txt)} chars): {txt[:100]}...")
-
-    # If we didn't find much content, try a broader approach
-    if len(text_blocks) < 3:
-        print("Not enough content found, trying broader extraction...")
-        # Look for any div with substantial text content
-        for div in soup.find_all('div'):
-            txt = div.get_text(strip=True)
-            if txt and len(txt) > 50 and len(txt) < 2000:  # Reasonable length
-                # Check if it looks like job content (contains keywords)
-                job_keywords = ['job', 'position', 'role', 'responsibilities', 'requirements', 'qualifications', 'experience', 'skills']
-                if any(keyword in txt.lower() for keyword in job_keywords):
-                    text_blocks.append(txt)
-                    print(f"  Found job-related div ({len(txt)} chars): {txt[:100]}...")
-
-    # If still no content, try extracting all text from the page
-    if len(text_blocks) == 0:
-        print("No structured content found, extracting all page text...")
-        all_text = soup.get_text(separator='\n', strip=True)
-        print(f"Total page text length: {len(all_text)} characters")
-        print(f"All page text: '{all_text}'")
-        if len(all_text) > 100:
-            print(f"First 500 chars of page text: {all_text[:500]}...")
-            # Split into reasonable chunks
-            lines = [line.strip() for line in all_text.split('\n') if line.strip() and len(line.strip()) > 10]
-            text_blocks = lines[:20]  # Take first 20 meaningful lines
-            print(f"Extracted {len(text_blocks)} text lines from page")
-        else:
-            print("Page appears to be a JavaScript SPA with minimal initial content")
-            return ""
-
-    print(f"Total text blocks extracted: {len(text_blocks)}")
-
-    # Join blocks, limit length
-    job_text = "\n".join(text_blocks)[:4000]  # Limit to 4000 chars
-    print(f"Final job text length: {len(job_text)} characters")
-    
-    if len(job_text) > 100:
-        print(f"First 200 chars of extracted text: {job_text[:200]}...")
-        print(f"Last 200 chars of extracted text: ...{job_text[-200:]}")
-
-    return job_text
+        logger.info("Cached page changed, extracting it again", extra={"url": url})
+        page = await asyncio.to_thread(parse_job_page, resp.text, url, resp.url, resp.headers)
+        if page is None:
+            return None
+    await store_scraped_page(page)
+    return page
+
+async def scrape_job_text(url: str) -> str:
+    """Scrape the job posting text; returns "" on failure"""
+    page = await scrape_job_page(url)
+    return page.text if page is not None else ""
+
+async def try_basic_scraping(url: str) -> Optional[ScrapedPage]:
+    """Try to scrape content using the pooled HTTP fetcher and static HTML extraction"""
+    try:
+        resp = await http_fetcher.fetch(url)
+        logger.info(
+            "Fetched job page",
+            extra={"url": url, "status": resp.status_code, "chars": len(resp.text), "encoding": resp.encoding, "truncated": resp.truncated},
+        )
+    except Exception as e:
+        logger.warning("Failed to fetch URL: %s", e, extra={"url": url})
+        return None
+
+    # Parsing is CPU-bound, so keep it off the event loop
+    return await asyncio.to_thread(parse_job_page, resp.text, url, resp.url, resp.headers)
+
+def parse_job_page(
+    html: str, url: str, final_url: str = "", headers: Optional[Mapping[str, str]] = None
+) -> Optional[ScrapedPage]:
+    """Parse an HTML page into its job text and metadata, or None without job text.
+
+    final_url (after redirects) and the response headers are kept for revalidating the cached page.
+    """
+    with time_stage("html_parse"):
+        page = extract_page(html)
+    logger.info("Extracted job text", extra={"url": url, "chars": len(page.text), "source": page.source, "title": page.title})
+    if not page.text:
+        logger.info("Page appears to be a JavaScript SPA with minimal initial content", extra={"url": url})
+        return None
+    return ScrapedPage(
+        url=url,
+        text=page.text,
+        title=page.title,
+        site_name=page.site_name,
+        company_name=page.company_name,
+        structured=page.source == "json-ld",
+        final_url=final_url,
+        canonical_url=urljoin(final_url or url, page.canonical_url) if page.canonical_url else "",
+        etag=(headers or {}).get("etag", ""),
+        last_modified=(headers or {}).get("last-modified", ""),
+    )
 
-async def try_playwright_scraping(url: str) -> str:
-    """Try to scrape content using Playwright (handles JavaScript)"""
+async def try_playwright_scraping(url: str) -> Optional[ScrapedPage]:
+    """Try to scrape content using a pooled Playwright browser (handles JavaScript)"""
     try:
-        print("Attempting Playwright scraping...")
-        
-        # Import playwright here to avoid import errors if not installed
-        try:
-            from playwright.async_api import async_playwright
-        except ImportError:
-            print("Playwright not installed. Install with: pip install playwright && playwright install")
-            return ""
-        
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
-            # Set user agent to look more like a real browser
-            await page.set_extra_http_headers({
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            })
-            
-            print("Loading page with Playwright...")
-            try:
-                # Try with a shorter timeout and different wait strategy
-                await page.goto(url, wait_until='domcontentloaded', timeout=15000)
-                print("Page loaded, waiting for content...")
-                
-                # Wait for any dynamic content to load
-                await page.wait_for_timeout(5000)
-                
-                # Try to wait for some content to appear
+        logger.info("Attempting Playwright scraping", extra={"url": url})
+
+        headers = {}
+        with time_stage("browser_render"):
+            async with browser_pool.page() as page:
+                # Images, fonts, stylesheets and trackers are never needed for the job text
+                blocked = await block_resources(page)
+                ready = "error"
                 try:
-                    await page.wait_for_selector('body', timeout=10000)
-                except:
-                    print("No body selector found, continuing anyway...")
-                    
-            except Exception as e:
-                print(f"Page load timeout or error: {e}")
-                # Try to get whatever content is available
-                pass
-            
-            print("Extracting content from rendered page...")
-            content = await page.content()
-            soup = BeautifulSoup(content, "html.parser")
-            
-            # Debug: Check what we got
-            print(f"Playwright HTML content length: {len(content)} characters")
-            print(f"Playwright page title: {await page.title()}")
-            
-            # Extract text content
-            all_text = soup.get_text(separator='\n', strip=True)
-            print(f"Playwright extracted text length: {len(all_text)} characters")
-            
-            if len(all_text) > 100:
-                print(f"First 500 chars of Playwright text: {all_text[:500]}...")
-                
-                # Split into meaningful lines
-                lines = [line.strip() for line in all_text.split('\n') if line.strip() and len(line.strip()) > 10]
-                text_blocks = lines[:30]  # Take first 30 meaningful lines
-                
-                job_text = "\n".join(text_blocks)[:4000]  # Limit to 4000 chars
-                print(f"Playwright final job text length: {len(job_text)} characters")
-                
-                await browser.close()
-                return job_text
-            else:
-                print("Playwright also found minimal content")
-                await browser.close()
-                return ""
+                    # Try with a shorter timeout and different wait strategy
+                    navigation = await page.goto(url, wait_until='domcontentloaded', timeout=15000)
+                    if navigation is not None:
+                        headers = navigation.headers  # Validators for revalidating the cached page
+
+                    # Wait until the posting has rendered, at most BROWSER_READY_TIMEOUT_SECONDS
+                    with time_stage("browser_ready"):
+                        ready = await wait_until_ready(page, url)
+
+                except Exception as e:
+                    logger.warning("Page load timeout or error: %s", e, extra={"url": url})
+                    # Try to get whatever content is available
+                    pass
+
+                content = await page.content()
+                final_url = page.url
+                logger.info(
+                    "Rendered job page",
+                    extra={
+                        "url": url,
+                        "chars": len(content),
+                        "title": await page.title(),
+                        "ready": ready,
+                        "blocked_requests": blocked["blocked"],
+                    },
+                )
+
+        # The rendered page goes through the same content extraction, off the event loop
+        scraped = await asyncio.to_thread(parse_job_page, content, url, final_url, headers)
+        if scraped is None:
+            logger.info("Playwright also found minimal content", extra={"url": url})
+        return scraped
                 
+    except BrowserUnavailableError as e:
+        logger.warning("Playwright unavailable: %s", e)
+        return None
     except Exception as e:
-        print(f"Playwright scraping failed: {e}")
-        return ""
\ No newline at end of file
+        logger.warning("Playwright scraping failed: %s", e, extra={"url": url})
+        return None
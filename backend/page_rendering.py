@@ -0,0 +1,215 @@
+"""
+Rendering job pages in the pooled browser: resource blocking and readiness detection.
+
+A job posting needs the document, its scripts and the API calls those
+scripts make. Images, media, fonts and stylesheets are aborted, and so is
+anything from known analytics, advertising and consent-banner hosts. Pages
+download far fewer bytes and settle sooner.
+
+There is no fixed sleep after navigation. A page counts as ready as soon as
+one of these holds:
+- the site's known job-content element (or schema.org JobPosting data) is
+  present with enough text
+- the DOM has had no mutations for BROWSER_QUIET_MS and the page has enough text
+- the network has gone idle and the page has enough text
+BROWSER_READY_TIMEOUT_SECONDS caps the wait. Whatever has rendered by then is
+used.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+from html_extraction import MIN_CONTENT_CHARS
+from scrape_strategy import domain_of
+
+logger = logging.getLogger(__name__)
+
+# --- Page Rendering Configuration ---
+BROWSER_BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "true").lower() in ("1", "true", "yes")
+BROWSER_READY_TIMEOUT_SECONDS = float(os.getenv("BROWSER_READY_TIMEOUT_SECONDS", "5"))  # Longest wait after navigation
+BROWSER_QUIET_MS = int(os.getenv("BROWSER_QUIET_MS", "500"))  # DOM without mutations for this long counts as settled
+
+# Playwright resource types that never carry job text
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet", "texttrack", "manifest"})
+
+# Third-party analytics, advertising, session recording and consent hosts (and their subdomains)
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "snap.licdn.com",
+    "ads.linkedin.com",
+    "analytics.tiktok.com",
+    "hotjar.com",
+    "fullstory.com",
+    "mixpanel.com",
+    "segment.com",
+    "segment.io",
+    "amplitude.com",
+    "heapanalytics.com",
+    "optimizely.com",
+    "nr-data.net",
+    "newrelic.com",
+    "intercom.io",
+    "intercomcdn.com",
+    "onetrust.com",
+    "cookielaw.org",
+    "trustarc.com",
+    "qualtrics.com",
+)
+
+# Elements holding the posting on job boards that render it client-side
+JOB_CONTENT_SELECTORS = {
+    "myworkdayjobs.com": ['[data-automation-id="jobPostingDescription"]'],
+    "myworkdaysite.com": ['[data-automation-id="jobPostingDescription"]'],
+    "greenhouse.io": [".job__description", "#content"],
+    "lever.co": ['[data-qa="job-description"]', ".posting-page"],
+    "linkedin.com": [".show-more-less-html__markup", ".description__text"],
+    "indeed.com": ["#jobDescriptionText"],
+    "smartrecruiters.com": ['[itemprop="description"]'],
+}
+GENERIC_JOB_CONTENT_SELECTORS = ['[itemprop="description"]']
+
+# Resolves with the reason the page counts as ready. Selector matches use textContent (no layout);
+# the whole-page check uses innerText so inline script source is not mistaken for job text.
+READY_SCRIPT = """
+({selectors, minChars, quietMs, timeoutMs}) => new Promise((resolve) => {
+  let observer = null;
+  let quietTimer = null;
+  const finish = (reason) => {
+    if (observer) observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(deadline);
+    resolve(reason);
+  };
+  const contentReady = () => {
+    for (const selector of selectors) {
+      const element = document.querySelector(selector);
+      if (element && element.textContent.trim().length >= minChars) return "selector";
+    }
+    for (const script of document.querySelectorAll('script[type="application/ld+json"]')) {
+      if (script.textContent.includes("JobPosting")) return "structured_data";
+    }
+    return null;
+  };
+  const onQuiet = () => {
+    if (document.body && document.body.innerText.trim().length >= minChars) finish("dom_quiet");
+  };
+  const deadline = setTimeout(() => finish("timeout"), timeoutMs);
+  const ready = contentReady();
+  if (ready) return finish(ready);
+  observer = new MutationObserver(() => {
+    const reason = contentReady();
+    if (reason) return finish(reason);
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(onQuiet, quietMs);
+  });
+  observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+  quietTimer = setTimeout(onQuiet, quietMs);
+})
+"""
+
+BODY_TEXT_SCRIPT = "() => document.body ? document.body.innerText.trim().length : 0"
+
+
+def _matches(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def job_content_selectors(url: str) -> list[str]:
+    domain = domain_of(url)
+    for site, selectors in JOB_CONTENT_SELECTORS.items():
+        if _matches(domain, (site,)):
+            return selectors + GENERIC_JOB_CONTENT_SELECTORS
+    return GENERIC_JOB_CONTENT_SELECTORS
+
+
+def should_block(resource_type: str, request_url: str) -> bool:
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    return _matches((urlparse(request_url).hostname or "").lower(), TRACKER_DOMAINS)
+
+
+async def block_resources(page: Any) -> dict:
+    """Abort non-essential requests for the rest of the page's life; returns live {"blocked": n} counts"""
+    counts = {"blocked": 0}
+    if not BROWSER_BLOCK_RESOURCES:
+        return counts
+
+    async def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url):
+            counts["blocked"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", handle)
+    return counts
+
+
+async def _network_idle_with_text(page: Any, timeout_ms: float) -> str:
+    started = time.monotonic()
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+        if await page.evaluate(BODY_TEXT_SCRIPT) >= MIN_CONTENT_CHARS:
+            return "network_idle"
+    except Exception:
+        pass  # Never idle (polling, websockets) or navigated away; the DOM checks decide
+    await asyncio.sleep(max(0.0, timeout_ms / 1000 - (time.monotonic() - started)))
+    return "timeout"
+
+
+async def wait_until_ready(page: Any, url: str, timeout: float = BROWSER_READY_TIMEOUT_SECONDS) -> str:
+    """Wait after navigation until the job content has rendered, at most timeout seconds; returns why it stopped"""
+    deadline = time.monotonic() + timeout
+    selectors = job_content_selectors(url)
+    while True:
+        remaining_ms = (deadline - time.monotonic()) * 1000
+        if remaining_ms <= 0:
+            return "timeout"
+        checks = [
+            asyncio.ensure_future(
+                page.evaluate(
+                    READY_SCRIPT,
+                    {
+                        "selectors": selectors,
+                        "minChars": MIN_CONTENT_CHARS,
+                        "quietMs": BROWSER_QUIET_MS,
+                        "timeoutMs": remaining_ms,
+                    },
+                )
+            ),
+            asyncio.ensure_future(_network_idle_with_text(page, remaining_ms)),
+        ]
+        try:
+            done, _ = await asyncio.wait(checks, timeout=remaining_ms / 1000, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for check in checks:
+                check.cancel()
+            # Collect the cancelled checks, so their errors are not reported as unhandled
+            await asyncio.gather(*checks, return_exceptions=True)
+        if not done:
+            return "timeout"
+        check = done.pop()
+        try:
+            return check.result()
+        except Exception as e:
+            # Usually a client-side redirect replaced the document; check the new one
+            logger.info("Readiness check interrupted (%s), waiting for the next document", e, extra={"url": url})
+            try:
+                await page.wait_for_load_state(
+                    "domcontentloaded", timeout=max(1.0, (deadline - time.monotonic()) * 1000)
+                )
+            except Exception:
+                return "timeout"
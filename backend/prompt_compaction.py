@@ -0,0 +1,220 @@
+"""
+Prompt compaction for job descriptions and resumes.
+
+Scraped postings carry a lot of text the model does not need: EEO statements,
+benefits lists, cookie banners and navigation repeated around the posting.
+Every token of it is billed and slows generation, so prompt inputs go through
+a compaction stage first:
+
+1. whitespace is normalized and repeated lines are dropped,
+2. if the text is over its token budget, boilerplate lines and sections
+   (EEO, benefits, cookies, "how to apply") are removed,
+3. what is left is trimmed to the budget, dropping the end of general
+   sections first so requirement and responsibility sections stay intact.
+
+A section starts at a standalone heading line: never the first line (the
+job title) or a list item, and headings match their keywords as whole words,
+so "- Build privacy tooling for GDPR" does not start a "privacy" section.
+
+Budgets are counted with the model's tokenizer (tiktoken). Where tiktoken or
+its encoding file is unavailable, tokens are estimated at four characters
+each.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from llm_client import DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+# --- Compaction Configuration ---
+PROMPT_COMPACTION = os.getenv("PROMPT_COMPACTION", "true").lower() in ("1", "true", "yes")
+JOB_DESCRIPTION_TOKEN_BUDGET = int(os.getenv("JOB_DESCRIPTION_TOKEN_BUDGET", "1500"))
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "3000"))
+CHARS_PER_TOKEN_ESTIMATE = 4
+RESUME_DEDUPE_MIN_WORDS = 6  # Short resume lines (titles, skills) legitimately repeat
+
+# Sections kept whole: the parts of a posting the analysis is graded against
+PROTECTED_HEADINGS = re.compile(
+    r"\b(?:requirements?|qualifications?|responsibilit(?:y|ies)|what you(?:'ll| will) (?:do|bring)"
+    r"|what we(?:'re| are) looking for|who you are|about you|you have|you will|skills|must haves?"
+    r"|nice to haves?|preferred|experience|the role|your role|duties)\b"
+)
+# Sections dropped entirely
+BOILERPLATE_HEADINGS = re.compile(
+    r"\b(?:equal (?:employment )?opportunity|eeoc?|diversity|accommodations?|benefits|perks|what we offer"
+    r"|cookies?|privacy|disclaimer|pay transparency|e-verify|how to apply|application process"
+    r"|(?:similar|related|more) jobs|share this job|recruitment fraud)\b"
+)
+BULLET = re.compile(r"^(?:[-*•·▪◦–—]|\d{1,2}[.)])\s")
+MINOR_WORDS = {"a", "an", "and", "or", "of", "the", "to", "for", "in", "on", "at", "with", "&", "our", "your"}
+MAX_PLAIN_HEADING_WORDS = 4  # Longer unmarked lines must be in Title Case to count as a boilerplate heading
+
+# Lines dropped wherever they appear
+BOILERPLATE_LINES = re.compile(
+    r"\b(?:we use cookies|accept (?:all )?cookies|cookie (?:settings|preferences|policy)"
+    r"|equal (?:employment )?opportunity employer|without regard to (?:race|their)|reasonable accommodations?"
+    r"|e-verify)\b"
+    r"|^(?:apply(?: now| for this job| here)?|sign in|log in|save(?: job)?|share(?: this job)?|back to (?:all )?jobs"
+    r"|skip to (?:main )?content|view all jobs|search jobs|careers home|menu|close|home)$",
+    re.IGNORECASE,
+)
+HEADING_MARKUP = re.compile(r"^(?:#+\s*|\*\*)|(?:\*\*|:)$")
+
+_encoding = None
+_encoding_loaded = False
+
+
+def load_tokenizer():
+    """Load the tokenizer (may download its encoding file). Called from the app lifespan, off the event loop."""
+    global _encoding, _encoding_loaded
+    if _encoding_loaded:
+        return
+    _encoding_loaded = True
+    try:
+        import tiktoken
+        _encoding = tiktoken.encoding_for_model(DEFAULT_MODEL)
+    except Exception as e:
+        # Not installed, or the encoding file could not be downloaded
+        logger.warning("tiktoken unavailable, estimating prompt tokens from characters: %s", e)
+        return
+    logger.info("Tokenizer loaded for prompt compaction", extra={"encoding": _encoding.name})
+
+
+def _get_encoding():
+    # A no-op after the lifespan's call; without one, the first compaction blocks while tiktoken loads
+    load_tokenizer()
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN_ESTIMATE - 1) // CHARS_PER_TOKEN_ESTIMATE
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: budget * CHARS_PER_TOKEN_ESTIMATE]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= budget else encoding.decode(tokens[:budget])
+
+
+@dataclass
+class CompactedText:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+@dataclass
+class _Section:
+    kind: str  # "protected", "boilerplate" or "general"
+    lines: list[str]
+
+
+def _heading_kind(line: str) -> Optional[str]:
+    """Section kind if line is a standalone heading, else None"""
+    words = line.split()
+    if not words or len(words) > 8 or line.endswith((".", "!", "?", ",")) or BULLET.match(line):
+        return None
+    text = HEADING_MARKUP.sub("", line).strip().lower()
+    marked = HEADING_MARKUP.search(line) is not None or (line.isupper() and len(line) > 3)
+    if PROTECTED_HEADINGS.search(text):
+        return "protected"
+    if BOILERPLATE_HEADINGS.search(text):
+        # Dropping a section loses everything up to the next heading, so the line must look like one
+        title_case = all(not w[0].isalpha() or w[0].isupper() or w.lower() in MINOR_WORDS for w in words)
+        if marked or title_case or len(words) <= MAX_PLAIN_HEADING_WORDS:
+            return "boilerplate"
+    return "general" if marked else None
+
+
+def _clean_lines(text: str, strip_boilerplate: bool, dedupe_min_words: int) -> list[str]:
+    lines = []
+    seen = set()
+    for raw in text.splitlines():
+        line = re.sub(r"\s+", " ", raw).strip()
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if strip_boilerplate and BOILERPLATE_LINES.search(line):
+            continue
+        key = line.lower()
+        if len(line.split()) >= dedupe_min_words:
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _sections(lines: list[str]) -> list[_Section]:
+    sections = [_Section("general", [])]
+    for index, line in enumerate(lines):
+        # The first line is the title ("Privacy Engineer"), not a heading
+        kind = _heading_kind(line) if line and index > 0 else None
+        if kind is not None:
+            sections.append(_Section(kind, []))
+        sections[-1].lines.append(line)
+    return [s for s in sections if any(s.lines)]
+
+
+def _trim_to_budget(sections: list[_Section], budget: int) -> str:
+    text = "\n".join(line for s in sections for line in s.lines).strip()
+    # Per-line counts overestimate the whole text's, so only trim text that is really over
+    if count_tokens(text) <= budget:
+        return text
+    line_tokens = {id(s): [count_tokens(line) + 1 for line in s.lines] for s in sections}
+    total = sum(sum(counts) for counts in line_tokens.values())
+    # Drop general text from the end of the posting first, keeping requirement sections whole
+    for section in reversed(sections):
+        if section.kind == "protected":
+            continue
+        counts = line_tokens[id(section)]
+        while section.lines and total > budget:
+            section.lines.pop()
+            total -= counts.pop()
+        if total <= budget:
+            break
+    text = "\n".join(line for s in sections for line in s.lines).strip()
+    return truncate_to_tokens(text, budget)
+
+
+def compact_text(text: str, budget: int, strip_boilerplate: bool = True, dedupe_min_words: int = 0) -> CompactedText:
+    """Dedupe lines, drop boilerplate lines and sections (if strip_boilerplate and over budget) and trim to budget tokens"""
+    tokens_before = count_tokens(text)
+    if not PROMPT_COMPACTION:
+        return CompactedText(text, tokens_before, tokens_before)
+    # Text that already fits loses nothing but whitespace and repeated lines
+    strip_boilerplate = strip_boilerplate and tokens_before > budget
+    sections = _sections(_clean_lines(text, strip_boilerplate, dedupe_min_words))
+    if strip_boilerplate:
+        sections = [s for s in sections if s.kind != "boilerplate"]
+    else:
+        for section in sections:
+            section.kind = "general"
+    compacted = _trim_to_budget(sections, budget)
+    return CompactedText(compacted, tokens_before, count_tokens(compacted))
+
+
+def compact_job_description(job_description: str, budget: int = JOB_DESCRIPTION_TOKEN_BUDGET) -> CompactedText:
+    return compact_text(job_description, budget)
+
+
+def compact_resume(resume: str, budget: int = RESUME_TOKEN_BUDGET) -> CompactedText:
+    # Resumes have no boilerplate; a "Privacy" heading or an "E-Verify" line there is real content
+    return compact_text(resume, budget, strip_boilerplate=False, dedupe_min_words=RESUME_DEDUPE_MIN_WORDS)
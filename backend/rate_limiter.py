@@ -0,0 +1,205 @@
+"""
+Per-client rate limiting.
+
+Each client (identified by IP address) has a budget of cost units per time
+window in each bucket, and every endpoint charges its bucket a cost
+reflecting the LLM work it does (see ENDPOINT_RATE_LIMITS in main.py).
+Usage is tracked with a sliding-window counter: the current and previous
+fixed-window counts, weighted by how far into the current window we are.
+That is O(1) per check with a single row per client and bucket.
+
+Counters live in a pluggable backend. The SQLite backend is shared by every
+uvicorn worker on the machine, so the limit holds no matter how many workers
+run; the memory backend is per-process. Both drop clients that have been idle
+for two full windows, since they have nothing left to count.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+from fastapi import HTTPException, Request
+
+from metrics import RATE_LIMIT_REJECTIONS, time_stage
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend(Protocol):
+    def hit(self, key: str, cost: int, limit: int, window_seconds: float, now: float) -> Optional[float]:
+        """Charge cost if it fits in the limit and return None, else return seconds until it would fit."""
+        ...
+
+    def close(self):
+        ...
+
+
+def _sliding_window(
+    window_start: float, prev_count: float, curr_count: float, cost: int, limit: int, window_seconds: float, now: float
+) -> tuple[Optional[float], float, float, float]:
+    """Roll the fixed windows forward to now and try to charge cost.
+
+    Returns (retry_after, window_start, prev_count, curr_count) with the updated counter state.
+    """
+    current_start = now - (now % window_seconds)
+    if current_start != window_start:
+        # Last window's count becomes "previous" only if it was the window right before this one
+        prev_count = curr_count if current_start - window_start == window_seconds else 0.0
+        curr_count = 0.0
+        window_start = current_start
+
+    elapsed = now - window_start
+    estimated = prev_count * (1 - elapsed / window_seconds) + curr_count
+    if estimated + cost <= limit:
+        return None, window_start, prev_count, curr_count + cost
+
+    # Time until the weighted count has decayed enough for this cost to fit
+    if curr_count + cost > limit:
+        # Only the next window's decay of the current count can make room
+        fraction = 1 - (limit - cost) / curr_count if curr_count > 0 else 1.0
+        retry_after = (window_seconds - elapsed) + window_seconds * max(0.0, fraction)
+    else:
+        fraction = 1 - (limit - cost - curr_count) / prev_count
+        retry_after = window_seconds * fraction - elapsed
+    return max(retry_after, 0.0), window_start, prev_count, curr_count
+
+
+class MemoryBackend:
+    """Counters in process memory; each worker process enforces its own limit."""
+
+    MAX_KEYS = 10000  # Prune idle clients beyond this many
+
+    def __init__(self):
+        self._counters: dict[str, tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, cost: int, limit: int, window_seconds: float, now: float) -> Optional[float]:
+        with self._lock:
+            window_start, prev_count, curr_count = self._counters.get(key, (0.0, 0.0, 0.0))
+            retry_after, *state = _sliding_window(window_start, prev_count, curr_count, cost, limit, window_seconds, now)
+            self._counters[key] = tuple(state)  # type: ignore[assignment]
+            if len(self._counters) > self.MAX_KEYS:
+                # Clients idle for two full windows have nothing left to count
+                cutoff = now - 2 * window_seconds
+                self._counters = {k: v for k, v in self._counters.items() if v[0] > cutoff}
+        return retry_after
+
+    def close(self):
+        self._counters.clear()
+
+
+class SQLiteBackend:
+    """Counters in a SQLite file shared by all worker processes on the machine."""
+
+    PRUNE_INTERVAL_SECONDS = 300  # How often idle clients' rows are deleted
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._next_prune_at = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit mode so transactions are controlled explicitly below
+            db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, window_start REAL NOT NULL, "
+                "prev_count REAL NOT NULL, curr_count REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS rate_limits_window_start ON rate_limits(window_start)")
+            self._db = db
+        return self._db
+
+    def hit(self, key: str, cost: int, limit: int, window_seconds: float, now: float) -> Optional[float]:
+        with self._lock:
+            db = self._connection()
+            # IMMEDIATE takes the write lock up front so concurrent workers cannot double-spend
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT window_start, prev_count, curr_count FROM rate_limits WHERE key = ?", (key,)
+                ).fetchone()
+                retry_after, *state = _sliding_window(*(row or (0.0, 0.0, 0.0)), cost, limit, window_seconds, now)
+                db.execute(
+                    "INSERT OR REPLACE INTO rate_limits (key, window_start, prev_count, curr_count) VALUES (?, ?, ?, ?)",
+                    (key, *state),
+                )
+                if now >= self._next_prune_at:
+                    self._next_prune_at = now + self.PRUNE_INTERVAL_SECONDS
+                    db.execute("DELETE FROM rate_limits WHERE window_start <= ?", (now - 2 * window_seconds,))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return retry_after
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+@dataclass(frozen=True)
+class EndpointRule:
+    bucket: str  # Endpoints in the same bucket share a client's budget
+    cost: int = 1
+
+
+class RateLimiter:
+    """Charges endpoint costs against per-client budgets and raises 429 with Retry-After when exhausted."""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        limit: int,
+        window_seconds: float,
+        endpoint_rules: dict[str, EndpointRule],
+        trust_forwarded_for: bool = False,
+    ):
+        self.backend = backend
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.endpoint_rules = endpoint_rules
+        self.trust_forwarded_for = trust_forwarded_for
+
+    def client_id(self, request: Request) -> str:
+        if self.trust_forwarded_for:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    async def check(self, request: Request, endpoint: str):
+        """Charge this request's cost, or raise HTTP 429 if the client's budget is used up."""
+        rule = self.endpoint_rules.get(endpoint, EndpointRule(bucket=endpoint))
+        key = f"{rule.bucket}:{self.client_id(request)}"
+        with time_stage("rate_limit"):
+            retry_after = await asyncio.to_thread(
+                self.backend.hit, key, rule.cost, self.limit, self.window_seconds, time.time()
+            )
+        if retry_after is not None:
+            RATE_LIMIT_REJECTIONS.inc(endpoint=endpoint)
+            logger.warning(
+                "Rate limit exceeded", extra={"client": key, "endpoint": endpoint, "retry_after": round(retry_after)}
+            )
+            raise HTTPException(
+                status_code=429,
+                detail="API rate limit exceeded. Please try again later.",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,120 @@
+"""
+Scrape result caching helpers.
+
+Scraped postings are cached by a normalized URL, so the same posting shared
+with different tracking parameters (utm_*, gh_src, LinkedIn's trk/refId, ...)
+is scraped once. Pages are also stored under their final URL after redirects
+and their <link rel="canonical">, but only a canonical on the page's own site
+(same registrable domain): otherwise any page could claim another site's URL
+and have its content served for it. Entries keep the document's ETag and
+Last-Modified; once an entry is past its freshness window it is revalidated
+with a conditional GET, which costs one small request instead of a re-scrape
+(and never a browser).
+"""
+
+import dataclasses
+import time
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from scrape_strategy import ScrapedPage
+
+# Query parameters that only track where a click came from. Only vendor-specific names: generic ones
+# such as source, ref or si select content on some sites, and dropping them would merge distinct pages.
+TRACKING_PARAMS = frozenset({
+    "gh_src", "lever-source", "lever-origin", "lever-source[]", "trk", "trkinfo", "trackingid",
+    "gclid", "dclid", "fbclid", "msclkid", "igshid", "mc_cid", "mc_eid", "_hsenc", "_hsmi", "mkt_tok",
+})
+# Generic names that are tracking-only on these sites (by registrable domain)
+SITE_TRACKING_PARAMS = {
+    "linkedin.com": frozenset({"refid", "ebp", "lipi"}),
+}
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# Hosting suffixes where each subdomain belongs to a different owner, so they count as top-level domains
+SHARED_HOST_SUFFIXES = (
+    "github.io", "gitlab.io", "netlify.app", "vercel.app", "pages.dev", "herokuapp.com", "web.app",
+    "firebaseapp.com", "azurewebsites.net", "cloudfront.net", "appspot.com", "blogspot.com", "wordpress.com",
+)
+
+
+def _is_tracking(param: str, site_params: frozenset) -> bool:
+    param = param.lower()
+    return param in TRACKING_PARAMS or param in site_params or param.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url: str) -> str:
+    """Case-fold scheme and host, drop default ports, fragments and tracking parameters, sort the query"""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if port and DEFAULT_PORTS.get(scheme) != port:
+        netloc += f":{port}"
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    site_params = SITE_TRACKING_PARAMS.get(registrable_domain(parts.hostname or ""), frozenset())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k, site_params)
+    )
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def registrable_domain(host: str) -> str:
+    """The domain a site's owner controls ("careers.acme.co.uk" -> "acme.co.uk"), by the usual label heuristics"""
+    host = host.lower().rstrip(".")
+    labels = host.split(".")
+    if len(labels) < 2 or host.replace(".", "").isdigit():
+        return host
+    for suffix in SHARED_HOST_SUFFIXES:
+        if host.endswith("." + suffix):
+            return ".".join(labels[-(suffix.count(".") + 2):])
+    # Two-letter country codes with a short second level: acme.co.uk, acme.com.au
+    if len(labels) >= 3 and len(labels[-1]) == 2 and len(labels[-2]) <= 3:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _same_site(url: str, other: str) -> bool:
+    host, other_host = urlsplit(url).hostname, urlsplit(other).hostname
+    return bool(host and other_host) and registrable_domain(host) == registrable_domain(other_host)
+
+
+def page_urls(page: ScrapedPage) -> list[str]:
+    """Normalized URLs a scraped page can be found under: as requested, after redirects and a same-site canonical"""
+    candidates = [page.url, page.final_url]
+    # Compared with where the document was actually served from, since that is what declared the canonical
+    if page.canonical_url and _same_site(page.canonical_url, page.final_url or page.url):
+        candidates.append(page.canonical_url)
+    urls = []
+    for url in candidates:
+        if url and urlsplit(url).scheme in ("http", "https"):
+            normalized = normalize_url(url)
+            if normalized not in urls:
+                urls.append(normalized)
+    return urls
+
+
+def page_to_entry(page: ScrapedPage, validated_at: Optional[float] = None) -> dict:
+    return {**dataclasses.asdict(page), "validated_at": validated_at if validated_at is not None else time.time()}
+
+
+def page_from_entry(entry: dict, url: str) -> ScrapedPage:
+    """The cached page, reported under the URL it was requested with this time"""
+    fields = {f.name for f in dataclasses.fields(ScrapedPage)}
+    return dataclasses.replace(ScrapedPage(**{k: v for k, v in entry.items() if k in fields}), url=url)
+
+
+def conditional_headers(entry: dict) -> dict:
+    """If-None-Match / If-Modified-Since headers for revalidating an entry (empty without validators)"""
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
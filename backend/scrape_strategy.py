@@ -0,0 +1,162 @@
+"""
+Hedged scraping strategy.
+
+Instead of waiting for the basic HTTP scrape to fail completely before
+rendering the page in a browser, the two paths are raced. Per-domain history
+decides when the browser path starts: immediately for domains that need
+JavaScript rendering, after a short hedge delay for domains we know little
+about, and only after a basic failure for domains where the basic path works.
+The first path to return a page with job text wins and the other is cancelled.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# --- Scrape Strategy Configuration ---
+SCRAPE_HEDGE_DELAY_SECONDS = float(os.getenv("SCRAPE_HEDGE_DELAY_SECONDS", "2"))  # Browser head start for unknown domains
+SCRAPE_STRATEGY_MAX_DOMAINS = 1000  # Domains whose history is remembered
+
+# Job boards that serve an empty JavaScript shell to plain HTTP clients
+KNOWN_SPA_DOMAINS = (
+    "myworkdayjobs.com",
+    "myworkdaysite.com",
+    "icims.com",
+    "taleo.net",
+    "successfactors.com",
+    "oraclecloud.com",
+    "ultipro.com",
+    "paylocity.com",
+    "adp.com",
+)
+
+# Exponentially weighted success rate of the basic path per domain
+SUCCESS_WEIGHT = 0.3
+BASIC_FIRST_THRESHOLD = 0.7  # At or above: only use the browser after a basic failure
+BROWSER_FIRST_THRESHOLD = 0.3  # At or below: start the browser right away
+
+BASIC_FIRST = "basic_first"
+HEDGE = "hedge"
+BROWSER_FIRST = "browser_first"
+
+@dataclass
+class ScrapedPage:
+    url: str
+    text: str  # Extracted job posting text
+    title: str = ""  # <title>
+    site_name: str = ""  # og:site_name
+    company_name: str = ""  # hiringOrganization from schema.org JobPosting data
+    structured: bool = False  # Text was built from JobPosting data rather than extracted from the layout
+    # For caching and revalidation (scrape_cache.py)
+    final_url: str = ""  # After redirects
+    canonical_url: str = ""  # <link rel="canonical">
+    etag: str = ""
+    last_modified: str = ""
+
+
+# Returns None when the path could not get job text from the page
+ScrapeFn = Callable[[str], Awaitable[Optional[ScrapedPage]]]
+
+
+@dataclass
+class DomainStats:
+    basic_success_rate: float
+    browser_successes: int = 0
+
+
+def domain_of(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class ScrapeStrategy:
+    """Races the basic and browser scrape paths using per-domain history."""
+
+    def __init__(self, hedge_delay: float = SCRAPE_HEDGE_DELAY_SECONDS, max_domains: int = SCRAPE_STRATEGY_MAX_DOMAINS):
+        self.hedge_delay = hedge_delay
+        self.max_domains = max_domains
+        self._stats: "OrderedDict[str, DomainStats]" = OrderedDict()
+
+    def mode_for(self, domain: str) -> str:
+        stats = self._stats.get(domain)
+        if stats is None:
+            if any(domain == d or domain.endswith("." + d) for d in KNOWN_SPA_DOMAINS):
+                return BROWSER_FIRST
+            return HEDGE
+        if stats.basic_success_rate >= BASIC_FIRST_THRESHOLD:
+            return BASIC_FIRST
+        if stats.basic_success_rate <= BROWSER_FIRST_THRESHOLD and stats.browser_successes > 0:
+            return BROWSER_FIRST
+        return HEDGE
+
+    def record(self, domain: str, path: str, success: bool, structured: bool = False):
+        stats = self._stats.get(domain)
+        if stats is None:
+            # Start from the prior implied by the known-SPA list
+            prior = 0.0 if self.mode_for(domain) == BROWSER_FIRST else 0.5
+            stats = DomainStats(basic_success_rate=prior)
+            self._stats[domain] = stats
+        self._stats.move_to_end(domain)
+        if path == "basic" and structured:
+            # The domain serves JobPosting data to plain HTTP clients, so the browser is not needed
+            stats.basic_success_rate = 1.0
+        elif path == "basic":
+            stats.basic_success_rate += SUCCESS_WEIGHT * ((1.0 if success else 0.0) - stats.basic_success_rate)
+        elif success:
+            stats.browser_successes += 1
+        while len(self._stats) > self.max_domains:
+            self._stats.popitem(last=False)
+
+    async def scrape(self, url: str, basic: ScrapeFn, browser: ScrapeFn) -> Optional[ScrapedPage]:
+        """Return the page from whichever path succeeds first, or None if both fail"""
+        domain = domain_of(url)
+        mode = self.mode_for(domain)
+        browser_delay: Optional[float] = {BROWSER_FIRST: 0.0, HEDGE: self.hedge_delay, BASIC_FIRST: None}[mode]
+        logger.info("Scrape strategy chosen", extra={"domain": domain, "mode": mode})
+
+        started = time.monotonic()
+        basic_task = asyncio.create_task(basic(url))
+        browser_task = asyncio.create_task(browser(url)) if browser_delay == 0 else None
+        pending = {t for t in (basic_task, browser_task) if t is not None}
+        try:
+            while pending:
+                timeout = None
+                if browser_task is None and browser_delay is not None:
+                    timeout = max(0.0, started + browser_delay - time.monotonic())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    logger.info("Basic scrape still running after %ss, starting browser in parallel", browser_delay)
+                    browser_task = asyncio.create_task(browser(url))
+                    pending.add(browser_task)
+                    continue
+
+                for task in done:
+                    path = "basic" if task is basic_task else "browser"
+                    page = task.result() if task.exception() is None else None
+                    success = page is not None and bool(page.text)
+                    self.record(domain, path, success, structured=success and page.structured)
+                    if success:
+                        logger.info("Scrape won", extra={"path": path, "seconds": round(time.monotonic() - started, 3)})
+                        return page
+
+                if browser_task is None:
+                    logger.info("Basic scraping failed, trying with Playwright")
+                    browser_task = asyncio.create_task(browser(url))
+                    pending.add(browser_task)
+            return None
+        finally:
+            # Cancel the losing path (or everything, if our caller was cancelled)
+            for task in pending:
+                task.cancel()
+
+
+# Shared instance so domain history is kept across requests
+scrape_strategy = ScrapeStrategy()
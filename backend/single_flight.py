@@ -0,0 +1,76 @@
+"""
+Single-flight coalescing of identical in-flight work.
+
+A user can double-tap "Analyze", or a client can retry after a timeout while
+its first request is still running. Without coalescing, the server would start
+a second identical LLM completion or browser render. With it, a caller whose
+key matches a call already in flight waits for that call's result. Keys are
+content keys built with make_cache_key over the inputs that decide the result.
+
+The work runs in its own task, so a caller that goes away does not cancel it
+for the others. It is cancelled only when every caller has gone away. A key is
+forgotten as soon as its call finishes, so errors are shared only by the
+callers that were already waiting; the next call starts fresh.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+from metrics import COALESCED_CALLS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers with the same key share its outcome."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[str, _Call] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return fn()'s result, or the result of the identical call already running under key"""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finished(key, call))
+        else:
+            COALESCED_CALLS.inc(group=self.name)
+            logger.info("Joined an identical call in flight", extra={"group": self.name, "waiters": call.waiters + 1})
+
+        call.waiters += 1
+        try:
+            # Shielded, so cancelling this caller leaves the shared call running for the others
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Nobody else wants the result; stop the work (and any upstream generation)
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _finished(self, key: str, call: _Call):
+        self._forget(key, call)
+        if not call.task.cancelled():
+            # Mark the exception retrieved, so a failure after every caller left is not reported as unhandled
+            call.task.exception()
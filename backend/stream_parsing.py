@@ -0,0 +1,352 @@
+"""
+Incremental parsers for streamed LLM output.
+
+The parsers are fed text deltas as they arrive and return events for each
+piece of the answer as soon as it is complete: the match score, the
+justification and each suggestion for resume analysis, and each section for
+company research. Structured (JSON) answers are scanned field by field; plain
+text answers, from models without structured output, are parsed line by line.
+The endpoints still run the full parsers on the final text to produce the
+authoritative result.
+"""
+
+import json
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from structured_output import COMPANY_SECTIONS, MAX_SUGGESTIONS, valid_score
+
+COMPANY_SECTION_TITLES = {
+    "company overview": "company_overview",
+    "market & customers": "market_customers",
+    "key product areas": "key_products",
+    "company culture & values": "culture_values",
+    "industry & competition": "industry_competition",
+    "growth & opportunities": "growth_opportunities",
+    "additional insights": "additional_insights",
+}
+
+SCORE_LINE_RE = re.compile(r"score\W*?([0-9]{1,3})\s*(?:%|/\s*100|out of 100)", re.IGNORECASE)
+JUSTIFICATION_LINE_RE = re.compile(
+    r"(?:explanation|justification|how the score was calculated)\W*?:\W*(.*)$", re.IGNORECASE
+)
+SUGGESTIONS_HEADING_RE = re.compile(r"^\W*suggestions\b", re.IGNORECASE)
+LIST_ITEM_RE = re.compile(r"^\s*(?:\d+\.|[-*•])\s+(.+)$")
+COMPANY_SECTION_RE = re.compile(
+    r"^\W*(?:\d+\.\s*)?\W*(" + "|".join(re.escape(t) for t in COMPANY_SECTION_TITLES) + r")[\s*_#]*:?[\s*_]*(.*)$",
+    re.IGNORECASE,
+)
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _clean(text: str) -> str:
+    return text.strip().strip("*").strip()
+
+
+class _LineBuffer:
+    """Splits a stream of text deltas into complete lines."""
+
+    def __init__(self):
+        self._partial = ""
+
+    def feed(self, delta: str) -> list[str]:
+        self._partial += delta
+        *lines, self._partial = self._partial.split("\n")
+        return lines
+
+    def flush(self) -> list[str]:
+        line, self._partial = self._partial, ""
+        return [line] if line else []
+
+
+class JsonFieldStream:
+    """Incrementally scans a streamed JSON object and reports each top-level field once its value is complete.
+
+    feed() returns (key, value, is_item) tuples: is_item is False for a complete
+    top-level value and True for each complete element of a top-level array.
+    Each character is scanned once, so the cost is linear in the response size.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self._stack: list[str] = []  # Open "{" and "[" containers
+        self._in_string = False
+        self._escaped = False
+        self._expect_key = True
+        self._key: Optional[str] = None
+        self._string_start = 0
+        self._string_is_key = False
+        self._value_start: Optional[int] = None  # Start of a value being captured
+        self._value_depth = 0
+        self._scalar_start: Optional[int] = None
+
+    def feed(self, delta: str) -> list[tuple[str, Any, bool]]:
+        self._buffer += delta
+        fields = []
+        while self._position < len(self._buffer):
+            field = self._scan(self._buffer[self._position], self._position)
+            if field is not None:
+                fields.append(field)
+            self._position += 1
+        return fields
+
+    def _at_value(self) -> bool:
+        """Whether a value starting here is a top-level field value or an element of a top-level array"""
+        if len(self._stack) == 1:
+            return not self._expect_key
+        return len(self._stack) == 2 and self._stack[1] == "["
+
+    def _complete(self, end: int) -> Optional[tuple[str, Any, bool]]:
+        start, self._value_start = self._value_start, None
+        if start is None or self._key is None:
+            return None
+        try:
+            value = json.loads(self._buffer[start:end])
+        except ValueError:
+            return None
+        return (self._key, value, len(self._stack) == 2)
+
+    def _scan(self, char: str, index: int) -> Optional[tuple[str, Any, bool]]:
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                if self._string_is_key:
+                    self._key = json.loads(self._buffer[self._string_start:index + 1])
+                elif self._value_start is not None and len(self._stack) == self._value_depth:
+                    return self._complete(index + 1)
+            return None
+
+        field = None
+        if self._scalar_start is not None and (char.isspace() or char in ",]}"):
+            self._value_start, self._scalar_start = self._scalar_start, None
+            field = self._complete(index)
+
+        if char.isspace():
+            return field
+        if char == '"':
+            self._in_string = True
+            self._string_start = index
+            self._string_is_key = len(self._stack) == 1 and self._expect_key
+            if not self._string_is_key and self._value_start is None and self._at_value():
+                self._value_start, self._value_depth = index, len(self._stack)
+        elif char in "{[":
+            # A top-level array is reported element by element, not as a whole
+            if self._value_start is None and self._at_value() and not (len(self._stack) == 1 and char == "["):
+                self._value_start, self._value_depth = index, len(self._stack)
+            self._stack.append(char)
+        elif char in "}]":
+            if self._stack:
+                self._stack.pop()
+            if self._value_start is not None and len(self._stack) == self._value_depth:
+                field = self._complete(index + 1)
+        elif char == ":":
+            if len(self._stack) == 1:
+                self._expect_key = False
+        elif char == ",":
+            if len(self._stack) == 1:
+                self._expect_key = True
+        elif self._scalar_start is None and self._value_start is None and self._at_value():
+            self._scalar_start = index
+            self._value_depth = len(self._stack)
+        return field
+
+
+class _FormatDetectingParser(ABC):
+    """Parses structured output with JsonFieldStream, or plain text line by line, depending on how the answer starts."""
+
+    def __init__(self):
+        self._json: Optional[JsonFieldStream] = None
+        self._text = None
+        self._pending = ""
+
+    def feed(self, delta: str) -> list[tuple[str, Any]]:
+        if self._json is None and self._text is None:
+            self._pending += delta
+            if not self._pending.strip():
+                return []
+            delta, self._pending = self._pending, ""
+            if delta.lstrip().startswith("{"):
+                self._json = JsonFieldStream()
+            else:
+                self._text = self._text_parser()
+        if self._json is not None:
+            events = []
+            for key, value, is_item in self._json.feed(delta):
+                events.extend(self._json_field(key, value, is_item))
+            return events
+        return self._text.feed(delta)
+
+    def finish(self) -> list[tuple[str, Any]]:
+        if self._text is None and self._json is None:
+            if not self._pending.strip():
+                return []
+            self._text = self._text_parser()
+            self._text.feed(self._pending)
+        return self._text.finish() if self._text is not None else []
+
+    @abstractmethod
+    def _text_parser(self):
+        """The line-based parser used when the model answered in text"""
+
+    @abstractmethod
+    def _json_field(self, key: str, value: Any, is_item: bool) -> list[tuple[str, Any]]:
+        """Events for one completed JSON field (or array item, when is_item)"""
+
+
+class AnalysisStreamParser(_FormatDetectingParser):
+    """Emits ("score", int), ("justification", str) and ("suggestion", str) events."""
+
+    def __init__(self):
+        super().__init__()
+        self._suggestion_count = 0
+
+    def _text_parser(self):
+        return _AnalysisTextParser()
+
+    def _json_field(self, key: str, value: Any, is_item: bool) -> list[tuple[str, Any]]:
+        if key == "match_score" and not is_item and valid_score(value) is not None:
+            return [("score", valid_score(value))]
+        if key == "justification" and not is_item and isinstance(value, str):
+            return [("justification", value.strip())]
+        if key == "suggestions" and is_item and isinstance(value, str) and value.strip():
+            if self._suggestion_count < MAX_SUGGESTIONS:
+                self._suggestion_count += 1
+                return [("suggestion", value.strip())]
+        return []
+
+
+class CompanyResearchStreamParser(_FormatDetectingParser):
+    """Emits ("section", {"name": ..., "content": ...}) once each company_info section is complete.
+
+    Fused responses also emit ("company", name) as soon as the company name is complete.
+    """
+
+    def _text_parser(self):
+        return _CompanyResearchTextParser()
+
+    def _json_field(self, key: str, value: Any, is_item: bool) -> list[tuple[str, Any]]:
+        if key in COMPANY_SECTIONS and not is_item and isinstance(value, str):
+            return [("section", {"name": key, "content": value.strip()})]
+        if key == "company_name" and not is_item and isinstance(value, str):
+            return [("company", value.strip() or "Unknown Company")]
+        return []
+
+
+class _AnalysisTextParser:
+    """Line-based parser for plain text analyses."""
+
+    def __init__(self):
+        self._lines = _LineBuffer()
+        self._score_sent = False
+        self._justification_sent = False
+        self._awaiting_justification = False
+        self._in_suggestions = False
+        self._suggestion_count = 0
+
+    def feed(self, delta: str) -> list[tuple[str, Any]]:
+        events = []
+        for line in self._lines.feed(delta):
+            events.extend(self._parse_line(line))
+        return events
+
+    def finish(self) -> list[tuple[str, Any]]:
+        events = []
+        for line in self._lines.flush():
+            events.extend(self._parse_line(line))
+        return events
+
+    def _parse_line(self, line: str) -> list[tuple[str, Any]]:
+        text = line.strip()
+        if not text:
+            return []
+
+        if not self._score_sent:
+            match = SCORE_LINE_RE.search(text)
+            if match and int(match.group(1)) <= 100:
+                self._score_sent = True
+                return [("score", int(match.group(1)))]
+
+        if not self._justification_sent:
+            if self._awaiting_justification:
+                self._justification_sent = True
+                return [("justification", _clean(text))]
+            match = JUSTIFICATION_LINE_RE.search(text)
+            if match:
+                if _clean(match.group(1)):
+                    self._justification_sent = True
+                    return [("justification", _clean(match.group(1)))]
+                # Heading on its own line; the explanation follows
+                self._awaiting_justification = True
+                return []
+
+        if SUGGESTIONS_HEADING_RE.match(text):
+            self._in_suggestions = True
+            return []
+        if self._in_suggestions and self._suggestion_count < MAX_SUGGESTIONS:
+            match = LIST_ITEM_RE.match(text)
+            if match:
+                self._suggestion_count += 1
+                return [("suggestion", _clean(match.group(1)))]
+        return []
+
+
+class _CompanyResearchTextParser:
+    """Line-based parser for plain text company research, split on the numbered section headings."""
+
+    def __init__(self):
+        self._lines = _LineBuffer()
+        self._section = None
+        self._content: list[str] = []
+
+    def feed(self, delta: str) -> list[tuple[str, Any]]:
+        events = []
+        for line in self._lines.feed(delta):
+            events.extend(self._parse_line(line))
+        return events
+
+    def finish(self) -> list[tuple[str, Any]]:
+        events = []
+        for line in self._lines.flush():
+            events.extend(self._parse_line(line))
+        events.extend(self._close_section())
+        return events
+
+    def _parse_line(self, line: str) -> list[tuple[str, Any]]:
+        match = COMPANY_SECTION_RE.match(line)
+        if match:
+            # A new heading means the previous section is complete
+            events = self._close_section()
+            self._section = COMPANY_SECTION_TITLES[match.group(1).lower()]
+            self._content = [_clean(match.group(2))] if _clean(match.group(2)) else []
+            return events
+        if self._section is not None and line.strip():
+            self._content.append(line.strip())
+        return []
+
+    def _close_section(self) -> list[tuple[str, Any]]:
+        if self._section is None:
+            return []
+        event = ("section", {"name": self._section, "content": "\n".join(self._content).strip()})
+        self._section = None
+        self._content = []
+        return [event]
+
+
+def parse_company_sections(content: str) -> dict:
+    """Split a plain text company research answer into company_info sections in one pass"""
+    parser = _CompanyResearchTextParser()
+    company_info = {section: "" for section in COMPANY_SECTIONS}
+    for _, section in parser.feed(content) + parser.finish():
+        if not company_info[section["name"]]:
+            company_info[section["name"]] = section["content"]
+    return company_info
@@ -0,0 +1,126 @@
+"""
+Structured (JSON-schema) responses for the analysis and company research prompts.
+
+The LLM calls request a strict JSON schema, so a response is parsed with one
+json.loads and a shape check instead of a cascade of regexes. The parsers
+return None for anything that does not validate, and callers fall back to the
+text parsers (for models or OpenAI-compatible servers without structured
+output support).
+"""
+
+import json
+from typing import Any, Optional
+
+COMPANY_SECTIONS = (
+    "company_overview",
+    "market_customers",
+    "key_products",
+    "culture_values",
+    "industry_competition",
+    "growth_opportunities",
+    "additional_insights",
+)
+
+MAX_SUGGESTIONS = 5  # Returned to the UI; the model may produce more
+
+# Property order is generation order, so streamed fields arrive in the order the UI shows them
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "match_score": {"type": "integer", "description": "Match score from 0 to 100"},
+        "justification": {"type": "string", "description": "Brief explanation of how the score was calculated"},
+        "highlights": {"type": "array", "items": {"type": "string"}, "description": "Strong matches and potential gaps"},
+        "suggestions": {"type": "array", "items": {"type": "string"}, "description": "Specific resume changes"},
+    },
+    "required": ["match_score", "justification", "highlights", "suggestions"],
+    "additionalProperties": False,
+}
+
+COMPANY_RESEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {section: {"type": "string"} for section in COMPANY_SECTIONS},
+    "required": list(COMPANY_SECTIONS),
+    "additionalProperties": False,
+}
+
+
+# Fused extraction + research: the company name comes first so it can be checked
+# against the research cache while the sections are still being generated
+FUSED_COMPANY_RESEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "company_name": {"type": "string", "description": 'Name of the hiring company, or "Unknown Company"'},
+        **COMPANY_RESEARCH_SCHEMA["properties"],
+    },
+    "required": ["company_name", *COMPANY_SECTIONS],
+    "additionalProperties": False,
+}
+
+
+def json_schema_format(name: str, schema: dict) -> dict:
+    """response_format value asking the model for JSON that matches schema"""
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+
+ANALYSIS_RESPONSE_FORMAT = json_schema_format("resume_analysis", ANALYSIS_SCHEMA)
+COMPANY_RESEARCH_RESPONSE_FORMAT = json_schema_format("company_research", COMPANY_RESEARCH_SCHEMA)
+FUSED_COMPANY_RESEARCH_RESPONSE_FORMAT = json_schema_format("company_research_fused", FUSED_COMPANY_RESEARCH_SCHEMA)
+
+
+def _load_object(content: str) -> Optional[dict]:
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def valid_score(value: Any) -> Optional[int]:
+    # bool is an int subclass, but true/false is not a score
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if value != int(value) or not 0 <= value <= 100:
+        return None
+    return int(value)
+
+
+def parse_analysis_json(content: str) -> Optional[dict]:
+    """Validate a structured analysis and return {"match_score", "justification", "suggestions"}, or None"""
+    data = _load_object(content)
+    if data is None:
+        return None
+    score = valid_score(data.get("match_score"))
+    justification = data.get("justification")
+    suggestions = data.get("suggestions")
+    if score is None or not isinstance(justification, str) or not isinstance(suggestions, list):
+        return None
+    suggestions = [s.strip() for s in suggestions if isinstance(s, str) and s.strip()]
+    return {
+        "match_score": score,
+        "justification": justification.strip(),
+        "suggestions": suggestions[:MAX_SUGGESTIONS],
+    }
+
+
+def parse_company_research_json(content: str) -> Optional[dict]:
+    """Validate structured company research and return the company_info sections, or None"""
+    data = _load_object(content)
+    return _company_info(data) if data is not None else None
+
+
+def _company_info(data: dict) -> Optional[dict]:
+    if not all(isinstance(data.get(section, ""), str) for section in COMPANY_SECTIONS):
+        return None
+    company_info = {section: data.get(section, "").strip() for section in COMPANY_SECTIONS}
+    return company_info if any(company_info.values()) else None
+
+
+def parse_fused_company_research_json(content: str) -> Optional[tuple[str, dict]]:
+    """Validate a fused response and return (company_name, company_info), or None"""
+    data = _load_object(content)
+    if data is None or not isinstance(data.get("company_name"), str):
+        return None
+    company_info = _company_info(data)
+    if company_info is None:
+        return None
+    return data["company_name"].strip() or "Unknown Company", company_info
@@ -0,0 +1,84 @@
+"""Tests for falling back from structured output to the text parsers (main.parse_analysis, main.run_analysis)."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import main
+from cache import TieredCache
+from structured_output import COMPANY_SECTIONS
+
+TEXT_ANALYSIS = """Match Score: 68/100
+
+Justification: Strong Python background, little cloud experience.
+
+Suggestions:
+1. Mention AWS projects
+2. Quantify API performance work
+"""
+
+
+def test_structured_analysis_is_used_when_it_validates():
+    content = json.dumps({"match_score": 81, "justification": "Good fit.", "suggestions": ["Add metrics."]})
+    assert main.parse_analysis(content) == {
+        "match_score": 81,
+        "justification": "Good fit.",
+        "suggestions": ["Add metrics."],
+    }
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        TEXT_ANALYSIS,  # Plain text from a model without structured output
+        json.dumps({"match_score": 68}) + "\n\n" + TEXT_ANALYSIS,  # Incomplete JSON followed by text
+    ],
+)
+def test_text_answers_fall_back_to_the_text_parser(content):
+    result = main.parse_analysis(content)
+    assert result["match_score"] == 68
+    assert result["justification"].startswith("Strong Python background")
+    assert result["suggestions"] == ["Mention AWS projects", "Quantify API performance work"]
+
+
+@pytest.mark.parametrize(
+    "content", ["", "I cannot assess this resume.", json.dumps({"match_score": 250, "justification": "x", "suggestions": []})]
+)
+def test_answers_without_a_score_raise_instead_of_scoring_zero(content):
+    with pytest.raises(main.AnalysisParseError):
+        main.parse_analysis(content)
+
+
+def test_unparseable_analysis_is_a_502_and_is_not_cached(monkeypatch):
+    monkeypatch.setattr(main, "analysis_cache", TieredCache("analysis", ttl_seconds=3600))
+
+    async def fake_complete(prompt, **kwargs):
+        return "Sorry, I can't help with that."
+
+    monkeypatch.setattr(main.llm_client, "complete", fake_complete)
+
+    async def scenario():
+        with pytest.raises(HTTPException) as raised:
+            await main.run_analysis("Resume", "Job", "key")
+        return raised.value, await main.analysis_cache.get("key")
+
+    error, cached = asyncio.run(scenario())
+    assert (error.status_code, error.detail) == (502, main.ANALYSIS_PARSE_ERROR_DETAIL)
+    assert cached is None
+
+
+def test_company_research_falls_back_to_numbered_text_sections():
+    content = "1. Company Overview: Acme builds warehouse robots.\n2. Key Product Areas: Robotic arms.\n"
+    info = main.parse_company_research(content)
+    assert list(info) == list(COMPANY_SECTIONS)
+    assert "warehouse robots" in info["company_overview"]
+    assert "Robotic arms" in info["key_products"]
+
+
+def test_company_research_falls_back_to_paragraphs_without_sections():
+    content = "Acme builds warehouse robots for retailers.\n\nIts customers are large grocery chains worldwide."
+    info = main.parse_company_research(content)
+    assert info["company_overview"] == "Acme builds warehouse robots for retailers."
+    assert info["market_customers"] == "Its customers are large grocery chains worldwide."
@@ -0,0 +1,102 @@
+"""Tests for the NDJSON batch endpoint (main.analyze_resume_batch) against a fake LLM."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from cache import TieredCache
+
+RESUME = "Python developer with FastAPI and PostgreSQL experience."
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A test client with a fresh analysis cache, no rate limit and a fake LLM that fails for "broken" jobs"""
+    monkeypatch.setattr(main, "analysis_cache", TieredCache("analysis", ttl_seconds=3600))
+    charges = []
+
+    async def fake_check(request, endpoint):
+        charges.append(endpoint)
+
+    async def fake_complete(prompt, **kwargs):
+        if "broken" in prompt:
+            raise RuntimeError("upstream error")
+        score = 90 if "Python" in prompt.split("Job Description", 1)[-1] else 40
+        return json.dumps({"match_score": score, "justification": "Fits.", "suggestions": ["Add metrics."]})
+
+    async def fake_scrape_job_text(url):
+        return "" if url.endswith("/gone") else "Python engineer posting scraped from " + url
+
+    monkeypatch.setattr(main.rate_limiter, "check", fake_check)
+    monkeypatch.setattr(main.llm_client, "complete", fake_complete)
+    monkeypatch.setattr(main, "scrape_job_text", fake_scrape_job_text)
+    test_client = TestClient(main.app)
+    test_client.charges = charges
+    return test_client
+
+
+def batch_lines(client, payload, mode="llm"):
+    with client.stream("POST", f"/analyze_resume_batch?mode={mode}", json=payload) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_streams_one_line_per_job_and_a_summary(client):
+    lines = batch_lines(
+        client,
+        {
+            "resume": RESUME,
+            "job_descriptions": ["Senior Python developer", "Java developer"],
+            "job_urls": ["https://jobs.example/1"],
+        },
+    )
+    *results, summary = lines
+    by_index = {line["index"]: line for line in results}
+    assert sorted(by_index) == [0, 1, 2]
+    assert all(line["status"] == "ok" and line["cached"] is False for line in results)
+    assert (by_index[0]["match_score"], by_index[1]["match_score"]) == (90, 40)
+    assert by_index[2]["url"] == "https://jobs.example/1"
+    assert "job_description" not in by_index[0]
+    assert summary == {"done": True, "total": 3, "succeeded": 3, "cached": 0}
+    assert client.charges == ["analyze_resume_batch"]
+
+
+def test_one_failing_job_does_not_fail_the_batch(client):
+    lines = batch_lines(
+        client,
+        {
+            "resume": RESUME,
+            "job_descriptions": ["Python developer", "broken posting"],
+            "job_urls": ["https://jobs.example/gone"],
+        },
+    )
+    *results, summary = lines
+    by_index = {line["index"]: line for line in results}
+    assert by_index[0]["status"] == "ok"
+    assert by_index[1] == {"index": 1, "status": "error", "detail": "Analysis failed."}
+    assert by_index[2] == {
+        "index": 2,
+        "url": "https://jobs.example/gone",
+        "status": "error",
+        "detail": "Could not extract job description.",
+    }
+    assert summary == {"done": True, "total": 3, "succeeded": 1, "cached": 0}
+
+
+def test_cached_jobs_skip_the_model_and_the_rate_limit(client):
+    payload = {"resume": RESUME, "job_descriptions": ["Python developer"]}
+    batch_lines(client, payload)
+    *results, summary = batch_lines(client, payload)
+    assert results[0]["cached"] is True and results[0]["match_score"] == 90
+    assert summary["cached"] == 1
+    assert client.charges == ["analyze_resume_batch"]  # Charged for the first batch only
+
+
+def test_rejects_empty_and_oversized_batches(client, monkeypatch):
+    assert client.post("/analyze_resume_batch", json={"resume": RESUME}).status_code == 400
+    monkeypatch.setattr(main, "BATCH_MAX_JOBS", 2)
+    payload = {"resume": RESUME, "job_descriptions": ["a", "b", "c"]}
+    assert client.post("/analyze_resume_batch", json=payload).status_code == 400
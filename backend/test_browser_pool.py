@@ -0,0 +1,92 @@
+"""Tests for the persistent browser pool (browser_pool.py), with a fake Playwright."""
+
+import asyncio
+import sys
+import types
+
+import pytest
+
+from browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        return FakeContext()
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeContext:
+    async def new_page(self):
+        return object()
+
+    async def close(self):
+        pass
+
+
+class FakePlaywright:
+    def __init__(self, started: list):
+        self.started = started
+        self.chromium = types.SimpleNamespace(launch=self.launch)
+        self.browsers = []
+
+    async def start(self):
+        await asyncio.sleep(0.01)  # Give a concurrent caller the chance to race
+        self.started.append(self)
+        return self
+
+    async def launch(self, headless: bool):
+        self.browsers.append(FakeBrowser())
+        return self.browsers[-1]
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Instances of the fake Playwright that were started"""
+    started = []
+    module = types.ModuleType("playwright.async_api")
+    module.async_playwright = lambda: FakePlaywright(started)
+    monkeypatch.setitem(sys.modules, "playwright.async_api", module)
+    return started
+
+
+def test_concurrent_first_leases_start_one_playwright(started):
+    pool = BrowserPool(size=1, max_pages=4)
+
+    async def lease():
+        async with pool.page() as page:
+            await asyncio.sleep(0)
+            return page
+
+    async def scenario():
+        pages = await asyncio.gather(*(lease() for _ in range(4)))
+        await pool.close()
+        return pages
+
+    assert len(asyncio.run(scenario())) == 4
+    assert len(started) == 1
+    assert len(started[0].browsers) == 1
+
+
+def test_browser_is_recycled_after_max_uses(started):
+    pool = BrowserPool(size=1, max_pages=1, max_uses=2)
+
+    async def scenario():
+        for _ in range(3):
+            async with pool.page():
+                pass
+        await pool.close()
+
+    asyncio.run(scenario())
+    first, second = started[0].browsers
+    assert not first.connected and not second.connected
@@ -0,0 +1,112 @@
+"""Tests for the two-tier response cache (cache.py)."""
+
+import asyncio
+
+import pytest
+
+import cache
+from cache import TieredCache, make_cache_key, normalize_text
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache.time, "time", fake.time)
+    return fake
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_cache_key_ignores_whitespace_after_normalizing():
+    assert make_cache_key(normalize_text("a  b\n c")) == make_cache_key("a b c")
+    assert make_cache_key("a", "b") != make_cache_key("ab")
+
+
+def test_memory_entries_expire_after_ttl(clock):
+    c = TieredCache("test", ttl_seconds=10)
+    run(c.set("k", {"v": 1}))
+    clock.now += 9
+    assert run(c.get("k")) == {"v": 1}
+    clock.now += 2
+    assert run(c.get("k")) is None
+
+
+def test_memory_tier_evicts_least_recently_used(clock):
+    c = TieredCache("test", ttl_seconds=60, max_memory_entries=2)
+    run(c.set("a", 1))
+    run(c.set("b", 2))
+    assert run(c.get("a")) == 1  # "b" is now the least recently used
+    run(c.set("c", 3))
+    assert run(c.get("b")) is None
+    assert run(c.get("a")) == 1
+    assert run(c.get("c")) == 3
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path, clock):
+    db_path = str(tmp_path / "cache.sqlite3")
+    first = TieredCache("test", ttl_seconds=60, db_path=db_path)
+    run(first.set("k", ["value"]))
+    first.close()
+
+    second = TieredCache("test", ttl_seconds=60, db_path=db_path)
+    assert run(second.get("k")) == ["value"]
+    clock.now += 61
+    second._memory.clear()
+    assert run(second.get("k")) is None
+    second.close()
+
+
+def test_disk_tier_prunes_expired_and_least_recently_used(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(cache, "DISK_PRUNE_EVERY_WRITES", 1)
+    c = TieredCache("test", ttl_seconds=60, max_memory_entries=1, db_path=str(tmp_path / "c.sqlite3"), max_disk_entries=2)
+    run(c.set("old", 0))
+    clock.now += 61
+    run(c.set("a", 1))  # Prunes "old", which has expired
+    clock.now += 1
+    run(c.set("b", 2))
+    clock.now += 1
+    assert run(c.get("a")) == 1  # Read from disk; "b" becomes the least recently used
+    clock.now += 1
+    run(c.set("c", 3))
+
+    keys = {row[0] for row in c._connection().execute("SELECT key FROM cache_test")}
+    assert keys == {"a", "c"}
+    c.close()
+
+
+def test_disk_writes_only_prune_on_an_interval(tmp_path, clock):
+    c = TieredCache("test", ttl_seconds=60, db_path=str(tmp_path / "c.sqlite3"), max_disk_entries=1)
+    for i in range(5):
+        run(c.set(f"k{i}", i))
+    (count,) = c._connection().execute("SELECT COUNT(*) FROM cache_test").fetchone()
+    assert count == 5  # Over the limit until the next prune
+
+    clock.now += cache.DISK_PRUNE_INTERVAL_SECONDS
+    run(c.set("k5", 5))
+    (count,) = c._connection().execute("SELECT COUNT(*) FROM cache_test").fetchone()
+    assert count == 1
+    c.close()
+
+
+def test_delete_removes_both_tiers(tmp_path, clock):
+    c = TieredCache("test", ttl_seconds=60, db_path=str(tmp_path / "c.sqlite3"))
+    run(c.set("k", 1))
+    run(c.delete("k"))
+    c._memory.clear()
+    assert run(c.get("k")) is None
+    c.close()
+
+
+def test_rejects_unsafe_cache_names():
+    with pytest.raises(ValueError):
+        TieredCache("bad; DROP TABLE", ttl_seconds=1)
@@ -0,0 +1,123 @@
+"""Tests for the company research cache: name normalization, cache hits and fused research in main.research_company_info."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import Response
+
+import main
+from cache import TieredCache
+from company_names import normalize_company_name
+from structured_output import COMPANY_SECTIONS
+
+POSTING = "Acme Robotics is hiring a Senior Engineer\n\nAbout Acme Robotics\nWe build warehouse robots.\n"
+
+
+@pytest.mark.parametrize(
+    "name, normalized",
+    [
+        ("Acme, Inc.", "acme"),
+        ("ACME Inc", "acme"),
+        ("  Acme   Robotics  LLC ", "acme robotics"),
+        ("The Acme Company", "acme"),
+        ("AT&T", "at and t"),
+        ("Ｓｔｒｉｐｅ", "stripe"),  # Full-width characters fold under NFKC
+        ("Company", "company"),  # A lone suffix is the name
+    ],
+)
+def test_normalize_company_name(name, normalized):
+    assert normalize_company_name(name) == normalized
+
+
+def test_cache_key_is_shared_by_spellings_and_absent_for_unknown_companies():
+    assert main.company_cache_key("Acme, Inc.") == main.company_cache_key("acme")
+    assert main.company_cache_key("Acme") != main.company_cache_key("Globex")
+    assert main.company_cache_key("Unknown Company") is None
+    assert main.company_cache_key("...") is None
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """A fresh company cache and a fake LLM; returns the prompts the LLM was called with"""
+    monkeypatch.setattr(main, "company_cache", TieredCache("company_research", ttl_seconds=3600))
+    monkeypatch.setattr(main, "COMPANY_RESEARCH_FUSED", False)
+    calls = []
+
+    async def fake_complete(prompt, **kwargs):
+        calls.append(prompt)
+        return json.dumps({section: f"{section} text" for section in COMPANY_SECTIONS})
+
+    monkeypatch.setattr(main.llm_client, "complete", fake_complete)
+    return calls
+
+
+def research(job_description: str = POSTING, refresh: bool = False) -> tuple[dict, str]:
+    response = Response()
+    info = asyncio.run(main.research_company_info(job_description, response, refresh=refresh))
+    return info, response.headers["X-Cache"]
+
+
+def test_research_is_cached_by_company(llm_calls):
+    info, cache_status = research()
+    assert (info["company_overview"], cache_status) == ("company_overview text", "MISS")
+    assert "Acme Robotics" in llm_calls[0]
+    # Another posting from the same company, with a different spelling of its name
+    assert research("Join ACME Robotics, Inc. as a Staff Engineer\n\nAbout ACME Robotics, Inc.\nRobots.\n") == (info, "HIT")
+    assert len(llm_calls) == 1
+
+
+def test_refresh_bypasses_and_replaces_the_cache(llm_calls):
+    research()
+    assert research(refresh=True)[1] == "MISS"
+    assert len(llm_calls) == 2
+    assert research()[1] == "HIT"
+
+
+@pytest.fixture
+def fused_streams(monkeypatch):
+    """Fused research on, with a fake streamed LLM; returns one record per stream with the chunks it sent"""
+    monkeypatch.setattr(main, "company_cache", TieredCache("company_research", ttl_seconds=3600))
+    monkeypatch.setattr(main, "COMPANY_RESEARCH_FUSED", True)
+    streams = []
+
+    async def fake_complete(prompt, **kwargs):
+        raise AssertionError("Fused research should not make a separate name extraction call")
+
+    async def fake_stream(prompt, **kwargs):
+        record = {"sent": 0, "closed": False}
+        streams.append(record)
+        content = json.dumps(
+            {"company_name": "Globex", **{section: f"{section} text" for section in COMPANY_SECTIONS}}
+        )
+        try:
+            for start in range(0, len(content), 16):
+                record["sent"] += 1
+                yield content[start : start + 16]
+        finally:
+            record["closed"] = True
+
+    monkeypatch.setattr(main.llm_client, "complete", fake_complete)
+    monkeypatch.setattr(main.llm_client, "stream", fake_stream)
+    return streams
+
+
+UNNAMED_POSTING = "Senior Engineer\n\nWe build warehouse robots and need a backend engineer.\n"
+
+
+def test_fused_research_names_and_caches_the_company_in_one_call(fused_streams):
+    info, cache_status = research(UNNAMED_POSTING)
+    assert (info["company_overview"], cache_status) == ("company_overview text", "MISS")
+    assert len(fused_streams) == 1 and fused_streams[0]["closed"]
+    # Cached under the name the model found, so a posting that names Globex is served from the cache
+    assert research("Globex is hiring a Staff Engineer\n\nAbout Globex\n")[1] == "HIT"
+    assert len(fused_streams) == 1
+
+
+def test_fused_research_stops_generating_once_the_company_is_cached(fused_streams):
+    cached = {section: "cached" for section in COMPANY_SECTIONS}
+    asyncio.run(main.company_cache.set(main.company_cache_key("Globex"), cached))
+    info, cache_status = research(UNNAMED_POSTING)
+    assert (info, cache_status) == (cached, "HIT")
+    stream = fused_streams[0]
+    assert stream["closed"] and stream["sent"] < 5  # Closed right after the company name arrived
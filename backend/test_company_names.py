@@ -0,0 +1,100 @@
+"""Tests for local company-name guessing (company_names.py)."""
+
+import pytest
+
+from company_names import COMPANY_NAME_MIN_CONFIDENCE, guess_company_name, guesses_from_url
+
+# Section headings lifted from real postings; none of them names the employer
+SECTION_HEADINGS = [
+    "About This Role",
+    "About the Role",
+    "About Benefits",
+    "About Compensation",
+    "About What You Will Do",
+    "About This Opportunity",
+    "About Our Client",
+    "About You",
+    "About the Team",
+    "Join Our Engineering Team!",
+]
+
+
+@pytest.mark.parametrize("heading", SECTION_HEADINGS)
+def test_section_headings_are_not_company_names(heading):
+    posting = f"Senior Backend Engineer\n\n{heading}\nYou will design and run our payments platform.\n"
+    assert guess_company_name(posting) is None
+
+
+def test_about_heading_counts_once_and_needs_another_source():
+    posting = "Senior Backend Engineer\n\nAbout Acme Robotics\nWe build warehouse robots.\n"
+    guess = guess_company_name(posting)
+    assert (guess.name, guess.confidence) == ("Acme Robotics", 0.65)
+    assert guess.confidence < COMPANY_NAME_MIN_CONFIDENCE
+    guess = guess_company_name(posting, title="Senior Backend Engineer - Acme Robotics")
+    assert (guess.name, guess.source) == ("Acme Robotics", "text+title")
+    assert guess.confidence >= COMPANY_NAME_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize(
+    "posting",
+    [
+        "Platform Engineer\n\nAbout Kubernetes\nYou will run our clusters.\n",  # A technology, not the employer
+        "Data Engineer\n\nAbout Apache Spark:\nOur pipelines run on Spark.\n",
+    ],
+)
+def test_about_heading_alone_is_not_confident(posting):
+    guess = guess_company_name(posting)
+    assert guess is not None and guess.confidence < COMPANY_NAME_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize(
+    "posting",
+    [
+        "Backend Engineer\n\nAbout Remote Work\nWe are remote-first.\n",
+        "Backend Engineer\n\nAbout Glance\nA quick look at the team.\n",
+        "Backend Engineer\n\nAbout Our HQ\nDowntown, near the station.\n",
+        "Backend Engineer\nWork at HQ, three days a week.\n",
+        "Backend Engineer\nYou will work from our office at Headquarters.\n",
+        "Backend Engineer\n\nAbout the Hiring Process\nTwo interviews.\n",
+    ],
+)
+def test_workplace_and_process_headings_are_not_company_names(posting):
+    assert guess_company_name(posting) is None
+
+
+def test_heading_words_are_accepted_when_the_name_recurs():
+    posting = "About The Trade Desk\nThe Trade Desk is a technology company that empowers buyers.\n"
+    assert guess_company_name(posting).name == "The Trade Desk"
+
+
+def test_sentence_initial_at():
+    guess = guess_company_name("At Acme, we believe hiring should be fair.\nResponsibilities\n- Ship code\n")
+    assert guess.name == "Acme"
+    assert guess.confidence < COMPANY_NAME_MIN_CONFIDENCE  # Weak on its own
+
+
+def test_agreeing_sources_are_confident():
+    guess = guess_company_name(
+        "Join Acme as a Staff Engineer.\n", url="https://boards.greenhouse.io/acme/jobs/123", title="Staff Engineer - Acme"
+    )
+    assert guess.name == "Acme"
+    assert guess.confidence >= COMPANY_NAME_MIN_CONFIDENCE
+    assert set(guess.source.split("+")) == {"text", "ats_url", "title"}
+
+
+def test_metadata_beats_a_section_heading():
+    guess = guess_company_name("About This Role\nBuild things.\n", site_name="Globex Careers")
+    assert (guess.name, guess.source) == ("Globex", "og:site_name")
+
+
+@pytest.mark.parametrize(
+    "url, name",
+    [
+        ("https://jobs.lever.co/initech/abc", "Initech"),
+        ("https://acme-robotics.wd1.myworkdayjobs.com/en-US/careers/job/1", "Acme Robotics"),
+        ("https://careers.globex.co.uk/jobs/1", "Globex"),
+        ("https://www.linkedin.com/jobs/view/1", None),
+    ],
+)
+def test_guesses_from_url(url, name):
+    assert [g.name for g in guesses_from_url(url)] == ([name] if name else [])
@@ -0,0 +1,60 @@
+"""Tests for resume document extraction (document_extraction.py)."""
+
+import asyncio
+import time
+
+import pytest
+
+import document_extraction
+from benchmarks.fixtures import resume_pdf
+from document_extraction import DocumentExtractor, ExtractionBudgetExceeded, extract_pdf_pages, extract_pdf_text
+
+
+def test_thread_and_pool_paths_extract_the_same_text():
+    data = resume_pdf(6, lines_per_page=5)
+    expected = extract_pdf_text(data)
+    assert "page 6" in expected
+
+    async def scenario(extractor):
+        try:
+            return await extractor.extract_pdf(data)
+        finally:
+            extractor.close()
+
+    assert asyncio.run(scenario(DocumentExtractor(use_pool=False))) == expected
+    pooled = DocumentExtractor(workers=2, pages_per_task=2, in_process_max_pages=0, use_pool=True)
+    assert asyncio.run(scenario(pooled)) == expected
+
+
+def test_short_pdfs_skip_the_pool():
+    extractor = DocumentExtractor(use_pool=True, in_process_max_pages=8)
+    asyncio.run(extractor.extract_pdf(resume_pdf(2, lines_per_page=5)))
+    assert extractor._pool is None
+
+
+def test_page_ranges_share_the_document_budget(monkeypatch):
+    budgets = []
+
+    async def fake_run(fn, data, start, end, cpu_budget):
+        budgets.append(cpu_budget)
+        return [f"page {start}"]
+
+    extractor = DocumentExtractor(workers=4, pages_per_task=2, cpu_budget=8, in_process_max_pages=0, use_pool=True)
+    monkeypatch.setattr(extractor, "_run", fake_run)
+    asyncio.run(extractor.extract_pdf(resume_pdf(8, lines_per_page=2)))
+    assert budgets == [2, 2, 2, 2]
+
+
+def test_cpu_timer_interrupts_a_slow_page(monkeypatch):
+    def slow_extract_text(self):
+        deadline = time.process_time() + 5
+        while time.process_time() < deadline:
+            pass
+        return ""
+
+    monkeypatch.setattr(document_extraction.PyPDF2.PageObject, "extract_text", slow_extract_text)
+    started = time.process_time()
+    # Tests run on the main thread, like pool workers
+    with pytest.raises(ExtractionBudgetExceeded):
+        extract_pdf_pages(resume_pdf(1, lines_per_page=2), 0, None, 0.2)
+    assert time.process_time() - started < 2
@@ -0,0 +1,111 @@
+"""Tests for local match scoring (fast_scoring.py)."""
+
+import math
+from collections import Counter
+
+import pytest
+
+import fast_scoring
+from fast_scoring import SKILL_NAMES, find_skills, job_title, score_jobs, score_resume, tokenize
+
+
+def skills(text: str) -> list[str]:
+    return [SKILL_NAMES[s] for s in find_skills(tokenize(text))]
+
+
+def test_longest_alias_wins():
+    assert skills("React Native and React, on SQL Server and SQL") == ["React Native", "React", "SQL Server", "SQL"]
+    assert skills("Amazon Web Services (amazon) and machine learning") == ["AWS", "Machine Learning"]
+
+
+def test_aliases_match_whole_tokens_only():
+    assert skills("C# and .NET, nodejs, k8s") == ["C#", ".NET", "Node.js", "Kubernetes"]
+    assert skills("Reactive systems, SQLAlchemy, nodes, Pythonic") == []
+
+
+def test_every_mention_counts():
+    assert skills("Python, python and PYTHON") == ["Python"] * 3
+
+
+def test_scores_rank_matching_resumes_higher():
+    resume = "Senior Backend Engineer\nPython, PostgreSQL, Kubernetes and AWS for payment APIs"
+    matching = "Senior Backend Engineer\nWe need Python, PostgreSQL and Kubernetes experience on AWS."
+    unrelated = "Registered Nurse\nProvide patient care in a hospital ward using Epic charting."
+    close, far = score_jobs(resume, [matching, unrelated])
+    assert close["match_score"] > far["match_score"]
+    assert sorted(close["matched_skills"]) == ["AWS", "Kubernetes", "PostgreSQL", "Python"]
+    assert close["missing_skills"] == []
+
+
+def test_missing_skills_become_suggestions():
+    result = score_resume("Python developer", "Data Engineer\nPython, Spark and Airflow, Airflow daily")
+    assert result["matched_skills"] == ["Python"]
+    assert result["missing_skills"][0] == "Airflow"  # Most mentioned first
+    assert any("Airflow" in suggestion for suggestion in result["suggestions"])
+
+
+def test_empty_batch():
+    assert score_jobs("resume", []) == []
+
+
+def reference_scores(resume: str, job_descriptions: list[str]) -> list[tuple[int, list[str], list[str]]]:
+    """The scoring formula written out per job with dicts, to check the vectorized score_jobs against"""
+    tokens = [tokenize(text) for text in [resume] + job_descriptions]
+    term_counts = [Counter(fast_scoring._content_tokens(doc)) for doc in tokens]
+    document_frequency = Counter(term for counts in term_counts for term in counts)
+    idf = {term: math.log((1 + len(tokens)) / (1 + df)) + 1 for term, df in document_frequency.items()}
+    vectors = [{t: (1 + math.log(c)) * idf[t] for t, c in counts.items()} for counts in term_counts]
+    norms = [math.sqrt(sum(w * w for w in v.values())) for v in vectors]
+    resume_skills = set(find_skills(tokens[0]))
+    resume_terms = set(tokens[0])
+
+    results = []
+    for j, job_description in enumerate(job_descriptions, start=1):
+        dot = sum(w * vectors[0].get(t, 0.0) for t, w in vectors[j].items())
+        similarity = dot / (norms[j] * norms[0]) if norms[j] and norms[0] else 0.0
+        keyword_score = min(1.0, similarity / fast_scoring.KEYWORD_FULL_CREDIT_SIMILARITY)
+
+        skill_counts = Counter(find_skills(tokens[j]))
+        skill_weights = {s: 1 + math.log(c) for s, c in skill_counts.items()}
+        skill_total = sum(skill_weights.values())
+        skill_score = sum(w for s, w in skill_weights.items() if s in resume_skills) / skill_total if skill_total else 0.0
+
+        title_terms = fast_scoring._content_tokens(tokenize(job_title(job_description)))
+        title_score = sum(t in resume_terms for t in title_terms) / len(title_terms) if title_terms else 0.0
+
+        skills_weight = fast_scoring.SKILLS_WEIGHT if skill_total else 0.0
+        title_weight = fast_scoring.TITLE_WEIGHT if title_terms else 0.0
+        keywords_weight = 1.0 - skills_weight - title_weight
+        score = 100 * (skills_weight * skill_score + keywords_weight * keyword_score + title_weight * title_score)
+        matched = sorted(SKILL_NAMES[s] for s in skill_counts if s in resume_skills)
+        missing = sorted(SKILL_NAMES[s] for s in skill_counts if s not in resume_skills)
+        results.append((round(score), matched, missing))
+    return results
+
+
+RESUME = """Jane Doe - Senior Backend Engineer
+Built payment APIs in Python and Go on PostgreSQL and Redis, deployed to AWS with Kubernetes and Terraform.
+Led a team of four; mentored juniors; improved p99 latency by 40%.
+"""
+
+JOBS = [
+    "Senior Backend Engineer\nPython, PostgreSQL and Kubernetes on AWS. Python everywhere; Redis a plus.",
+    "Frontend Developer\nReact, TypeScript and CSS. Experience with Next.js and GraphQL.",
+    "Registered Nurse\nProvide patient care in a busy hospital ward.",
+    "Data Engineer\nSpark, Airflow, Python and SQL pipelines on AWS. Airflow DAG ownership. dbt preferred.",
+    "",  # Nothing to compare against
+    "Engineering Manager - Platform\nLead engineers building Go services; Kubernetes, Terraform, on-call.",
+]
+
+
+def test_vectorized_scores_match_the_reference_formula():
+    results = score_jobs(RESUME, JOBS)
+    for result, (score, matched, missing) in zip(results, reference_scores(RESUME, JOBS)):
+        assert result["match_score"] == score
+        assert sorted(result["matched_skills"]) == matched
+        assert sorted(result["missing_skills"]) == missing
+
+
+@pytest.mark.parametrize("resume", [RESUME, "", "Nurse with ICU experience"])
+def test_batch_scores_match_the_reference_for_any_resume(resume):
+    assert [r["match_score"] for r in score_jobs(resume, JOBS)] == [score for score, _, _ in reference_scores(resume, JOBS)]
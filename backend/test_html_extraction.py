@@ -0,0 +1,121 @@
+"""Tests for job posting extraction from HTML (html_extraction.py), using the synthetic pages in benchmarks/html."""
+
+import pytest
+
+from benchmarks.fixtures import html_fixtures, rendered_board_html
+from html_extraction import MIN_PAGE_CHARS, extract_page
+
+FIXTURES = html_fixtures()
+
+
+@pytest.mark.parametrize(
+    "name, first_line, excluded",
+    [
+        ("careers_site.html", "Who we are", ["Skip to main content", "We use cookies", "Learn more about payments", "gtag("]),
+        ("greenhouse_board.html", "About Northwind", ["First Name *", "Apply for this Job", "window.ENV"]),
+        ("lever_board.html", "Contoso Health is building the operating system for outpatient clinics.",
+         ["Contoso Health Home Page", "Jobs powered by", ".posting-headline"]),
+    ],
+)
+def test_density_scoring_finds_the_posting(name, first_line, excluded):
+    page = extract_page(FIXTURES[name])
+    assert page.source == "content"
+    assert page.text.splitlines()[0] == first_line
+    for text in excluded:
+        assert text not in page.text
+
+
+def test_sibling_sections_are_joined_with_block_line_breaks():
+    lines = extract_page(FIXTURES["careers_site.html"]).text.splitlines()
+    for heading in ["Who we are", "About the team", "What you'll do", "Responsibilities"]:
+        assert heading in lines
+    # List items are separate lines, not run together
+    assert "Design and implement high-throughput, strongly consistent services in Java and Go" in lines
+
+
+def test_title_and_site_name():
+    page = extract_page(FIXTURES["greenhouse_board.html"])
+    assert page.title == "Job Application for Senior Backend Engineer at Northwind Analytics"
+    assert page.site_name == "Northwind Analytics"
+
+
+@pytest.mark.parametrize("name", ["spa_posting.html", "workday_shell.html"])
+def test_unrendered_javascript_pages_have_no_text(name):
+    assert extract_page(FIXTURES[name]).text == ""
+
+
+def test_link_lists_lose_to_the_posting_on_deeply_nested_pages():
+    text = extract_page(rendered_board_html(depth=200, cards=1000)).text
+    assert text.startswith("Section 0\nParagraph 0:")
+    assert text.count("Requirement") == 48
+    assert "Software Engineer 1" not in text
+
+
+def test_short_pages_fall_back_to_the_whole_body():
+    html = "<html><body><nav>Home</nav><div><p>Backend Engineer</p><p>" + "Build APIs in Python. " * 6 + "</p></div></body></html>"
+    text = extract_page(html).text
+    assert len(text) >= MIN_PAGE_CHARS
+    assert text.startswith("Backend Engineer")
+
+
+@pytest.mark.parametrize("html", ["", "   ", "<?xml version='1.0' encoding='utf-8'?><html><body><p>Hi</p></body></html>"])
+def test_empty_and_tiny_documents(html):
+    assert extract_page(html).text == ""
+
+
+# --- schema.org JobPosting and OpenGraph ---
+def ld_page(*json_ld: str, body: str = "<p>Loading...</p>", head: str = "") -> str:
+    scripts = "".join(f'<script type="application/ld+json">{block}</script>' for block in json_ld)
+    return f"<html><head><title>Careers</title>{head}{scripts}</head><body>{body}</body></html>"
+
+
+DESCRIPTION = "&lt;p&gt;Build &amp;amp; run the platform.&lt;/p&gt;&lt;ul&gt;&lt;li&gt;Go&lt;/li&gt;&lt;li&gt;Kubernetes&lt;/li&gt;&lt;/ul&gt;" + (
+    "&lt;p&gt;We ship small changes often and own what we build.&lt;/p&gt;" * 3
+)
+
+
+def test_job_posting_is_built_from_json_ld():
+    posting = FIXTURES["workday_posting.html"]
+    page = extract_page(posting)
+    assert (page.source, page.company_name) == ("json-ld", "Tailspin Toys")
+    assert page.text.splitlines()[:5] == [
+        "Platform Engineer II",
+        "Tailspin Toys",
+        "Location: Denver, CO, United States of America",
+        "Employment type: Full time",
+        "Salary: USD 128,000 - 164,000 per year",
+    ]
+
+
+def test_json_ld_in_a_graph_with_escaped_html_and_raw_newlines():
+    block = (
+        '{"@context": "https://schema.org", "@graph": [{"@type": "Organization", "name": "Acme"}, '
+        '{"@type": ["JobPosting"], "title": "SRE", "hiringOrganization": {"@type": "Organization", "name": "Acme"}, '
+        '"jobLocationType": "TELECOMMUTE", "employmentType": ["FULL_TIME", "CONTRACTOR"], '
+        '"baseSalary": {"currency": "EUR", "value": {"value": 70000, "unitText": "YEAR"}}, '
+        '"description": "' + DESCRIPTION + '\n"}]}'
+    )
+    page = extract_page(ld_page("not json", block, head='<link rel="canonical" href="/jobs/sre">'))
+    assert (page.source, page.company_name, page.canonical_url) == ("json-ld", "Acme", "/jobs/sre")
+    lines = page.text.splitlines()
+    assert lines[:5] == ["SRE", "Acme", "Location: Remote", "Employment type: Full time, Contractor", "Salary: EUR 70,000 per year"]
+    assert lines[5:8] == ["Build & run the platform.", "Go", "Kubernetes"]
+
+
+def test_json_ld_without_a_description_falls_back_to_the_layout():
+    block = '{"@type": "JobPosting", "title": "SRE", "hiringOrganization": "Acme"}'
+    body = "<article>" + "<p>Run our production systems and improve their reliability every week.</p>" * 5 + "</article>"
+    page = extract_page(ld_page(block, body=body))
+    assert page.source == "content"
+    assert page.text.startswith("Run our production systems")
+
+
+def test_og_description_fills_in_for_javascript_shells():
+    description = "Platform Engineer at Tailspin Toys. Build the cloud services behind our connected toys, in Go on Kubernetes."
+    head = (
+        '<meta property="og:title" content="Platform Engineer">'
+        f'<meta property="og:description" content="{description}">'
+        '<meta property="og:site_name" content="Tailspin Toys">'
+    )
+    page = extract_page(f"<html><head>{head}</head><body><div id='root'></div></body></html>")
+    assert (page.source, page.text, page.title, page.site_name) == ("og:description", description, "Platform Engineer", "Tailspin Toys")
@@ -0,0 +1,92 @@
+"""Tests for the pooled HTTP fetcher (http_fetcher.py): the body size cap and charset detection."""
+
+import asyncio
+import codecs
+
+import httpx
+import pytest
+
+from http_fetcher import HttpFetcher, detect_encoding
+
+
+def fetcher_for(handler, max_bytes: int = 1024) -> HttpFetcher:
+    fetcher = HttpFetcher(max_bytes=max_bytes)
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+    return fetcher
+
+
+def fetch(fetcher: HttpFetcher, url: str = "https://jobs.example/1", **kwargs):
+    async def scenario():
+        try:
+            return await fetcher.fetch(url, **kwargs)
+        finally:
+            await fetcher.close()
+
+    return asyncio.run(scenario())
+
+
+def test_body_is_cut_off_at_the_byte_cap_without_reading_the_rest():
+    chunks_sent = []
+
+    async def body():
+        for i in range(100):
+            chunks_sent.append(i)
+            yield b"x" * 100
+
+    result = fetch(fetcher_for(lambda request: httpx.Response(200, content=body()), max_bytes=250))
+    assert (len(result.text), result.truncated) == (250, True)
+    assert len(chunks_sent) < 100  # Streaming stopped at the cap
+
+
+def test_small_bodies_are_not_truncated():
+    result = fetch(fetcher_for(lambda request: httpx.Response(200, text="<p>Hi</p>")))
+    assert (result.text, result.truncated, result.encoding) == ("<p>Hi</p>", False, "utf-8")
+
+
+def test_per_call_cap_overrides_the_default():
+    result = fetch(fetcher_for(lambda request: httpx.Response(200, content=b"a" * 500)), max_bytes=10)
+    assert (result.text, result.truncated) == ("a" * 10, True)
+
+
+def test_redirects_are_followed_and_reported():
+    def handler(request):
+        if request.url.path == "/old":
+            return httpx.Response(301, headers={"location": "https://jobs.example/new"})
+        return httpx.Response(200, text="moved")
+
+    result = fetch(fetcher_for(handler), "https://jobs.example/old")
+    assert (result.url, result.text) == ("https://jobs.example/new", "moved")
+
+
+def test_not_modified_and_errors():
+    assert fetch(fetcher_for(lambda request: httpx.Response(304)), headers={"If-None-Match": '"v1"'}).status_code == 304
+    with pytest.raises(httpx.HTTPStatusError):
+        fetch(fetcher_for(lambda request: httpx.Response(404)))
+
+
+@pytest.mark.parametrize(
+    "content_type, body, truncated, encoding",
+    [
+        ("text/html; charset=ISO-8859-1", b"caf\xe9", False, "iso8859-1"),
+        ("text/html; charset=nonsense", b"plain", False, "utf-8"),
+        ("text/html", codecs.BOM_UTF8 + b"<p>Hi</p>", False, "utf-8-sig"),
+        ("text/html", codecs.BOM_UTF16_LE + "Hi".encode("utf-16-le"), False, "utf-16"),
+        (None, b'<html><head><meta charset="shift_jis">', False, "shift_jis"),
+        (None, b'<meta http-equiv="Content-Type" content="text/html; charset=windows-1251">', False, "cp1251"),
+        (None, "café".encode("utf-8"), False, "utf-8"),
+        (None, "café".encode("utf-8")[:-1], True, "utf-8"),  # Multi-byte character split by the cap
+        (None, "café".encode("utf-8")[:-1], False, "cp1252"),
+        (None, b"caf\xe9 au lait", False, "cp1252"),
+    ],
+)
+def test_detect_encoding(content_type, body, truncated, encoding):
+    assert detect_encoding(content_type, body, truncated) == encoding
+
+
+def test_legacy_pages_are_decoded_with_their_charset():
+    page = '<meta charset="windows-1252"><p>Café – Zürich</p>'.encode("cp1252")
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=page)
+
+    assert "Café – Zürich" in fetch(fetcher_for(handler)).text
@@ -0,0 +1,184 @@
+"""Tests for the durable job queue (job_queue.py): leases, retries and deduplication."""
+
+import asyncio
+
+import pytest
+
+import job_queue
+from job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, PermanentJobError
+
+LEASE = 30.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(job_queue.time, "time", fake.time)
+    return fake
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.sqlite3"), workers=1, lease_seconds=LEASE, max_attempts=3)
+    q.register("echo", lambda payload, progress: asyncio.sleep(0, payload))
+    yield q
+    asyncio.run(q.close())
+
+
+def test_identical_pending_jobs_are_shared(queue, clock):
+    job, created = queue._submit("echo", {"x": 1}, "key-1")
+    assert created and job.status == QUEUED
+    assert queue._submit("echo", {"x": 1}, "key-1") == (queue._get(job.id), False)
+    assert queue._submit("echo", {"x": 2}, "key-2")[1]
+    claimed = queue._claim()
+    assert queue._finish(job.id, claimed.attempts, SUCCEEDED, {"ok": True}, None)
+    assert queue._submit("echo", {"x": 1}, "key-1")[1]  # Finished jobs are not reused
+
+
+def test_expired_lease_is_claimed_again(queue, clock):
+    job, _ = queue._submit("echo", {}, "key")
+    claimed = queue._claim()
+    assert (claimed.id, claimed.status, claimed.attempts) == (job.id, RUNNING, 1)
+    assert queue._claim() is None
+    clock.now += LEASE - 1
+    assert queue._extend_lease(job.id, claimed.attempts)  # The worker's heartbeat
+    clock.now += LEASE - 1
+    assert queue._claim() is None
+    clock.now += 2  # The worker died and stopped renewing
+    reclaimed = queue._claim()
+    assert (reclaimed.id, reclaimed.attempts) == (job.id, 2)
+
+
+def test_stale_worker_cannot_overwrite_a_reclaimed_job(queue, clock):
+    job, _ = queue._submit("echo", {}, "key")
+    stale = queue._claim()
+    clock.now += LEASE + 1  # The first worker stalled past its lease
+    current = queue._claim()
+    assert current.attempts == stale.attempts + 1
+
+    assert not queue._extend_lease(job.id, stale.attempts)
+    assert not queue._set_stage(job.id, stale.attempts, "scraping")
+    assert not queue._finish(job.id, stale.attempts, SUCCEEDED, {"stale": True}, None)
+    assert not queue._requeue(job.id, stale.attempts, delay=0)
+    row = queue._get(job.id)
+    assert (row.status, row.attempts, row.result, row.stages) == (RUNNING, current.attempts, None, [])
+
+    assert queue._finish(job.id, current.attempts, SUCCEEDED, {"current": True}, None)
+    assert queue._get(job.id).result == {"current": True}
+
+
+def test_stale_run_discards_its_outcome(queue, clock):
+    reclaimed = []
+
+    async def stalls_past_its_lease(payload, progress):
+        clock.now += LEASE + 1
+        reclaimed.append(queue._claim())  # Another worker takes the job over meanwhile
+        return {"stale": True}
+
+    queue.register("echo", stalls_past_its_lease)
+    job, _ = queue._submit("echo", {}, "key")
+    asyncio.run(queue._run(queue._claim()))
+    row = queue._get(job.id)
+    assert (row.status, row.attempts, row.result) == (RUNNING, reclaimed[0].attempts, None)
+
+
+def test_job_whose_worker_keeps_dying_fails(queue, clock):
+    job, _ = queue._submit("echo", {"resume": "text"}, "key")
+    for _ in range(queue.max_attempts):
+        assert queue._claim().id == job.id
+        clock.now += LEASE + 1
+    assert queue._claim() is None
+    failed = queue._get(job.id)
+    assert (failed.status, failed.error["status_code"], failed.payload) == (FAILED, 500, {})
+
+
+def test_failed_attempt_is_retried_with_backoff(queue, clock):
+    async def flaky(payload, progress):
+        raise RuntimeError("upstream timeout")
+
+    queue.register("echo", flaky)
+    job, _ = queue._submit("echo", {}, "key")
+    asyncio.run(queue._run(queue._claim()))
+    assert queue._get(job.id).status == QUEUED
+    assert queue._claim() is None  # Backing off for 2 ** attempts seconds
+    clock.now += 2
+    assert queue._claim().attempts == 2
+
+
+def test_permanent_error_is_not_retried(queue, clock):
+    async def not_found(payload, progress):
+        raise PermanentJobError(422, "Could not scrape the posting")
+
+    queue.register("echo", not_found)
+    job, _ = queue._submit("echo", {}, "key")
+    asyncio.run(queue._run(queue._claim()))
+    assert queue._get(job.id).error == {"status_code": 422, "detail": "Could not scrape the posting"}
+    clock.now += 3600
+    assert queue._claim() is None
+
+
+def test_cancelled_job_is_handed_back_without_counting_the_attempt(queue, clock):
+    async def slow(payload, progress):
+        await asyncio.sleep(3600)
+
+    queue.register("echo", slow)
+    job, _ = queue._submit("echo", {}, "key")
+
+    async def scenario():
+        task = asyncio.create_task(queue._run(queue._claim()))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    requeued = queue._get(job.id)
+    assert (requeued.status, requeued.attempts) == (QUEUED, 0)
+
+
+def test_workers_run_jobs_and_record_stages(queue):
+    async def research(payload, progress):
+        await progress("scraping")
+        await progress("researching")
+        return {"company": payload["company"]}
+
+    queue.register("research", research)
+
+    async def scenario():
+        await queue.start()
+        job, created = await queue.submit("research", {"company": "Acme"})
+        assert created
+        finished = await queue.wait(job.id, timeout=5)
+        await queue.close()
+        return finished
+
+    finished = asyncio.run(scenario())
+    assert (finished.status, finished.result, finished.stage) == (SUCCEEDED, {"company": "Acme"}, "researching")
+    assert [stage["name"] for stage in finished.stages] == ["scraping", "researching"]
+    assert all(stage["finished_at"] is not None for stage in finished.stages)
+
+
+def test_timed_out_waits_leave_no_waiters_behind(queue, clock):
+    # A job no worker in this process runs (queued here, run by another process) never notifies
+    job, _ = queue._submit("echo", {}, "key")
+
+    async def scenario():
+        results = await asyncio.gather(*(queue.wait(job.id, timeout=0.05) for _ in range(3)))
+        return results, dict(queue._waiters)
+
+    results, waiters = asyncio.run(scenario())
+    assert [r.status for r in results] == [QUEUED] * 3
+    assert waiters == {}
+
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        asyncio.run(queue.submit("nope", {}))
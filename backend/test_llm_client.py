@@ -0,0 +1,117 @@
+"""Tests for the shared LLM client's streaming stage timings (llm_client.py)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import llm_client
+from llm_client import LLMClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self):
+        return self.now
+
+
+class Recorder:
+    """Stands in for STAGE_SECONDS, keeping each observation"""
+
+    def __init__(self):
+        self.observations = []
+
+    def observe(self, value, **labels):
+        self.observations.append((labels["stage"], labels["outcome"], value))
+
+
+class FakeStream:
+    """An upstream completion stream where each chunk takes one second to arrive"""
+
+    def __init__(self, clock, deltas, error=None):
+        self.clock, self.deltas, self.error = clock, list(deltas), error
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.deltas:
+            if self.error is not None:
+                raise self.error
+            raise StopAsyncIteration
+        self.clock.now += 1.0
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=self.deltas.pop(0)))])
+
+    async def close(self):
+        self.closed = True
+
+
+def make_client(monkeypatch, stream):
+    clock = stream.clock
+    recorder = Recorder()
+    monkeypatch.setattr(llm_client, "STAGE_SECONDS", recorder)
+    monkeypatch.setattr(llm_client.time, "perf_counter", clock.perf_counter)
+
+    async def create(**kwargs):
+        clock.now += 0.5  # Request round trip before the stream opens
+        return stream
+
+    client = LLMClient()
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    client._semaphore = asyncio.Semaphore(1)
+    return client, recorder
+
+
+def test_consumer_time_between_chunks_is_not_llm_time(monkeypatch):
+    clock = FakeClock()
+    stream = FakeStream(clock, ["a", "b", "c"])
+    client, recorder = make_client(monkeypatch, stream)
+
+    async def consume():
+        deltas = []
+        async for delta in client.stream("prompt", max_tokens=10, temperature=0):
+            deltas.append(delta)
+            clock.now += 10.0  # A slow client reading the response
+        return deltas
+
+    assert asyncio.run(consume()) == ["a", "b", "c"]
+    assert stream.closed
+    # 0.5s to open the stream plus 1s per chunk; the 30s spent by the consumer is excluded
+    assert ("llm_first_token", "ok", 1.5) in recorder.observations
+    assert ("llm_call", "ok", 3.5) in recorder.observations
+
+
+def test_stream_stopped_early_is_recorded_as_cancelled(monkeypatch):
+    clock = FakeClock()
+    stream = FakeStream(clock, ["a", "b", "c"])
+    client, recorder = make_client(monkeypatch, stream)
+
+    async def consume_first():
+        deltas = client.stream("prompt", max_tokens=10, temperature=0)
+        first = await anext(deltas)
+        await deltas.aclose()
+        return first
+
+    assert asyncio.run(consume_first()) == "a"
+    assert stream.closed
+    assert ("llm_call", "cancelled", 1.5) in recorder.observations
+    assert client._semaphore._value == 1
+
+
+def test_upstream_error_is_recorded_and_releases_the_slot(monkeypatch):
+    clock = FakeClock()
+    stream = FakeStream(clock, ["a"], error=RuntimeError("connection reset"))
+    client, recorder = make_client(monkeypatch, stream)
+
+    async def consume():
+        async for _ in client.stream("prompt", max_tokens=10, temperature=0):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(consume())
+    assert stream.closed
+    assert ("llm_call", "error", 1.5) in recorder.observations
+    assert client._semaphore._value == 1
@@ -0,0 +1,101 @@
+"""Tests for the in-process metrics registry, time_stage and GET /metrics (metrics.py)."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import metrics
+from metrics import STAGE_SECONDS, Counter, Histogram, time_stage
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty registry, so metrics made by a test are not rendered by the app's /metrics"""
+    monkeypatch.setattr(metrics, "REGISTRY", [])
+    return metrics.REGISTRY
+
+
+def test_counter_renders_labels_in_the_text_format(registry):
+    requests = Counter("test_requests_total", "Requests by path.", ("path",))
+    requests.inc(path="/a")
+    requests.inc(2.5, path='/b"\\')
+    assert metrics.render() == (
+        "# HELP test_requests_total Requests by path.\n"
+        "# TYPE test_requests_total counter\n"
+        'test_requests_total{path="/a"} 1\n'
+        'test_requests_total{path="/b\\"\\\\"} 2.5\n'
+    )
+    with pytest.raises(ValueError):
+        requests.inc(route="/a")
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = Histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+    assert metrics.render().splitlines()[2:] == [
+        'test_latency_seconds_bucket{le="0.1"} 2',
+        'test_latency_seconds_bucket{le="1"} 3',
+        'test_latency_seconds_bucket{le="+Inf"} 4',
+        "test_latency_seconds_sum 3.65",
+        "test_latency_seconds_count 4",
+    ]
+    assert latency.count() == 4
+
+
+def test_time_stage_records_the_outcome():
+    counts = {outcome: STAGE_SECONDS.count(stage="test_stage", outcome=outcome) for outcome in ("ok", "error", "cancelled")}
+
+    with time_stage("test_stage"):
+        pass
+    with pytest.raises(RuntimeError):
+        with time_stage("test_stage"):
+            raise RuntimeError("failed")
+
+    async def cancelled():
+        with time_stage("test_stage"):
+            await asyncio.sleep(3600)
+
+    async def scenario():
+        task = asyncio.create_task(cancelled())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    def stream():
+        with time_stage("test_stage"):
+            yield 1
+            yield 2
+
+    deltas = stream()
+    next(deltas)
+    deltas.close()  # A consumer that stops early counts as cancelled, not as an error
+
+    assert {outcome: STAGE_SECONDS.count(stage="test_stage", outcome=outcome) - count for outcome, count in counts.items()} == {
+        "ok": 1,
+        "error": 1,
+        "cancelled": 2,
+    }
+
+
+def test_metrics_endpoint_serves_every_metric_and_route_templates(monkeypatch):
+    async def no_job(job_id):
+        return None
+
+    monkeypatch.setattr(main.job_queue, "get", no_job)
+    client = TestClient(main.app)
+    assert client.get("/jobs/abc123").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    body = response.text
+    for metric in metrics.REGISTRY:
+        assert f"# TYPE {metric.name} {metric.type_name}\n" in body
+    # Requests are labelled with the route template, not the raw path
+    assert 'jobflow_http_request_duration_seconds_count{method="GET",route="/jobs/{job_id}",status="404"}' in body
+    assert "abc123" not in body
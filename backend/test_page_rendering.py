@@ -0,0 +1,143 @@
+"""Tests for resource blocking and readiness detection in rendered pages (page_rendering.py)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import page_rendering
+from page_rendering import (
+    BODY_TEXT_SCRIPT,
+    GENERIC_JOB_CONTENT_SELECTORS,
+    block_resources,
+    job_content_selectors,
+    should_block,
+    wait_until_ready,
+)
+
+
+@pytest.mark.parametrize(
+    "resource_type, url, blocked",
+    [
+        ("image", "https://boards.greenhouse.io/logo.png", True),
+        ("font", "https://fonts.gstatic.com/s/inter.woff2", True),
+        ("stylesheet", "https://jobs.lever.co/app.css", True),
+        ("media", "https://cdn.example.com/intro.mp4", True),
+        ("script", "https://www.googletagmanager.com/gtm.js", True),
+        ("xhr", "https://region1.google-analytics.com/g/collect", True),  # Subdomain of a tracker
+        ("script", "https://cdn.cookielaw.org/consent.js", True),
+        ("document", "https://acme.wd1.myworkdayjobs.com/en-US/careers/job/1", False),
+        ("script", "https://jobs.lever.co/static/app.js", False),
+        ("fetch", "https://acme.wd1.myworkdayjobs.com/wday/cxs/acme/jobs", False),
+        ("script", "https://notgoogletagmanager.com/app.js", False),  # Only real subdomains match
+        ("xhr", "not a url", False),
+    ],
+)
+def test_should_block(resource_type, url, blocked):
+    assert should_block(resource_type, url) is blocked
+
+
+@pytest.mark.parametrize(
+    "url, first",
+    [
+        ("https://acme.wd5.myworkdayjobs.com/en-US/careers/job/1", '[data-automation-id="jobPostingDescription"]'),
+        ("https://boards.greenhouse.io/acme/jobs/1", ".job__description"),
+        ("https://jobs.lever.co/acme/123", '[data-qa="job-description"]'),
+        ("https://www.linkedin.com/jobs/view/1", ".show-more-less-html__markup"),
+        ("https://uk.indeed.com/viewjob?jk=1", "#jobDescriptionText"),
+    ],
+)
+def test_known_sites_check_their_content_element_first(url, first):
+    selectors = job_content_selectors(url)
+    assert selectors[0] == first
+    assert selectors[-len(GENERIC_JOB_CONTENT_SELECTORS):] == GENERIC_JOB_CONTENT_SELECTORS
+
+
+def test_other_sites_use_the_generic_selectors():
+    assert job_content_selectors("https://careers.acme.com/jobs/1") == GENERIC_JOB_CONTENT_SELECTORS
+    assert job_content_selectors("https://notlever.co/jobs/1") == GENERIC_JOB_CONTENT_SELECTORS
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = SimpleNamespace(resource_type=resource_type, url=url)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+class FakeRoutingPage:
+    def __init__(self):
+        self.handler = None
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+
+def test_block_resources_aborts_and_counts_blocked_requests():
+    page = FakeRoutingPage()
+    routes = [
+        FakeRoute("document", "https://jobs.lever.co/acme/1"),
+        FakeRoute("image", "https://jobs.lever.co/logo.png"),
+        FakeRoute("script", "https://static.hotjar.com/c/hotjar.js"),
+    ]
+
+    async def scenario():
+        counts = await block_resources(page)
+        for route in routes:
+            await page.handler(route)
+        return counts
+
+    assert asyncio.run(scenario()) == {"blocked": 2}
+    assert [route.outcome for route in routes] == ["continued", "aborted", "aborted"]
+
+
+def test_block_resources_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(page_rendering, "BROWSER_BLOCK_RESOURCES", False)
+    page = FakeRoutingPage()
+    assert asyncio.run(block_resources(page)) == {"blocked": 0}
+    assert page.handler is None
+
+
+class FakeRenderedPage:
+    """Answers the readiness script with ready_reason after ready_after seconds; the network never goes idle"""
+
+    def __init__(self, ready_reason="selector", ready_after=0.0, redirects=0):
+        self.ready_reason, self.ready_after, self.redirects = ready_reason, ready_after, redirects
+        self.selectors = None
+
+    async def evaluate(self, script, arg=None):
+        if script == BODY_TEXT_SCRIPT:
+            return 0
+        if self.redirects:
+            self.redirects -= 1
+            raise RuntimeError("Execution context was destroyed, most likely because of a navigation")
+        self.selectors = arg["selectors"]
+        await asyncio.sleep(self.ready_after)
+        return self.ready_reason
+
+    async def wait_for_load_state(self, state, timeout):
+        if state == "networkidle":
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError("networkidle")
+
+
+def test_ready_as_soon_as_the_content_element_has_rendered():
+    page = FakeRenderedPage("selector")
+    url = "https://boards.greenhouse.io/acme/jobs/1"
+    assert asyncio.run(wait_until_ready(page, url, timeout=2)) == "selector"
+    assert page.selectors == job_content_selectors(url)
+
+
+def test_readiness_survives_a_client_side_redirect():
+    page = FakeRenderedPage("structured_data", redirects=1)
+    assert asyncio.run(wait_until_ready(page, "https://careers.acme.com/jobs/1", timeout=2)) == "structured_data"
+
+
+def test_gives_up_after_the_timeout():
+    page = FakeRenderedPage("selector", ready_after=10)
+    assert asyncio.run(wait_until_ready(page, "https://careers.acme.com/jobs/1", timeout=0.1)) == "timeout"
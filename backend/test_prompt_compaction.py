@@ -0,0 +1,87 @@
+"""Tests for prompt compaction (prompt_compaction.py)."""
+
+import main
+from metrics import PROMPT_TOKENS_SAVED
+from prompt_compaction import compact_job_description, compact_resume, count_tokens
+
+BENEFITS = "Benefits\n" + "".join(f"- Generous perk number {i} for every employee\n" for i in range(40))
+EEO = "Equal Opportunity\nAcme is an equal opportunity employer and values every applicant.\n"
+
+PRIVACY_ENGINEER = (
+    "Privacy Engineer\n\n"
+    "Responsibilities\n"
+    "- Build privacy tooling for GDPR\n"
+    "- Familiarity with employee benefits administration\n"
+    "Own data deletion pipelines end to end\n"
+    "Review designs for data minimization\n\n"
+    + BENEFITS
+)
+
+
+def test_bullets_and_the_title_do_not_start_boilerplate_sections():
+    result = compact_job_description(PRIVACY_ENGINEER, budget=count_tokens(PRIVACY_ENGINEER) // 2)
+    assert result.text.startswith("Privacy Engineer\n")
+    for line in ["- Build privacy tooling for GDPR", "- Familiarity with employee benefits administration",
+                 "Own data deletion pipelines end to end", "Review designs for data minimization"]:
+        assert line in result.text
+    assert "Generous perk" not in result.text
+    assert result.tokens_saved > 0
+
+
+def test_plain_sentence_with_a_keyword_is_not_a_heading():
+    posting = "Payroll Specialist\n\nAbout the job\nFamiliarity with employee benefits administration\nRun payroll weekly\n" + EEO * 30
+    result = compact_job_description(posting, budget=count_tokens(posting) // 3)
+    assert "Run payroll weekly" in result.text
+    assert "equal opportunity employer" not in result.text
+
+
+def test_keywords_match_whole_words():
+    posting = "Field Ecologist\n\nBiodiversity Surveys\nCount bird species across the reserve\n" + BENEFITS
+    result = compact_job_description(posting, budget=count_tokens(posting) // 2)
+    assert "Count bird species across the reserve" in result.text
+    assert "Generous perk" not in result.text
+
+
+def test_marked_boilerplate_heading_ends_at_the_next_heading():
+    posting = (
+        "Backend Engineer\n\n## Our Benefits & Perks\n" + "".join(f"- Perk {i}\n" for i in range(60))
+        + "## Requirements\n- Python\n- PostgreSQL\n"
+    )
+    result = compact_job_description(posting, budget=count_tokens(posting) // 2)
+    assert "Perk 1" not in result.text
+    assert result.text.endswith("## Requirements\n- Python\n- PostgreSQL")
+
+
+def test_text_under_budget_is_not_stripped():
+    posting = "Backend Engineer\n\nRequirements\n- Python\n\n" + EEO + "\n" + BENEFITS
+    result = compact_job_description(posting, budget=count_tokens(posting) + 10)
+    assert "equal opportunity employer" in result.text
+    assert "Generous perk number 39" in result.text
+
+
+def test_whitespace_and_repeated_lines_are_always_cleaned():
+    posting = "Backend  Engineer\n\n\n\nApply now\nBuild   APIs\nBuild APIs\n"
+    assert compact_job_description(posting, budget=1000).text == "Backend Engineer\n\nApply now\nBuild APIs"
+
+
+def test_protected_sections_survive_trimming():
+    filler = "".join(f"We are a fast growing company in sector {i}\n" for i in range(80))
+    posting = "Data Engineer\n\n" + filler + "\nQualifications\n- Spark\n- Airflow\n"
+    result = compact_job_description(posting, budget=60)
+    assert result.text.endswith("Qualifications\n- Spark\n- Airflow")
+    assert result.tokens_after <= 60
+
+
+def test_resumes_keep_boilerplate_words():
+    resume = "Jane Doe\n\nPrivacy\nLed E-Verify compliance\n" + "Shipped a feature\n" * 3
+    result = compact_resume(resume, budget=10_000)
+    assert "Privacy\nLed E-Verify compliance" in result.text
+
+
+def test_tokens_saved_are_counted_per_prompt():
+    before = PROMPT_TOKENS_SAVED.value(prompt="analysis")
+    posting = "Backend Engineer\n" + "Build   APIs in Python\n" * 30
+    main.build_analysis_prompt("Python developer", posting)
+    saved = PROMPT_TOKENS_SAVED.value(prompt="analysis") - before
+    assert saved == count_tokens(posting) - count_tokens(compact_job_description(posting).text)
+    assert saved > 0
@@ -0,0 +1,94 @@
+"""Tests for the sliding-window rate limiter (rate_limiter.py)."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from rate_limiter import EndpointRule, MemoryBackend, RateLimiter, SQLiteBackend, _sliding_window
+
+WINDOW = 3600.0
+
+
+def fill(backend, key: str, cost: int, times: int, now: float):
+    for _ in range(times):
+        assert backend.hit(key, cost, 10, WINDOW, now) is None
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    b = MemoryBackend() if request.param == "memory" else SQLiteBackend(str(tmp_path / "limits.sqlite3"))
+    yield b
+    b.close()
+
+
+def test_charges_until_the_limit_then_reports_retry_after(backend):
+    start = 10 * WINDOW
+    fill(backend, "k", 1, 10, start)
+    retry_after = backend.hit("k", 1, 10, WINDOW, start + 60)
+    assert retry_after is not None and retry_after > 0
+    # Another client and another bucket are unaffected
+    assert backend.hit("other", 1, 10, WINDOW, start + 60) is None
+
+
+def test_costs_are_weighted(backend):
+    start = 10 * WINDOW
+    fill(backend, "k", 3, 3, start)  # 9 of 10 units used
+    assert backend.hit("k", 2, 10, WINDOW, start) is not None
+    assert backend.hit("k", 1, 10, WINDOW, start) is None
+
+
+def test_previous_window_decays_linearly():
+    start = 10 * WINDOW
+    state = (start, 0.0, 10.0)  # 10 units used in the window starting at start
+    # Halfway into the next window, half of the previous window's 10 still counts
+    retry_after, window_start, prev_count, curr_count = _sliding_window(*state, 5, 10, WINDOW, start + 1.5 * WINDOW)
+    assert (retry_after, window_start, prev_count, curr_count) == (None, start + WINDOW, 10.0, 5.0)
+    retry_after, *_ = _sliding_window(window_start, prev_count, curr_count, 1, 10, WINDOW, start + 1.5 * WINDOW)
+    assert retry_after == pytest.approx(0.1 * WINDOW)
+
+
+def test_retry_after_is_when_the_request_would_fit(backend):
+    start = 10 * WINDOW
+    fill(backend, "k", 1, 10, start)
+    retry_after = backend.hit("k", 1, 10, WINDOW, start + 600)
+    # The current window only decays once it becomes the previous one
+    assert retry_after == pytest.approx(WINDOW - 600 + 0.1 * WINDOW)
+    assert backend.hit("k", 1, 10, WINDOW, start + 600 + retry_after + 1) is None
+
+
+def test_windows_more_than_one_apart_are_forgotten(backend):
+    start = 10 * WINDOW
+    fill(backend, "k", 1, 10, start)
+    assert backend.hit("k", 10, 10, WINDOW, start + 2 * WINDOW) is None
+
+
+def test_sqlite_backend_prunes_idle_clients(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "limits.sqlite3"))
+    start = 10 * WINDOW
+    backend.hit("idle", 1, 10, WINDOW, start)
+    backend.hit("active", 1, 10, WINDOW, start + backend.PRUNE_INTERVAL_SECONDS)
+    backend.hit("active", 1, 10, WINDOW, start + 3 * WINDOW)
+    keys = {row[0] for row in backend._connection().execute("SELECT key FROM rate_limits")}
+    assert keys == {"active"}
+    backend.close()
+
+
+def make_request(host: str) -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": (host, 1234)})
+
+
+def test_limiter_raises_429_with_retry_after():
+    limiter = RateLimiter(MemoryBackend(), limit=4, window_seconds=WINDOW, endpoint_rules={"research": EndpointRule("r", cost=2)})
+
+    async def scenario():
+        await limiter.check(make_request("1.2.3.4"), "research")
+        await limiter.check(make_request("1.2.3.4"), "research")
+        with pytest.raises(HTTPException) as error:
+            await limiter.check(make_request("1.2.3.4"), "research")
+        assert error.value.status_code == 429
+        assert int(error.value.headers["Retry-After"]) >= 1
+        await limiter.check(make_request("5.6.7.8"), "research")
+
+    asyncio.run(scenario())
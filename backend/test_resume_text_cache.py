@@ -0,0 +1,69 @@
+"""Tests for caching extracted resume text by the upload's SHA-256 (main.extract_upload_text)."""
+
+import hashlib
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from cache import TieredCache
+
+UPLOAD = b"PK fake docx bytes"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A test client with fresh caches, no rate limit, and fake DOCX parsing and LLM calls"""
+    monkeypatch.setattr(main, "resume_text_cache", TieredCache("resume_text", ttl_seconds=3600))
+    monkeypatch.setattr(main, "analysis_cache", TieredCache("analysis", ttl_seconds=3600))
+    extractions = []
+
+    async def fake_extract_docx(data):
+        extractions.append(data)
+        return "Python developer resume"
+
+    async def fake_check(request, endpoint):
+        pass
+
+    async def fake_complete(prompt, **kwargs):
+        return json.dumps({"match_score": 75, "justification": "Fits.", "suggestions": []})
+
+    monkeypatch.setattr(main.document_extractor, "extract_docx", fake_extract_docx)
+    monkeypatch.setattr(main.rate_limiter, "check", fake_check)
+    monkeypatch.setattr(main.llm_client, "complete", fake_complete)
+    test_client = TestClient(main.app)
+    test_client.extractions = extractions
+    return test_client
+
+
+def upload(client, data=UPLOAD, filename="resume.docx"):
+    return client.post("/extract_resume_text_file", files={"file": (filename, data)})
+
+
+def test_same_upload_is_parsed_once(client):
+    first, second = upload(client).json(), upload(client, filename="renamed.docx").json()
+    assert first == second == {"resume_text": "Python developer resume", "resume_sha256": hashlib.sha256(UPLOAD).hexdigest()}
+    assert len(client.extractions) == 1
+    upload(client, data=UPLOAD + b"changed")
+    assert len(client.extractions) == 2
+
+
+def test_analysis_can_reuse_text_by_hash_instead_of_reuploading(client):
+    resume_sha256 = upload(client).json()["resume_sha256"]
+    response = client.post(
+        "/analyze_resume_file", data={"job_description": "Python role", "resume_sha256": resume_sha256.upper()}
+    )
+    assert response.status_code == 200
+    assert response.json()["match_score"] == 75
+    assert len(client.extractions) == 1
+
+
+def test_unknown_hash_asks_for_the_file_again(client):
+    response = client.post("/analyze_resume_file", data={"job_description": "Python role", "resume_sha256": "0" * 64})
+    assert response.status_code == 404
+
+
+def test_unsupported_file_types_are_rejected_before_parsing(client):
+    assert upload(client, filename="resume.txt").status_code == 400
+    assert client.extractions == []
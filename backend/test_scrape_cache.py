@@ -0,0 +1,145 @@
+"""Tests for scrape caching (scrape_cache.py) and conditional revalidation in main.py."""
+
+import asyncio
+import dataclasses
+
+import httpx
+import pytest
+
+import main
+from cache import TieredCache
+from http_fetcher import FetchResult
+from scrape_cache import conditional_headers, normalize_url, page_from_entry, page_to_entry, page_urls, registrable_domain
+from scrape_strategy import ScrapedPage
+
+
+@pytest.mark.parametrize(
+    "url, normalized",
+    [
+        ("HTTPS://Boards.Greenhouse.io:443/acme/jobs/1?gh_src=abc&utm_source=li", "https://boards.greenhouse.io/acme/jobs/1"),
+        ("https://jobs.lever.co/acme/123/?lever-source=x#apply", "https://jobs.lever.co/acme/123"),
+        ("https://example.com/job?b=2&a=1&trk=feed", "https://example.com/job?a=1&b=2"),
+        ("http://example.com:8080", "http://example.com:8080/"),
+        ("https://example.com/search?q=", "https://example.com/search?q="),
+        ("https://www.linkedin.com/jobs/view/1?refId=abc&trackingId=x", "https://www.linkedin.com/jobs/view/1"),
+        ("https://example.com/job?refId=abc", "https://example.com/job?refId=abc"),
+    ],
+)
+def test_normalize_url(url, normalized):
+    assert normalize_url(url) == normalized
+
+
+@pytest.mark.parametrize("param", ["ref", "source", "src", "si", "referrer"])
+def test_generic_parameters_still_tell_pages_apart(param):
+    assert normalize_url(f"https://ex.com/job?{param}=1") != normalize_url(f"https://ex.com/job?{param}=2")
+
+
+@pytest.mark.parametrize(
+    "host, domain",
+    [
+        ("careers.acme.com", "acme.com"),
+        ("jobs.acme.co.uk", "acme.co.uk"),
+        ("acme.github.io", "acme.github.io"),
+        ("localhost", "localhost"),
+    ],
+)
+def test_registrable_domain(host, domain):
+    assert registrable_domain(host) == domain
+
+
+def page(**fields) -> ScrapedPage:
+    return ScrapedPage(**{"url": "https://acme.com/jobs/1?utm_source=x", "text": "Engineer", **fields})
+
+
+def test_page_urls_include_redirects_and_same_site_canonical():
+    scraped = page(final_url="https://careers.acme.com/jobs/1", canonical_url="https://www.acme.com/jobs/engineer")
+    assert page_urls(scraped) == [
+        "https://acme.com/jobs/1", "https://careers.acme.com/jobs/1", "https://www.acme.com/jobs/engineer"
+    ]
+
+
+def test_page_urls_ignore_cross_site_canonical():
+    # A page may not claim another site's posting, even when reached through a redirect from that site
+    scraped = page(url="https://victim.com/r?to=x", final_url="https://evil.com/job", canonical_url="https://victim.com/jobs/1")
+    assert page_urls(scraped) == ["https://victim.com/r?to=x", "https://evil.com/job"]
+    shared_host = page(url="https://evil.github.io/job", canonical_url="https://acme.github.io/job")
+    assert page_urls(shared_host) == ["https://evil.github.io/job"]
+
+
+def test_entries_round_trip_under_the_requested_url():
+    scraped = page(etag='"v1"', last_modified="Mon, 05 Oct 2026 10:00:00 GMT")
+    entry = page_to_entry(scraped, validated_at=123.0)
+    assert entry["validated_at"] == 123.0
+    assert page_from_entry(entry, "https://acme.com/jobs/1") == dataclasses.replace(scraped, url="https://acme.com/jobs/1")
+    assert conditional_headers(entry) == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 05 Oct 2026 10:00:00 GMT"}
+    assert conditional_headers(page_to_entry(page())) == {}
+
+
+# --- Revalidation (main.cached_job_page) ---
+URL = "https://acme.com/jobs/1"
+
+
+@pytest.fixture
+def scrape_env(monkeypatch):
+    """A fresh memory-only scrape cache and a fake fetcher; returns the list of conditional requests made"""
+    monkeypatch.setattr(main, "scrape_cache", TieredCache("scrape", ttl_seconds=3600))
+    requests = []
+    responses = []
+
+    async def fake_fetch(url, headers=None, max_bytes=None):
+        requests.append((url, dict(headers or {})))
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(main.http_fetcher, "fetch", fake_fetch)
+    return requests, responses
+
+
+def store_stale(monkeypatch, scraped: ScrapedPage):
+    asyncio.run(main.store_scraped_page(scraped))
+    monkeypatch.setattr(main, "SCRAPE_CACHE_FRESH_SECONDS", -1)
+
+
+def test_fresh_entries_are_served_without_a_request(scrape_env):
+    requests, _ = scrape_env
+    asyncio.run(main.store_scraped_page(page(url=URL, etag='"v1"')))
+    assert asyncio.run(main.cached_job_page(URL + "?utm_campaign=y")).text == "Engineer"
+    assert requests == []
+
+
+def test_stale_entry_revalidated_with_304(scrape_env, monkeypatch):
+    requests, responses = scrape_env
+    store_stale(monkeypatch, page(url=URL, etag='"v1"'))
+    responses.append(FetchResult(URL, 304, httpx.Headers(), "", "utf-8", False))
+    assert asyncio.run(main.cached_job_page(URL)).text == "Engineer"
+    assert requests == [(URL, {"If-None-Match": '"v1"'})]
+
+
+def test_stale_entry_without_validators_is_scraped_again(scrape_env, monkeypatch):
+    requests, _ = scrape_env
+    store_stale(monkeypatch, page(url=URL))
+    assert asyncio.run(main.cached_job_page(URL)) is None
+    assert requests == []
+
+
+def test_removed_posting_is_evicted(scrape_env, monkeypatch):
+    _, responses = scrape_env
+    store_stale(monkeypatch, page(url=URL, etag='"v1"'))
+    request = httpx.Request("GET", URL)
+    responses.append(httpx.HTTPStatusError("gone", request=request, response=httpx.Response(410, request=request)))
+    assert asyncio.run(main.cached_job_page(URL)) is None
+    assert asyncio.run(main.scrape_cache.get(main.scrape_cache_key(URL))) is None
+
+
+def test_unreachable_site_serves_the_stale_page(scrape_env, monkeypatch):
+    _, responses = scrape_env
+    store_stale(monkeypatch, page(url=URL, etag='"v1"'))
+    responses.append(httpx.ConnectError("down"))
+    assert asyncio.run(main.cached_job_page(URL)).text == "Engineer"
+
+
+def test_cross_site_canonical_cannot_poison_the_victim_entry(scrape_env):
+    asyncio.run(main.store_scraped_page(page(url="https://evil.com/job", canonical_url=URL)))
+    assert asyncio.run(main.cached_job_page(URL)) is None
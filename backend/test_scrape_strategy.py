@@ -0,0 +1,105 @@
+"""Tests for racing the basic and browser scrape paths (scrape_strategy.py)."""
+
+import asyncio
+
+from scrape_strategy import BASIC_FIRST, BROWSER_FIRST, HEDGE, ScrapedPage, ScrapeStrategy, domain_of
+
+HEDGE_DELAY = 0.05
+
+
+class FakePath:
+    """A scrape path that answers at once (or never), recording when it started and whether it was cancelled"""
+
+    def __init__(self, name, page_text="", error=None, wait_forever=False):
+        self.name, self.page_text, self.error, self.wait_forever = name, page_text, error, wait_forever
+        self.started_at = None
+        self.cancelled = False
+
+    async def __call__(self, url):
+        self.started_at = asyncio.get_running_loop().time()
+        try:
+            if self.wait_forever:
+                await asyncio.Event().wait()
+            await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return ScrapedPage(url=url, text=self.page_text) if self.page_text else None
+
+
+def race(strategy, url, basic, browser):
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        page = await strategy.scrape(url, basic, browser)
+        # Let cancelled tasks run their handlers
+        await asyncio.sleep(0)
+        return page, started
+
+    return asyncio.run(scenario())
+
+
+def test_fast_basic_path_wins_without_starting_the_browser():
+    strategy = ScrapeStrategy(hedge_delay=HEDGE_DELAY)
+    basic, browser = FakePath("basic", "Job text"), FakePath("browser", "Rendered job text")
+    page, _ = race(strategy, "https://jobs.example/1", basic, browser)
+    assert page.text == "Job text"
+    assert browser.started_at is None
+
+
+def test_hedge_starts_the_browser_after_the_delay_and_cancels_the_slow_basic_path():
+    strategy = ScrapeStrategy(hedge_delay=HEDGE_DELAY)
+    basic = FakePath("basic", wait_forever=True)
+    browser = FakePath("browser", "Rendered job text")
+    page, started = race(strategy, "https://jobs.example/1", basic, browser)
+    assert page.text == "Rendered job text"
+    assert browser.started_at - started >= HEDGE_DELAY
+    assert basic.cancelled
+
+
+def test_browser_first_domains_race_both_paths_and_cancel_the_loser():
+    strategy = ScrapeStrategy(hedge_delay=HEDGE_DELAY)
+    basic = FakePath("basic", "Job text")
+    browser = FakePath("browser", wait_forever=True)
+    page, started = race(strategy, "https://acme.wd5.myworkdayjobs.com/job/1", basic, browser)
+    assert page.text == "Job text"
+    assert browser.started_at - started < HEDGE_DELAY  # Started right away, not after the hedge delay
+    assert browser.cancelled
+
+
+def test_both_paths_failing_returns_none():
+    strategy = ScrapeStrategy(hedge_delay=HEDGE_DELAY)
+    basic = FakePath("basic")  # No job text
+    browser = FakePath("browser", error=RuntimeError("browser crashed"))
+    page, started = race(strategy, "https://jobs.example/1", basic, browser)
+    assert page is None
+    # A basic failure starts the browser at once instead of waiting out the hedge delay
+    assert browser.started_at - started < HEDGE_DELAY
+
+
+def test_domain_history_moves_between_modes():
+    strategy = ScrapeStrategy(hedge_delay=HEDGE_DELAY)
+    assert strategy.mode_for("jobs.example") == HEDGE
+    assert strategy.mode_for("acme.myworkdayjobs.com") == BROWSER_FIRST
+
+    strategy.record("jobs.example", "basic", success=True, structured=True)
+    assert strategy.mode_for("jobs.example") == BASIC_FIRST
+
+    for _ in range(5):
+        strategy.record("spa.example", "basic", success=False)
+    assert strategy.mode_for("spa.example") == HEDGE  # No browser success yet
+    strategy.record("spa.example", "browser", success=True)
+    assert strategy.mode_for("spa.example") == BROWSER_FIRST
+
+
+def test_domain_history_is_bounded():
+    strategy = ScrapeStrategy(max_domains=2)
+    for domain in ("a.example", "b.example", "c.example"):
+        strategy.record(domain, "basic", success=True, structured=True)
+    assert strategy.mode_for("a.example") == HEDGE  # Evicted
+    assert strategy.mode_for("c.example") == BASIC_FIRST
+
+
+def test_domain_of_drops_www_and_case():
+    assert domain_of("https://WWW.Example.com/jobs/1") == "example.com"
@@ -0,0 +1,104 @@
+"""Tests for coalescing identical in-flight calls (single_flight.py)."""
+
+import asyncio
+
+import pytest
+
+from metrics import COALESCED_CALLS
+from single_flight import SingleFlight
+
+
+class Work:
+    """A call that counts how often it actually runs"""
+
+    def __init__(self, result="done", delay=0.05, error=None):
+        self.result, self.delay, self.error = result, delay, error
+        self.runs = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight("test_share")
+    work = Work()
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+        assert flights.in_flight() == 0
+        return results
+
+    assert asyncio.run(scenario()) == ["done"] * 5
+    assert work.runs == 1
+    assert COALESCED_CALLS.value(group="test_share") == 4
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flights = SingleFlight("test_keys")
+    work = Work()
+
+    async def scenario():
+        await asyncio.gather(flights.do("a", work), flights.do("b", work))
+        await flights.do("a", work)  # The first "a" has finished, so this is a new call
+
+    asyncio.run(scenario())
+    assert work.runs == 3
+
+
+def test_errors_are_shared_then_forgotten():
+    flights = SingleFlight("test_errors")
+    failing = Work(error=ValueError("upstream failed"))
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.do("k", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        return await flights.do("k", Work(result="recovered"))
+
+    assert asyncio.run(scenario()) == "recovered"
+    assert failing.runs == 1
+
+
+def test_a_caller_leaving_does_not_cancel_the_others():
+    flights = SingleFlight("test_leave")
+    work = Work(delay=0.2)
+
+    async def scenario():
+        leaving = asyncio.create_task(flights.do("k", work))
+        staying = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0.05)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(scenario()) == "done"
+    assert (work.runs, work.cancelled) == (1, False)
+
+
+def test_work_is_cancelled_when_every_caller_leaves():
+    flights = SingleFlight("test_cancel")
+    work = Work(delay=5)
+
+    async def scenario():
+        callers = [asyncio.create_task(flights.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert flights.in_flight() == 0
+        # A new caller starts fresh instead of joining the cancelled call
+        return await flights.do("k", Work(result="fresh"))
+
+    assert asyncio.run(scenario()) == "fresh"
+    assert work.cancelled
+
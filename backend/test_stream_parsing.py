@@ -0,0 +1,108 @@
+"""Tests for the incremental stream parsers (stream_parsing.py)."""
+
+import json
+
+import pytest
+
+from stream_parsing import AnalysisStreamParser, CompanyResearchStreamParser, JsonFieldStream, sse_event
+from structured_output import MAX_SUGGESTIONS
+
+CHUNK_SIZES = [1, 3, 7, 10_000]
+
+
+def feed_in_chunks(parser, text: str, size: int) -> list:
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i : i + size]))
+    return events + parser.finish()
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_text_analysis_events(size):
+    text = (
+        "**Match Score:** 78/100\n\n**Explanation:** Strong Python background\n\n"
+        "### Suggestions\n1. Quantify impact\n2. Mention Kubernetes\n"
+    )
+    assert feed_in_chunks(AnalysisStreamParser(), text, size) == [
+        ("score", 78),
+        ("justification", "Strong Python background"),
+        ("suggestion", "Quantify impact"),
+        ("suggestion", "Mention Kubernetes"),
+    ]
+
+
+def test_text_analysis_last_line_without_newline_is_emitted_on_finish():
+    parser = AnalysisStreamParser()
+    events = parser.feed("Match Score: 55%\n\nSuggestions\n- Add metrics")
+    assert ("suggestion", "Add metrics") not in events
+    assert ("suggestion", "Add metrics") in events + parser.finish()
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_text_company_research_sections(size):
+    text = "1. **Company Overview**: Builds hiring software\n2. **Key Product Areas**: An ATS\n"
+    assert feed_in_chunks(CompanyResearchStreamParser(), text, size) == [
+        ("section", {"name": "company_overview", "content": "Builds hiring software"}),
+        ("section", {"name": "key_products", "content": "An ATS"}),
+    ]
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_json_fields_are_reported_once_complete(size):
+    text = '{"a": [1, "x, ]"], "b": {"c": [2, {"d": "}"}]}, "e": "say \\"hi\\"", "f": -1.5e3, "g": true, "h": null}'
+    fields = []
+    stream = JsonFieldStream()
+    for i in range(0, len(text), size):
+        fields.extend(stream.feed(text[i : i + size]))
+    assert fields == [
+        ("a", 1, True),
+        ("a", "x, ]", True),
+        ("b", {"c": [2, {"d": "}"}]}, False),
+        ("e", 'say "hi"', False),
+        ("f", -1500.0, False),
+        ("g", True, False),
+        ("h", None, False),
+    ]
+
+
+def test_json_field_is_not_reported_before_it_is_complete():
+    stream = JsonFieldStream()
+    assert stream.feed('{"justification": "Strong') == []
+    assert stream.feed(' fit", "match_score": 8') == [("justification", "Strong fit", False)]
+    assert stream.feed("5}") == [("match_score", 85, False)]
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_json_analysis_events(size):
+    text = json.dumps({
+        "match_score": 78,
+        "justification": 'Good "fit"',
+        "highlights": ["Python"],
+        "suggestions": ["One", "Two, with {braces}", " "],
+    })
+    assert feed_in_chunks(AnalysisStreamParser(), "  \n" + text, size) == [
+        ("score", 78),
+        ("justification", 'Good "fit"'),
+        ("suggestion", "One"),
+        ("suggestion", "Two, with {braces}"),
+    ]
+
+
+def test_json_analysis_ignores_invalid_scores_and_caps_suggestions():
+    text = json.dumps({"match_score": 150, "suggestions": [f"Tip {i}" for i in range(MAX_SUGGESTIONS + 3)]})
+    events = feed_in_chunks(AnalysisStreamParser(), text, 5)
+    assert events == [("suggestion", f"Tip {i}") for i in range(MAX_SUGGESTIONS)]
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_json_fused_company_research_events(size):
+    text = json.dumps({"company_name": "Acme", "company_overview": " Robots ", "key_products": ""})
+    assert feed_in_chunks(CompanyResearchStreamParser(), text, size) == [
+        ("company", "Acme"),
+        ("section", {"name": "company_overview", "content": "Robots"}),
+        ("section", {"name": "key_products", "content": ""}),
+    ]
+
+
+def test_sse_event_format():
+    assert sse_event("score", 78) == "event: score\ndata: 78\n\n"
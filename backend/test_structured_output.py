@@ -0,0 +1,70 @@
+"""Tests for structured (JSON-schema) response parsing (structured_output.py)."""
+
+import json
+
+import pytest
+
+from structured_output import (
+    COMPANY_SECTIONS,
+    MAX_SUGGESTIONS,
+    parse_analysis_json,
+    parse_company_research_json,
+    parse_fused_company_research_json,
+    valid_score,
+)
+
+
+@pytest.mark.parametrize("value, score", [(0, 0), (100, 100), (78.0, 78), (78.5, None), (101, None), (-1, None), (True, None), ("78", None)])
+def test_valid_score(value, score):
+    assert valid_score(value) == score
+
+
+def test_analysis_is_parsed_and_cleaned():
+    content = json.dumps({
+        "match_score": 72,
+        "justification": " Solid backend match ",
+        "highlights": ["Python"],
+        "suggestions": [" Add metrics ", "", 3] + [f"Tip {i}" for i in range(MAX_SUGGESTIONS)],
+    })
+    assert parse_analysis_json(content) == {
+        "match_score": 72,
+        "justification": "Solid backend match",
+        "suggestions": ["Add metrics"] + [f"Tip {i}" for i in range(MAX_SUGGESTIONS - 1)],
+    }
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "Match Score: 72",  # Text answer
+        "[1, 2]",
+        json.dumps({"match_score": 172, "justification": "x", "suggestions": []}),
+        json.dumps({"match_score": 72, "justification": None, "suggestions": []}),
+        json.dumps({"match_score": 72, "justification": "x", "suggestions": "Add metrics"}),
+    ],
+)
+def test_invalid_analysis_falls_back(content):
+    assert parse_analysis_json(content) is None
+
+
+def test_company_research_sections():
+    content = json.dumps({"company_overview": " Robots ", "key_products": "Arms"})
+    info = parse_company_research_json(content)
+    assert list(info) == list(COMPANY_SECTIONS)
+    assert (info["company_overview"], info["key_products"], info["culture_values"]) == ("Robots", "Arms", "")
+
+
+@pytest.mark.parametrize(
+    "content", ["not json", json.dumps({"company_overview": ""}), json.dumps({"company_overview": ["Robots"]})]
+)
+def test_invalid_or_empty_company_research_falls_back(content):
+    assert parse_company_research_json(content) is None
+
+
+def test_fused_company_research():
+    content = json.dumps({"company_name": " Acme ", "company_overview": "Robots"})
+    name, info = parse_fused_company_research_json(content)
+    assert (name, info["company_overview"]) == ("Acme", "Robots")
+    unknown = json.dumps({"company_name": "", "company_overview": "Robots"})
+    assert parse_fused_company_research_json(unknown)[0] == "Unknown Company"
+    assert parse_fused_company_research_json(json.dumps({"company_overview": "Robots"})) is None
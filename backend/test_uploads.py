@@ -0,0 +1,71 @@
+"""Tests for upload size enforcement (uploads.py)."""
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from uploads import UploadSizeLimitMiddleware, read_upload_bytes
+
+MAX_BODY_BYTES = 2000
+BOUNDARY = "jobflowboundary"
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_body_bytes=MAX_BODY_BYTES)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"bytes": len(await read_upload_bytes(file, max_bytes=MAX_BODY_BYTES // 2))}
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return payload
+
+    return TestClient(app)
+
+
+def multipart_body(size: int) -> bytes:
+    return (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="resume.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + b"x" * size + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def post_upload(client, body: bytes, chunked: bool = False):
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+    if not chunked:
+        return client.post("/upload", content=body, headers=headers)
+
+    def chunks():
+        # A generator body is sent with Transfer-Encoding: chunked and no Content-Length
+        for start in range(0, len(body), 256):
+            yield body[start : start + 256]
+
+    return client.post("/upload", content=chunks(), headers=headers)
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_small_upload_is_accepted(client, chunked):
+    response = post_upload(client, multipart_body(500), chunked=chunked)
+    assert response.status_code == 200
+    assert response.json() == {"bytes": 500}
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_oversized_body_is_rejected_with_413(client, chunked):
+    response = post_upload(client, multipart_body(MAX_BODY_BYTES * 3), chunked=chunked)
+    assert response.status_code == 413
+    assert "File too large" in response.json()["detail"]
+
+
+def test_file_over_the_per_file_limit_is_rejected_with_413(client):
+    # Within the body limit, but over the per-file limit checked while reading the file
+    response = post_upload(client, multipart_body(MAX_BODY_BYTES // 2 + 100))
+    assert response.status_code == 413
+
+
+def test_non_multipart_requests_are_not_limited(client):
+    payload = {"text": "x" * (MAX_BODY_BYTES * 2)}
+    assert client.post("/echo", json=payload).json() == payload
@@ -0,0 +1,74 @@
+"""
+Upload size enforcement.
+
+Resume uploads are parsed from memory, so their size has to be bounded.
+UploadSizeLimitMiddleware rejects an oversized multipart request while it is
+still streaming in (from Content-Length up front, or by counting body bytes
+as they arrive), before Starlette finishes spooling it. read_upload_bytes then
+reads a single uploaded file in chunks with the same per-file limit.
+"""
+
+import os
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))  # Per uploaded file
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024  # Room for form fields such as job_description
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+
+def upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum upload size is {round(MAX_UPLOAD_BYTES / (1024 * 1024), 1):g} MB.",
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """Reject multipart request bodies larger than max_body_bytes while they stream in."""
+
+    def __init__(self, app, max_body_bytes: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            error = upload_too_large()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raised inside body parsing; FastAPI turns it into a 413 response
+                    raise upload_too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def read_upload_bytes(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> bytes:
+    """Read an uploaded file into memory in chunks, raising 413 as soon as it exceeds max_bytes"""
+    if file.size is not None and file.size > max_bytes:
+        raise upload_too_large()
+    chunks = []
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise upload_too_large()
+        chunks.append(chunk)
+    return b"".join(chunks)